@@ -1,4 +1,5 @@
 from typing import Union
+from collections.abc import Iterator
 from datetime import (
     date,
     datetime
@@ -8,47 +9,180 @@ import pandas
 import altair
 
 from conjurer.logic.eda import check
+from conjurer.logic.eda.check import (
+    sketch,
+    chunk_stat,
+    stat_cache,
+    fk_coverage,
+    fk_discovery,
+    key_discovery,
+    sample_stat,
+    alert,
+    missing_pattern,
+    correlation
+)
 from conjurer.logic.eda.load import (
     pandas_csv,
-    df_dict_loader
+    df_dict_loader,
+    csv_cache,
+    pandas_jsonl,
+    dtype_optimizer,
+    tail_reader
 )
 from conjurer.logic.eda.vis import (
     aggy,
     histogram,
     scatter
 )
+from conjurer.logic.eda.vis import correlation as correlation_vis
 
 
 StrOrList = Union[str, list]
 Orderable = Union[int, float, datetime, date]
 
 
-def read_csv(buffer_or_filepath, **kwargs) -> pandas.DataFrame:
+def read_csv(buffer_or_filepath, chunksize: int = None, single_parse: bool = False,
+             sample_rows: int = pandas_csv.DEFAULT_SAMPLE_ROWS, cache: csv_cache.CsvCache = None,
+             optimize_memory: bool = False, **kwargs) -> Union[pandas.DataFrame, Iterator]:
     """
     Load CSV as pandas.DataFrame with Int64 / datetime64 column inference
     Args:
         buffer_or_filepath: 1st argument for pandas.read_csv
+        chunksize (int, optional): If set, return iterator of data frames with `chunksize` rows (see `iter_csv`)
+        single_parse (bool, optional): Default=False. If True, infer dtypes from the first `sample_rows` rows and
+            parse the file only once with them. Falls back to the full inference when the sample guessed wrong.
+            About 20% faster for a 200k x 36 CSV of mixed types; little gain for files of only numbers
+        sample_rows (int, optional): The number of rows used to infer dtypes for `chunksize` / `single_parse`
+        cache (CsvCache, optional): If set, converted data frame is cached on disk and reused while the file and
+            arguments are unchanged (ignored for buffers and `chunksize`)
+        optimize_memory (bool, optional): Default=False. If True, downcast columns to the smallest dtypes
+            (see `optimize_memory`). Memory report is logged
+        **kwargs: Arbitrary keyword arguments for pandas.read_csv.
+            With `dtype_backend="pyarrow"` (requires pyarrow), columns are pyarrow-backed
+            (int64[pyarrow] / timestamp[ns][pyarrow] / string[pyarrow]) without python string conversion
+
+    Returns:
+        pandas.DataFrame, or iterator of pandas.DataFrame if `chunksize` is set
+    """
+    return pandas_csv.read_csv(
+        buffer_or_filepath, chunksize=chunksize, sample_rows=sample_rows, single_parse=single_parse, cache=cache,
+        optimize_memory=optimize_memory, **kwargs)
+
+
+def iter_csv(buffer_or_filepath, chunksize: int, sample_rows: int = pandas_csv.DEFAULT_SAMPLE_ROWS,
+             **kwargs) -> Iterator:
+    """
+    Load CSV chunk by chunk with bounded memory. Int64 / datetime64 / string dtypes are inferred once
+    from the first `sample_rows` rows, and every chunk has exactly the same dtypes
+    Args:
+        buffer_or_filepath: 1st argument for pandas.read_csv (buffer has to be seekable)
+        chunksize (int): The number of rows in each chunk
+        sample_rows (int, optional): The number of rows used to infer dtypes
         **kwargs: Arbitrary keyword arguments for pandas.read_csv
 
     Returns:
-        pandas.DataFrame
+        iterator of pandas.DataFrame
+
+    Raises:
+        SchemaMismatchError: if a chunk has values which cannot be converted to the inferred dtypes
+    """
+    return pandas_csv.iter_csv(buffer_or_filepath, chunksize, sample_rows, **kwargs)
+
+
+def read_jsonl(buffer_or_filepath, chunksize: int = None, sample_rows: int = pandas_csv.DEFAULT_SAMPLE_ROWS,
+               sep: str = ".") -> Union[pandas.DataFrame, Iterator]:
+    """
+    Load JSON Lines (one JSON object per line). Nested objects are flattened into columns
+    named with `sep` (e.g. "user.id"), lists are kept as canonical JSON strings,
+    and Int64 / datetime64 / string dtypes are inferred in the same way as read_csv
+    Args:
+        buffer_or_filepath: File path or text buffer
+        chunksize (int, optional): If set, returns an iterator of data frames with this number of rows
+            and the same dtypes inferred from the first `sample_rows` records
+        sample_rows (int, optional): The number of records used to infer dtypes with chunksize
+        sep (str, optional): Separator between parent and child keys of nested objects
+
+    Returns:
+        pandas.DataFrame, or iterator of pandas.DataFrame if chunksize is set
+
+    Raises:
+        SchemaMismatchError: if a chunk has keys or values which do not fit the inferred dtypes
+    """
+    return pandas_jsonl.read_jsonl(buffer_or_filepath, chunksize=chunksize, sample_rows=sample_rows, sep=sep)
+
+
+def optimize_memory(df: pandas.DataFrame,
+                    category_max_unique_ratio: float = dtype_optimizer.CATEGORY_MAX_UNIQUE_RATIO) -> tuple:
     """
-    return pandas_csv.read_csv(buffer_or_filepath, **kwargs)
+    Downcast columns to reduce memory: the smallest nullable integer (Int8 / Int16 / Int32 / Int64) that fits,
+    float32 if lossless, and category for low-cardinality text columns
+    Args:
+        df (pandas.DataFrame): Data frame you want to optimize (columns are replaced in place)
+        category_max_unique_ratio (float, optional): Text column is converted to category
+            if (# of unique values) / (# of non-null values) is at most this ratio
 
+    Returns:
+        tuple of pandas.DataFrame: (optimized data frame, memory report)
 
-def check_stats(df: pandas.DataFrame, skip_histogram: bool = False) -> pandas.DataFrame:
+        Each row of memory report represents dtypes and bytes before / after for each column
+    """
+    return dtype_optimizer.optimize_dtypes(df, category_max_unique_ratio)
+
+
+def check_stats(df: Union[pandas.DataFrame, Iterator], skip_histogram: bool = False, approx: bool = False,
+                error_rate: float = sketch.DEFAULT_ERROR_RATE, n_jobs: int = None,
+                executor: str = "thread", cache: stat_cache.StatCache = None, sample: int = None,
+                strata: StrOrList = None, confidence: float = sample_stat.DEFAULT_CONFIDENCE,
+                robust: bool = False) -> pandas.DataFrame:
     """
     Calculate basic statistics for pandas.DataFrame
     Args:
-        df (pandas.DataFrame): Data frame you want to calculate statistics
+        df (pandas.DataFrame): Data frame you want to calculate statistics, or iterator of data frame chunks
+            (e.g. `iter_csv`) for data larger than memory. Chunks are processed in one pass with bounded memory:
+            unique_count is estimated by HyperLogLog and histograms by t-digest style sketch,
+            duplication is skipped, and `approx` / `n_jobs` are ignored
         skip_histogram (bool, optional): If True, function does not generate histogram
+        approx (bool, optional): Default=False. If True, unique_count is estimated by HyperLogLog
+            with bounded memory (is_unique is also based on the estimate)
+        error_rate (float, optional): Relative standard error of unique_count for `approx`
+        n_jobs (int, optional): If > 1, statistics of columns are calculated concurrently with this number of workers.
+            Returned values do not depend on `n_jobs`
+        executor (str, optional): "thread" (default, numpy releases GIL) or "process" for `n_jobs`
+        cache (StatCache, optional): If set, statistics of unchanged columns are reused from the cache,
+            and only appended rows are scanned for columns whose previous content is a prefix
+        sample (int, optional): If set, statistics are estimated from a reservoir sample of this number of rows
+            (for each stratum if `strata` is set) drawn in one pass, with exact min / max from the same pass.
+            Interval columns "{stat}_lower" / "{stat}_upper" are added for mean, std, ratio_na, ratio_zero and
+            unique_count, and duplication is skipped. `approx`, `n_jobs` and `cache` are ignored
+        strata (str or list of str, optional): Columns to draw a stratified sample (each stratum is weighted by
+            its number of rows)
+        confidence (float, optional): Default=0.95. Confidence level of intervals for `sample`
+        robust (bool, optional): Default=False. If True, quartiles ("q1", "median", "q3"), "mad", Tukey fences
+            ("lower_fence", "upper_fence") and "ratio_outlier" of numeric columns are added in the same pass
+            (used by outlier rule of `check_alerts`). Not supported with `cache`, `sample` or chunks
 
     Returns:
         pandas.DataFrame: Data frame of statistics for each column
 
         Each row represents statistics of each column in `df`
     """
-    return check.check_stats(df, skip_histogram)
+    return check.check_stats(
+        df, skip_histogram, approx, error_rate, n_jobs, executor, cache, sample, strata, confidence, robust)
+
+
+def check_alerts(stat_df: pandas.DataFrame, rules: list = None) -> pandas.DataFrame:
+    """
+    Check statistics of columns by rules, each of which is evaluated over all columns at once
+    Args:
+        stat_df (pandas.DataFrame): Result of `check_stats` (use `robust=True` for outlier rule)
+        rules (list of AlertRule, optional): Default is `alert.DEFAULT_RULES` (missing ratio, single value,
+            too many unique values, timestamp range and outliers). Custom rules can be added as
+            AlertRule(name, level, predicate, message) where predicate returns boolean values for rows of stat_df
+
+    Returns:
+        pandas.DataFrame: with columns "column_name", "level" ("ERROR" or "WARN"), "rule" and "message"
+    """
+    return check.check_alerts(stat_df, rules)
 
 
 def check_series(df: pandas.DataFrame, unit_keys: list) -> pandas.DataFrame:
@@ -58,6 +192,10 @@ def check_series(df: pandas.DataFrame, unit_keys: list) -> pandas.DataFrame:
     Args:
         df (pandas.DataFrame): Data frame you want to calculate statistics
         unit_keys (list[str]): Column names to identify each series
+
+    Returns:
+        pandas.DataFrame: Data frame indexed by `unit_keys` with "count" and min / max / mean / std of numeric
+        columns, min / max of datetime columns and nunique of other columns, computed in one grouping pass
     """
     return check.check_series(df, unit_keys)
 
@@ -79,6 +217,107 @@ def get_unique_values(df: pandas.DataFrame, columns: StrOrList) -> set:
     return check.get_unique_values(df, columns)
 
 
+def count_duplicated_rows(df: pandas.DataFrame, return_groups: bool = False) -> Union[int, tuple]:
+    """
+    Count rows which are the same as a previous row, by 64 bit row hash and exact comparison of colliding rows.
+    Dict / list cells are compared by their content
+    Args:
+        df (pandas.DataFrame): Data frame you want to check
+        return_groups (bool, optional): Default=False. If True, also return rows in duplicated groups
+
+    Returns:
+        int: the number of duplicated rows, or tuple of it and pandas.DataFrame of rows in duplicated groups
+        (with "duplicate_group" column as group id) if `return_groups` is True
+    """
+    return check.count_duplicated_rows(df, return_groups)
+
+
+def count_unique_values(df: pandas.DataFrame, columns: StrOrList, approx: bool = False,
+                        error_rate: float = sketch.DEFAULT_ERROR_RATE) -> int:
+    """
+    Count unique values (not null) for column(s) without building python set of values
+    Args:
+        df (pandas.DataFrame): Data frame which stores data
+        columns (str or list of str): Column name(s) you want to count unique values
+        approx (bool, optional): Default=False. If True, estimate by HyperLogLog with bounded memory
+        error_rate (float, optional): Relative standard error of the estimate for `approx`
+
+    Returns:
+        int: the number of unique values (values which include null are excluded as `get_unique_values`)
+    """
+    return check.count_unique_values(df, columns, approx, error_rate)
+
+
+def discover_unique_keys(df: pandas.DataFrame, max_columns: int = key_discovery.DEFAULT_MAX_COLUMNS,
+                         sample_rows: int = key_discovery.DEFAULT_SAMPLE_ROWS, columns: list = None
+                         ) -> pandas.DataFrame:
+    """
+    Find minimal unique column combinations (candidate keys), i.e. combinations of columns which identify
+    each row while no subset of them does. Null is treated as a value
+    Args:
+        df (pandas.DataFrame): Data frame you want to check
+        max_columns (int, optional): Default=3. Maximum number of columns in a combination
+        sample_rows (int, optional): The number of sampled rows to reject non-unique combinations
+            before checking all rows
+        columns (list of str, optional): Columns to be considered (all columns by default)
+
+    Returns:
+        pandas.DataFrame: with columns "column_names" (list of str) and "num_columns"
+    """
+    return check.discover_unique_keys(df, max_columns, sample_rows, columns)
+
+
+def check_missing_patterns(df: Union[pandas.DataFrame, Iterator],
+                           top_n: int = missing_pattern.DEFAULT_TOP_N) -> tuple:
+    """
+    Find which columns go missing together. Null flags of each row are packed into 64 bit words block by block
+    (no boolean data frame of the full shape), and distinct patterns are counted by hashing the words
+    Args:
+        df (pandas.DataFrame): Data frame you want to check, or iterator of data frame chunks
+        top_n (int, optional): Default=10. The number of the most frequent patterns in the result
+
+    Returns:
+        tuple of pandas.DataFrame: (patterns, co-null counts). Patterns have columns "missing_columns"
+        (list of column names), "num_missing_columns", "num_rows" and "ratio". Co-null counts is
+        a column x column matrix of the number of rows where both columns are null
+    """
+    return check.check_missing_patterns(df, top_n)
+
+
+def check_correlations(df: pandas.DataFrame, method: str = "pearson",
+                       max_categories: int = correlation.DEFAULT_MAX_CATEGORIES) -> pandas.DataFrame:
+    """
+    Calculate correlations of all pairs of numeric columns (pairwise complete rows) and Cramér's V
+    of all pairs of categorical columns. Columns are processed as standardized blocks with bounded memory,
+    so that thousands of columns are feasible
+    Args:
+        df (pandas.DataFrame): Data frame you want to check
+        method (str, optional): Default="pearson". "pearson" or "spearman" for numeric columns.
+            Spearman ranks each column once over its own non-null values (not over pairwise complete rows),
+            so with nulls it differs from `df.corr(method="spearman")`
+        max_categories (int, optional): Categorical columns with more unique values (e.g. IDs) are excluded
+
+    Returns:
+        pandas.DataFrame: Square matrix of numeric columns then categorical columns
+        (NaN between numeric and categorical columns), which can be plotted by `plot_correlation_heatmap`
+    """
+    return check.check_correlations(df, method, max_categories)
+
+
+def get_correlated_pairs(corr_df: pandas.DataFrame, threshold: float = correlation.DEFAULT_THRESHOLD
+                         ) -> pandas.DataFrame:
+    """
+    Find redundant column pairs in result of `check_correlations`
+    Args:
+        corr_df (pandas.DataFrame): Result of `check_correlations`
+        threshold (float, optional): Default=0.9. Minimum absolute correlation / Cramér's V
+
+    Returns:
+        pandas.DataFrame: with columns "column_x", "column_y" and "value", sorted by absolute value
+    """
+    return check.get_correlated_pairs(corr_df, threshold)
+
+
 def get_columns_in_dfs(df_list: list, name_list: list) -> pandas.DataFrame:
     """
     Summarize df names and column name in multiple pandas.DataFrame
@@ -94,7 +333,8 @@ def get_columns_in_dfs(df_list: list, name_list: list) -> pandas.DataFrame:
 
 def get_fk_coverage(
     fk_df: pandas.DataFrame, k_df: pandas.DataFrame, fk_columns: StrOrList, k_columns: StrOrList,
-    do_print: bool = True) -> float:
+    do_print: bool = True, method: str = "exact", false_positive_rate: float = sketch.DEFAULT_ERROR_RATE,
+    num_samples: int = fk_coverage.DEFAULT_NUM_SAMPLES, return_report: bool = False) -> Union[float, dict]:
     """
     Check how many keys in `fk_df.fk_columns` exists in `k_df.k_columns`
     Args:
@@ -103,11 +343,44 @@ def get_fk_coverage(
         fk_columns (str or list of str): FK columns
         k_columns (str or list of str): K columns
         do_print (bool): If True, print results
+        method (str, optional): Default="exact". If "bloom", keys in `k_df` are kept in Bloom filter
+            instead of exact values (for very large `k_df`, coverage may be overestimated by false positives)
+        false_positive_rate (float, optional): False positive rate of Bloom filter for method="bloom"
+        num_samples (int, optional): The number of orphan keys (keys not in `k_df`) in report
+        return_report (bool, optional): Default=False. If True, return report dictionary
 
     Returns:
-        float: ratio of records in `fk_df.fk_columns` which has records in `k_df.k_columns`
+        float: ratio of records in `fk_df.fk_columns` which has records in `k_df.k_columns`,
+        or dict if `return_report` is True with key_coverage, row_coverage (ratio weighted by rows),
+        num_keys, num_covered_keys, num_rows, num_covered_rows, num_null_rows,
+        fan_out (pandas.DataFrame of the number of keys for each number of rows per key)
+        and orphan_samples (pandas.DataFrame of orphan keys with the most rows)
     """
-    return check.get_fk_coverage(fk_df, k_df, fk_columns, k_columns, do_print)
+    return check.get_fk_coverage(
+        fk_df, k_df, fk_columns, k_columns, do_print, method, false_positive_rate, num_samples, return_report)
+
+
+def discover_fks(df_list: Union[list, dict], name_list: list = None, min_coverage: float = 0.9,
+                 min_key_uniqueness: float = 0.99, num_hashes: int = fk_discovery.DEFAULT_NUM_HASHES,
+                 false_positive_rate: float = sketch.DEFAULT_ERROR_RATE) -> pandas.DataFrame:
+    """
+    Find likely FK relationships (FK column -> unique K column) across multiple pandas.DataFrame
+    without checking every pair: each column is sketched once, pairs are pruned by dtype,
+    the number of distinct values and estimated coverage, then only remaining pairs are verified exactly
+    Args:
+        df_list (list of pandas.DataFrame, or dict): Data frames, or dictionary of them (e.g. DfDictLoader.load)
+        name_list (list of str, optional): Name of each data frame (not required for dictionary)
+        min_coverage (float, optional): Default=0.9. Minimum ratio of FK values which exist in K column
+        min_key_uniqueness (float, optional): Default=0.99. Minimum ratio of distinct values to non-null values
+            for K column
+        num_hashes (int, optional): The number of distinct values sampled for each column to estimate coverage
+        false_positive_rate (float, optional): False positive rate of Bloom filter for K columns
+
+    Returns:
+        pandas.DataFrame: with columns "fk_table", "fk_column", "k_table", "k_column", "key_coverage",
+        "row_coverage", "estimated_coverage", "num_keys" and "num_covered_keys", ranked by coverage
+    """
+    return check.discover_fks(df_list, name_list, min_coverage, min_key_uniqueness, num_hashes, false_positive_rate)
 
 
 def plot_histogram(series: pandas.Series, num_bins: int = 50, normalize: bool = False,
@@ -169,6 +442,21 @@ def plot_heatmap(df: pandas.DataFrame, column_x: str, column_y: str, num_bins_x:
     return scatter.plot_heatmap(df, column_x, column_y, num_bins_x, num_bins_y, xmin, xmax, ymin, ymax)
 
 
+def plot_correlation_heatmap(corr_df: pandas.DataFrame,
+                             max_columns: int = correlation_vis.DEFAULT_MAX_COLUMNS) -> altair.Chart:
+    """
+    Plot correlation matrix as heatmap with altair
+    Args:
+        corr_df (pandas.DataFrame): Result of `check_correlations`
+        max_columns (int, optional): Default=50. If there are more columns, columns with the largest
+            absolute correlation to another column are plotted
+
+    Returns:
+        altair.Chart
+    """
+    return correlation_vis.plot_correlation_heatmap(corr_df, max_columns)
+
+
 def plot_aggy(df: pandas.DataFrame, column_x: str, column_y: str, agg: str = "sum",
               freq: str = None, num_bins: int = 50, mark: str = "bar", fill_empty: bool = None,
               xmin: Orderable = None, xmax: Orderable = None) -> altair.Chart:
@@ -196,3 +484,10 @@ def plot_aggy(df: pandas.DataFrame, column_x: str, column_y: str, agg: str = "su
 
 
 DfDictLoader = df_dict_loader.DfDictLoader
+SchemaMismatchError = pandas_csv.SchemaMismatchError
+CsvCache = csv_cache.CsvCache
+CsvTailReader = tail_reader.CsvTailReader
+StatAccumulator = chunk_stat.StatAccumulator
+StatCache = stat_cache.StatCache
+ReservoirSampler = sample_stat.ReservoirSampler
+AlertRule = alert.AlertRule
@@ -6,8 +6,16 @@ from .api import *
 
 __all__ = [
     "check_stats",
+    "check_alerts",
     "check_series",
     "get_unique_values",
+    "count_unique_values",
+    "count_duplicated_rows",
+    "check_missing_patterns",
+    "check_correlations",
+    "get_correlated_pairs",
     "get_columns_in_dfs",
-    "get_fk_coverage"
+    "get_fk_coverage",
+    "discover_fks",
+    "discover_unique_keys"
 ]
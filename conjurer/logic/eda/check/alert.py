@@ -1,50 +1,99 @@
-from datetime import datetime
+"""Alerts on column statistics (stat_df of calc_column_stat) by rules evaluated over all columns at once."""
 
-UB_MISSING_RATIO=0.5
-UB_UNIQUE_COUNT=1000
+import numpy
+import pandas
+from pandas.api import types
 
+UB_MISSING_RATIO = 0.5
+UB_UNIQUE_COUNT = 1000
+UB_OUTLIER_RATIO = 0.01
+MIN_TIMESTAMP = pandas.Timestamp(1900, 1, 1, tz="UTC")
+MAX_TIMESTAMP = pandas.Timestamp(2999, 12, 31, tz="UTC")
+LEVELS = ["ERROR", "WARN"]
+ALERT_COLUMN_NAMES = ["column_name", "level", "rule", "message"]
 
-def alert_columns(stat_df):
-    alert_list = []
-    for index, record in stat_df.iterrows():
-        alert_list.extend(_check_missing_ratio(record))
-        if record["adt"] == "datetime": alert_list.extend(_check_datetime_range(record))
-        if record["adt"] == "category": alert_list.extend(_check_unique_count(record))
-        if record["adt"] == "numeric": alert_list.extend(_check_outliers(record))
-    for alert in alert_list:
-        display(alert)
 
+class AlertRule(object):
+    """
+    Rule named `name` with `level` ("ERROR" or "WARN"). `predicate` takes the whole stat_df
+    (with "kind" column of "numeric", "datetime" or "other") and returns boolean values for its rows,
+    and `message` is formatted with fields of each alerted row
+    """
+    def __init__(self, name, level, predicate, message):
+        if level not in LEVELS:
+            raise ValueError("level must be one of {}; got {!r}".format(LEVELS, level))
+        self.name = name
+        self.level = level
+        self.predicate = predicate
+        self.message = message
 
-def _check_unique_count(record):
-    alert_list = [ _generate_alert_message(
-                    "WARN", record["column_name"], "too many unique values {0}".format(record["unique_count"]))] \
-                            if record["unique_count"] > UB_UNIQUE_COUNT else \
-                            [_generate_alert_message("WARN", record["column_name"], "only single unique value")] \
-                                    if record["unique_count"] == 1 else []
-    return alert_list
+    def evaluate(self, stat_df):
+        is_alerted = pandas.Series(self.predicate(stat_df), index=stat_df.index).fillna(False).to_numpy(dtype=bool)
+        alerted_df = stat_df[is_alerted]
+        return pandas.DataFrame({
+            "column_name": alerted_df["column_name"].to_numpy(),
+            "level": self.level,
+            "rule": self.name,
+            "message": [self.message.format(**record) for record in alerted_df.to_dict("records")],
+        }, columns=ALERT_COLUMN_NAMES)
 
 
-def _check_datetime_range(record):
-    alert_list = []
-    if record["min"] < datetime.datetime(1900, 1, 1):
-        alert_list.append(_generate_alert_message(
-                "ERROR", record["column_name"], "too old timestamp value {0}".format(record["min"])))
-    if record["max"] > datetime.datetime(2999, 12, 31):
-        alert_list.append(_generate_alert_message(
-                "ERROR", record["column_name"], "too far future timestamp value {0}".format(record["min"])))
-    return alert_list 
+def alert_columns(stat_df, rules=None):
+    """
+    Evaluate `rules` (default: DEFAULT_RULES) over stat_df, and return alerts as pandas.DataFrame
+    with ALERT_COLUMN_NAMES in order of level and columns. Outlier rule needs stat_df with robust statistics
+    """
+    rules = DEFAULT_RULES if rules is None else rules
+    if len(rules) == 0:
+        return pandas.DataFrame(columns=ALERT_COLUMN_NAMES)
+    stat_df = stat_df.reset_index(drop=True).assign(kind=_get_kinds(stat_df["dtype"]))
+    alert_df = pandas.concat([rule.evaluate(stat_df) for rule in rules], ignore_index=True)
+    column_order = {c: i for i, c in enumerate(stat_df["column_name"])}
+    order = numpy.lexsort((alert_df["column_name"].map(column_order), alert_df["level"].map(LEVELS.index)))
+    return alert_df.iloc[order].reset_index(drop=True)
 
 
-def _check_missing_ratio(record):
-    alert_list = [_generate_alert_message(
-            "WARN", record["column_name"], "too many missing values {0}".format(record["ratio_na"]))] \
-                    if record["ratio_na"] > UB_MISSING_RATIO else []
-    return alert_list
+def _get_kinds(dtypes):
+    kinds = {}
+    for dtype in dtypes.unique():
+        try:
+            pandas_dtype = types.pandas_dtype(dtype)
+        except TypeError:
+            kinds[dtype] = "other"
+            continue
+        kinds[dtype] = "numeric" if types.is_numeric_dtype(pandas_dtype) \
+            else "datetime" if types.is_datetime64_any_dtype(pandas_dtype) else "other"
+    return dtypes.map(kinds).to_numpy()
 
 
-def _check_outliers(record):
-    return []
+def _to_utc(stat_df, column):
+    """Timestamps of datetime columns in UTC (naive timestamps are regarded as UTC), NaT for other columns"""
+    return pandas.to_datetime(
+        stat_df[column].where(stat_df["kind"] == "datetime").astype(object), utc=True, errors="coerce")
 
 
-def _generate_alert_message(error_type, column, message):
-    return "[{0}] column {1} : {2}".format(error_type, column, message)
+def _get_column(stat_df, column):
+    if column not in stat_df.columns:
+        return pandas.Series(numpy.nan, index=stat_df.index)
+    return pandas.to_numeric(stat_df[column], errors="coerce")
+
+
+DEFAULT_RULES = [
+    AlertRule(
+        "missing_ratio", "WARN", lambda df: _get_column(df, "ratio_na") > UB_MISSING_RATIO,
+        "too many missing values {ratio_na:.2%}"),
+    AlertRule(
+        "single_value", "WARN", lambda df: _get_column(df, "unique_count") == 1, "only single unique value"),
+    AlertRule(
+        "unique_count", "WARN",
+        lambda df: (df["kind"] == "other") & (_get_column(df, "unique_count") > UB_UNIQUE_COUNT),
+        "too many unique values {unique_count}"),
+    AlertRule(
+        "old_timestamp", "ERROR", lambda df: _to_utc(df, "min") < MIN_TIMESTAMP, "too old timestamp value {min}"),
+    AlertRule(
+        "future_timestamp", "ERROR", lambda df: _to_utc(df, "max") > MAX_TIMESTAMP,
+        "too far future timestamp value {max}"),
+    AlertRule(
+        "outliers", "WARN", lambda df: _get_column(df, "ratio_outlier") > UB_OUTLIER_RATIO,
+        "{ratio_outlier:.2%} of values are outside of [{lower_fence}, {upper_fence}] (1.5 IQR from quartiles)"),
+]
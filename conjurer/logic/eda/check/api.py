@@ -2,16 +2,36 @@ import pandas
 from pandas.api import types
 from IPython.display import display
 
-from conjurer.logic.eda.check import stat_calculator
+from conjurer.logic.eda.check import (
+    stat_calculator,
+    sketch,
+    chunk_stat,
+    fk_coverage,
+    fk_discovery,
+    key_discovery,
+    series_stat,
+    sample_stat,
+    alert,
+    missing_pattern,
+    correlation
+)
 from conjurer.logic.eda.vis import histogram
 
 
-def check_stats(df, skip_histogram=False):
+def check_stats(df, skip_histogram=False, approx=False, error_rate=sketch.DEFAULT_ERROR_RATE, n_jobs=None,
+                executor="thread", cache=None, sample=None, strata=None, confidence=sample_stat.DEFAULT_CONFIDENCE,
+                robust=False):
+    if sample is not None:
+        if robust:
+            raise ValueError("robust statistics are not supported for sample")
+        return _check_stats_for_sample(df, skip_histogram, sample, strata, confidence)
+    if not isinstance(df, pandas.DataFrame):
+        return _check_stats_for_chunks(df, skip_histogram, error_rate)
     print("[table-wise confirmation]")
     print("shape: {}x{}".format(len(df), len(df.columns)))
     print("duplication: {}".format(stat_calculator.count_duplicated_rows(df)))
     print("[column-wise confirmation]")
-    stat_df = stat_calculator.calc_column_stat(df)
+    stat_df = stat_calculator.calc_column_stat(df, approx, error_rate, n_jobs, executor, cache, robust)
     display(stat_df)
     if not skip_histogram:
         print("[histogram]")
@@ -21,22 +41,80 @@ def check_stats(df, skip_histogram=False):
     return stat_df
 
 
+def _check_stats_for_chunks(chunks, skip_histogram, error_rate):
+    accumulator = chunk_stat.StatAccumulator(error_rate=error_rate).update_all(chunks)
+    if accumulator.dtypes is None:
+        raise ValueError("chunks must include at least one data frame; got no chunks")
+    print("[table-wise confirmation]")
+    print("shape: {}x{}".format(accumulator.num_rows, len(accumulator.dtypes)))
+    print("duplication: skipped for chunks")
+    print("[column-wise confirmation]")
+    stat_df = accumulator.get_stat_df()
+    display(stat_df)
+    if not skip_histogram:
+        print("[histogram]")
+        histogram.plot_histogram_for_accumulator(accumulator)
+    print("[head]")
+    display(accumulator.head)
+    return stat_df
+
+
+def _check_stats_for_sample(df, skip_histogram, sample, strata, confidence):
+    chunks = [df] if isinstance(df, pandas.DataFrame) else df
+    sampler = sample_stat.ReservoirSampler(sample, strata).update_all(chunks)
+    if sampler.dtypes is None:
+        raise ValueError("chunks must include at least one data frame; got no chunks")
+    print("[table-wise confirmation]")
+    print("shape: {}x{}".format(sampler.num_rows, len(sampler.dtypes)))
+    print("duplication: skipped for sample ({} rows)".format(len(sampler.sample)))
+    print("[column-wise confirmation (estimated from sample, {:.0%} confidence intervals)]".format(confidence))
+    stat_df = sampler.get_stat_df(confidence)
+    display(stat_df)
+    if not skip_histogram:
+        print("[histogram of sample]")
+        histogram.plot_histogram_for_stats(sampler.sample, stat_df)
+    print("[head]")
+    display(sampler.head)
+    return stat_df
+
+
+def check_alerts(stat_df, rules=None):
+    return alert.alert_columns(stat_df, rules)
+
+
 def check_series(df, unit_keys):
-    grb_obj = df.groupby(unit_keys)
-    args_dict = {"count": grb_obj.count().apply(max, axis=1)}
-    for c in df.columns:
-        if c in unit_keys:
-            continue
-        cnames, values = stat_calculator.calculate_series_stats(c, df[c].dtype, grb_obj)
-        for c, v in zip(cnames, values):
-            args_dict[c] = v
-    return pandas.DataFrame(args_dict)
+    return series_stat.calc_series_stat(df, unit_keys)
 
 
 def get_unique_values(df, columns):
     return stat_calculator.get_unique_values(df, columns)
 
 
+def count_duplicated_rows(df, return_groups=False):
+    return stat_calculator.count_duplicated_rows(df, return_groups)
+
+
+def count_unique_values(df, columns, approx=False, error_rate=sketch.DEFAULT_ERROR_RATE):
+    return stat_calculator.count_unique_values(df, columns, approx, error_rate)
+
+
+def discover_unique_keys(df, max_columns=key_discovery.DEFAULT_MAX_COLUMNS,
+                         sample_rows=key_discovery.DEFAULT_SAMPLE_ROWS, columns=None):
+    return key_discovery.discover_unique_keys(df, max_columns, sample_rows, columns)
+
+
+def check_missing_patterns(df, top_n=missing_pattern.DEFAULT_TOP_N):
+    return missing_pattern.calc_missing_patterns(df, top_n)
+
+
+def check_correlations(df, method="pearson", max_categories=correlation.DEFAULT_MAX_CATEGORIES):
+    return correlation.calc_correlations(df, method, max_categories)
+
+
+def get_correlated_pairs(corr_df, threshold=correlation.DEFAULT_THRESHOLD):
+    return correlation.get_correlated_pairs(corr_df, threshold)
+
+
 def get_columns_in_dfs(df_list, name_list):
     return pandas.concat([
         pandas.DataFrame({
@@ -48,7 +126,15 @@ def get_columns_in_dfs(df_list, name_list):
     ], ignore_index=True)
 
 
-def get_fk_coverage(fk_df, k_df, fk_columns, k_columns, do_print=True):
+def discover_fks(df_list, name_list=None, min_coverage=0.9, min_key_uniqueness=0.99,
+                 num_hashes=fk_discovery.DEFAULT_NUM_HASHES, false_positive_rate=sketch.DEFAULT_ERROR_RATE):
+    df_dict = df_list if isinstance(df_list, dict) else dict(zip(name_list, df_list))
+    return fk_discovery.discover_fks(df_dict, min_coverage, min_key_uniqueness, num_hashes, false_positive_rate)
+
+
+def get_fk_coverage(fk_df, k_df, fk_columns, k_columns, do_print=True, method="exact",
+                    false_positive_rate=sketch.DEFAULT_ERROR_RATE, num_samples=fk_coverage.DEFAULT_NUM_SAMPLES,
+                    return_report=False):
     """
     Check how many keys in the first df exist in the second df
     Parameters
@@ -58,16 +144,22 @@ def get_fk_coverage(fk_df, k_df, fk_columns, k_columns, do_print=True):
     fk_columns : str or list of str
     k_columns : str or list of str
     do_print : bool
+    method : str
+        "exact" or "bloom" (keys in k_df are kept in Bloom filter)
+    false_positive_rate : float
+    num_samples : int
+        The number of orphan keys in report
+    return_report : bool
 
     Returns
     -------
-    float
+    float, or dict if return_report is True
 
     """
-    keys_in_fk_df = get_unique_values(fk_df, fk_columns)
-    keys_in_k_df = get_unique_values(k_df, k_columns)
-    num_intersection = len(keys_in_fk_df.intersection(keys_in_k_df))
-    num_target_keys = len(keys_in_fk_df)
+    report = fk_coverage.calc_fk_coverage(
+        fk_df, k_df, fk_columns, k_columns, method, false_positive_rate, num_samples)
     if do_print:
-        print("{:.2%} ({} / {})".format(num_intersection / num_target_keys, num_intersection, num_target_keys))
-    return num_intersection / num_target_keys
+        print("{:.2%} ({} / {})".format(report["key_coverage"], report["num_covered_keys"], report["num_keys"]))
+        print("row-weighted: {:.2%} ({} / {})".format(
+            report["row_coverage"], report["num_covered_rows"], report["num_rows"]))
+    return report if return_report else report["key_coverage"]
@@ -0,0 +1,152 @@
+"""Column statistics accumulated over data frame chunks in one pass."""
+
+import logging
+
+import numpy
+import pandas
+from pandas.api import types
+
+from conjurer.logic.eda.check import sketch, stat_calculator, column_state
+from conjurer.logic.eda.vis import binning
+
+
+logger = logging.getLogger(__name__)
+
+# Value counts of categorical columns are exact up to this number of distinct values, then only top values are kept
+MAX_TRACKED_VALUES = 10000
+
+
+class StatAccumulator(object):
+    """
+    Accumulate the same statistics as `calc_column_stat` over chunks with memory independent of the number of rows.
+    Count, min, max, null and zero ratios are exact, mean / std are merged by Welford's method,
+    unique_count is estimated by HyperLogLog, and percentiles / histograms are estimated by t-digest style sketch
+    """
+    def __init__(self, num_bins=50, error_rate=sketch.DEFAULT_ERROR_RATE, compression=sketch.DEFAULT_COMPRESSION):
+        self.num_bins = num_bins
+        self.error_rate = error_rate
+        self.compression = compression
+        self.num_rows = 0
+        self.dtypes = None
+        self.head = None
+        self._column_accumulators = {}
+
+    def update(self, df):
+        if self.dtypes is None:
+            self.dtypes = df.dtypes
+            self.head = df.head()
+        self.num_rows += len(df)
+        for c in df.columns:
+            if c not in self._column_accumulators:
+                self._column_accumulators[c] = _ColumnAccumulator(
+                    df.dtypes[c], self.num_bins, self.error_rate, self.compression)
+            self._column_accumulators[c].update(df[c])
+        return self
+
+    def update_all(self, chunks):
+        for i, chunk in enumerate(chunks):
+            logger.info("...accumulating chunk {} ({} rows)".format(i, len(chunk)))
+            self.update(chunk)
+        return self
+
+    def get_stat_df(self):
+        records = [
+            {"column_name": c, **accumulator.state.get_stat()}
+            for c, accumulator in self._column_accumulators.items()
+        ]
+        return pandas.DataFrame(records, columns=stat_calculator.STAT_COLUMN_NAMES, index=[0] * len(records))
+
+    def get_percentiles(self, ratio_list):
+        """Percentiles of numeric / datetime columns as `calculate_percentiles_for_df`"""
+        columns = [c for c, accumulator in self._column_accumulators.items() if accumulator.digest is not None]
+        value_dic = {
+            "name": ["min"] + ["{0:.2%}-percentile".format(ratio) for ratio in ratio_list] + ["max"],
+            **{
+                c: self._column_accumulators[c].get_percentiles([0] + list(ratio_list) + [1])
+                for c in columns
+            }
+        }
+        return pandas.DataFrame(value_dic, columns=["name"] + columns).set_index("name")
+
+    def get_frequency_table(self, column):
+        """Frequency table in the same format as `binning.create_frequency_table`"""
+        return self._column_accumulators[column].get_frequency_table(column)
+
+
+class _ColumnAccumulator(object):
+    def __init__(self, dtype, num_bins, error_rate, compression):
+        self.dtype = dtype
+        self.num_bins = num_bins
+        self.is_datetime = types.is_datetime64_any_dtype(dtype)
+        self.state = column_state.ColumnState(dtype, approx=True, error_rate=error_rate)
+        is_quantitative = (self.state.is_numeric and not types.is_bool_dtype(dtype)) or self.is_datetime
+        self.digest = sketch.QuantileDigest(compression) if is_quantitative else None
+        # integer columns with less unique values than num_bins are plotted as categories
+        self.value_counts = None if types.is_float_dtype(dtype) or self.is_datetime else pandas.Series(dtype=float)
+        self.num_other_values = 0
+
+    def update(self, series):
+        is_na = series.isna()
+        valid = series[~is_na]
+        self.state.update_valid(valid, int(is_na.sum()))
+        if self.digest is not None:
+            self.digest.update(self._to_float(valid))
+        if self.value_counts is not None:
+            self._update_value_counts(valid)
+
+    def get_percentiles(self, ratio_list):
+        values = self.digest.quantile(ratio_list)
+        if self.is_datetime:
+            return [pandas.NaT if numpy.isnan(v) else pandas.Timestamp(int(v), tz=getattr(self.dtype, "tz", None))
+                    for v in values]
+        return values
+
+    def get_frequency_table(self, name):
+        if self.value_counts is not None and (self.digest is None or len(self.value_counts) < self.num_bins):
+            return self._get_categorical_frequency_table(name)
+        if self.state.min is None:
+            raise binning.BinCreationError("all values are null")
+        if self.state.max == self.state.min:
+            raise binning.BinCreationError("min == max")
+        lb_list, ub_list, _ = binning.get_bin_config(self.state.min, self.state.max, self.num_bins)
+        edges = numpy.array([self._to_float_scalar(v) for v in lb_list + ub_list[-1:]])
+        cumulative_counts = self.digest.cdf(edges) * self.digest.count
+        cumulative_counts[0], cumulative_counts[-1] = 0, self.digest.count
+        count_array = numpy.round(numpy.diff(cumulative_counts)).astype(numpy.int64)
+        return pandas.DataFrame({
+            "{}_lb".format(name): lb_list,
+            "{}_ub".format(name): ub_list,
+            binning.FREQUENCY_CNAME: count_array,
+            binning.RATIO_CNAME: count_array / count_array.sum()
+        })
+
+    def _get_categorical_frequency_table(self, name):
+        vcounts = self.value_counts.sort_values(ascending=False, kind="stable").astype(numpy.int64)
+        if len(vcounts) > self.num_bins or self.num_other_values > 0:
+            other_counts = int(vcounts.iloc[self.num_bins:].sum()) + self.num_other_values
+            vcounts = pandas.concat([vcounts.iloc[:self.num_bins], pandas.Series([other_counts], index=["OTHER"])])
+        return pandas.DataFrame({
+            name: list(vcounts.index),
+            binning.FREQUENCY_CNAME: list(vcounts.values),
+            binning.RATIO_CNAME: list(vcounts / vcounts.sum())
+        })
+
+    def _update_value_counts(self, valid):
+        vcounts = binning.get_categorical_value_counts(valid)
+        self.value_counts = self.value_counts.add(vcounts, fill_value=0)
+        if self.digest is not None and len(self.value_counts) >= self.num_bins:
+            # integer column is quantitative, value counts are no longer needed
+            self.value_counts = None
+        elif len(self.value_counts) > MAX_TRACKED_VALUES:
+            self.value_counts = self.value_counts.sort_values(ascending=False, kind="stable")
+            self.num_other_values += int(self.value_counts.iloc[MAX_TRACKED_VALUES:].sum())
+            self.value_counts = self.value_counts.iloc[:MAX_TRACKED_VALUES]
+
+    def _to_float(self, valid):
+        if self.is_datetime:
+            return pandas.DatetimeIndex(valid).as_unit("ns").asi8.astype(numpy.float64)
+        return valid.to_numpy(dtype=numpy.float64)
+
+    def _to_float_scalar(self, value):
+        return float(pandas.Timestamp(value).value) if self.is_datetime else float(value)
+
@@ -0,0 +1,106 @@
+"""Mergeable statistics of one column shared by chunked, cached and sampled column statistics."""
+
+import copy
+
+import numpy
+import pandas
+from pandas.api import types
+
+from conjurer.logic.eda.check import sketch, stat_calculator
+
+
+class ColumnState(object):
+    """
+    Row / null / zero counts, min, max, moments (mean / std) and unique count of one column,
+    which are updated by chunks and merged with the state of other rows. Unique values are kept exactly
+    (in the canonical form of `calc_column_stat`), or counted by HyperLogLog if `approx`,
+    or not counted if `count_unique` is False
+    """
+    def __init__(self, dtype, approx=False, error_rate=sketch.DEFAULT_ERROR_RATE, count_unique=True):
+        self.dtype = dtype
+        self.is_numeric = types.is_numeric_dtype(dtype)
+        self.is_orderable = self.is_numeric or types.is_datetime64_any_dtype(dtype)
+        self.num_rows = 0
+        self.num_na = 0
+        self.num_zero = 0
+        self.min = None
+        self.max = None
+        self.moments = sketch.Moments() if self.is_numeric else None
+        self.uniques = pandas.Series(dtype=object) if count_unique and not approx else None
+        self.hll = sketch.HyperLogLog(error_rate) if count_unique and approx else None
+
+    @classmethod
+    def from_series(cls, series, approx=False, error_rate=sketch.DEFAULT_ERROR_RATE):
+        return cls(series.dtype, approx, error_rate).update(series)
+
+    def update(self, series):
+        is_na = series.isna()
+        return self.update_valid(series[~is_na], int(is_na.sum()))
+
+    def update_valid(self, valid, num_na):
+        """Update with non-null values `valid` of a chunk which has `num_na` null values"""
+        self.num_rows += len(valid) + num_na
+        self.num_na += num_na
+        if len(valid) > 0 and self.is_orderable:
+            minv, maxv = valid.min(), valid.max()
+            self.min = minv if self.min is None else min(self.min, minv)
+            self.max = maxv if self.max is None else max(self.max, maxv)
+        if self.moments is not None:
+            values = valid.to_numpy(dtype=numpy.float64)
+            self.moments.update(values)
+            self.num_zero += int(numpy.count_nonzero(values == 0))
+        if self.hll is not None:
+            self.hll.update(stat_calculator.hash_values(valid))
+        elif self.uniques is not None:
+            self.uniques = _union(self.uniques, valid)
+        return self
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def merge(self, other):
+        self.num_rows += other.num_rows
+        self.num_na += other.num_na
+        self.num_zero += other.num_zero
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        if self.moments is not None:
+            self.moments.merge(other.moments)
+        if self.hll is not None:
+            self.hll.merge(other.hll)
+        elif self.uniques is not None:
+            self.uniques = _union(self.uniques, other.uniques)
+        return self
+
+    def get_unique_count(self):
+        if self.hll is not None:
+            return min(self.hll.count(), self.num_rows - self.num_na)
+        return None if self.uniques is None else len(self.uniques)
+
+    def get_stat(self):
+        unique_count = self.get_unique_count()
+        return {
+            "dtype": str(self.dtype),
+            "min": pandas.NA if self.min is None else self.min,
+            "max": pandas.NA if self.max is None else self.max,
+            "mean": self.moments.get_mean() if self.is_numeric else pandas.NA,
+            "std": self.moments.get_std() if self.is_numeric else pandas.NA,
+            "ratio_na": stat_calculator.calc_ratio(self.num_na, self.num_rows),
+            "ratio_zero":
+                stat_calculator.calc_ratio(self.num_zero, self.num_rows) if self.is_numeric else pandas.NA,
+            "unique_count": unique_count,
+            "is_unique": unique_count == self.num_rows,
+        }
+
+    @property
+    def nbytes(self):
+        if self.hll is not None:
+            return self.hll.registers.nbytes
+        return 0 if self.uniques is None else int(self.uniques.memory_usage(index=False, deep=True))
+
+
+def _union(uniques, values):
+    # the same canonical form (nested values as JSON strings, 1 / 1.0 / True as 1) as unique_count of calc_column_stat
+    values = values if len(uniques) == 0 else pandas.concat([uniques, values], ignore_index=True)
+    return stat_calculator.to_canonical(values).drop_duplicates().reset_index(drop=True)
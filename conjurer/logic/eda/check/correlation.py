@@ -0,0 +1,202 @@
+"""Correlation of numeric column pairs and Cramér's V of categorical column pairs, computed block by block."""
+
+import logging
+
+import numpy
+import pandas
+from pandas.api import types
+
+from conjurer.logic.eda.check import stat_calculator
+
+
+logger = logging.getLogger(__name__)
+
+METHODS = ["pearson", "spearman"]
+# Categorical columns with more categories than this (e.g. IDs) are excluded from Cramér's V
+DEFAULT_MAX_CATEGORIES = 100
+DEFAULT_THRESHOLD = 0.9
+# Loaded (standardized / ranked) blocks are kept up to this size, so that each column is loaded once
+CACHE_BYTES = 1024 ** 3
+PAIR_COLUMN_NAMES = ["column_x", "column_y", "value"]
+
+
+def calc_correlations(df, method="pearson", max_categories=DEFAULT_MAX_CATEGORIES):
+    """
+    Square matrix of Pearson / Spearman correlations between numeric columns (pairwise complete rows)
+    and Cramér's V between categorical columns (NaN between numeric and categorical columns).
+    Numeric columns are standardized block by block, so that only two blocks of columns fitting in
+    BLOCK_BYTES and the result matrix are kept in memory, and each pair of blocks is one matrix multiplication.
+    Spearman ranks each column once over its own non-null values, not over pairwise complete rows as
+    `DataFrame.corr(method="spearman")`, so the two differ when there are nulls
+    """
+    if method not in METHODS:
+        raise ValueError("method must be one of {}; got {!r}".format(METHODS, method))
+    numeric_columns = [c for c in df.columns if _is_numeric(df.dtypes[c])]
+    categorical_columns = [
+        c for c in df.columns
+        if c not in numeric_columns and not types.is_datetime64_any_dtype(df.dtypes[c])
+    ]
+    codes = _factorize_categories(df, categorical_columns, max_categories)
+    columns = numeric_columns + list(codes.keys())
+    corr_df = pandas.DataFrame(numpy.nan, index=columns, columns=columns)
+    if len(numeric_columns) > 0:
+        corr_df.loc[numeric_columns, numeric_columns] = _calc_numeric_correlations(df, numeric_columns, method)
+    if len(codes) > 0:
+        corr_df.loc[list(codes.keys()), list(codes.keys())] = _calc_cramers_v(codes)
+    return corr_df
+
+
+def get_correlated_pairs(corr_df, threshold=DEFAULT_THRESHOLD):
+    """Pairs of different columns whose absolute correlation / Cramér's V is at least `threshold`"""
+    values = corr_df.to_numpy()
+    rows, columns = numpy.nonzero(numpy.triu(numpy.abs(numpy.nan_to_num(values)) >= threshold, k=1))
+    pair_df = pandas.DataFrame({
+        "column_x": corr_df.index[rows],
+        "column_y": corr_df.columns[columns],
+        "value": values[rows, columns],
+    }, columns=PAIR_COLUMN_NAMES)
+    return pair_df.iloc[numpy.argsort(-pair_df["value"].abs().to_numpy(), kind="stable")].reset_index(drop=True)
+
+
+def _is_numeric(dtype):
+    return types.is_numeric_dtype(dtype) and not types.is_bool_dtype(dtype)
+
+
+def _calc_numeric_correlations(df, columns, method):
+    # values of a block fit in BLOCK_BYTES (up to 3 times with their squares and validity)
+    block_columns = max(1, stat_calculator.BLOCK_BYTES // max(8 * len(df), 1))
+    # columns without null are blocked together, so that their tiles need no validity mask
+    has_null = numpy.array([df[c].hasnans for c in columns])
+    order = numpy.argsort(has_null, kind="stable")
+    sorted_columns = [columns[k] for k in order]
+    blocks = [sorted_columns[i:i + block_columns] for i in range(0, len(columns), block_columns)]
+    result = numpy.full((len(columns), len(columns)), numpy.nan)
+    offsets = numpy.cumsum([0] + [len(block) for block in blocks])
+    loaded_blocks = {}
+    cached_bytes = 0
+    for i, block_i in enumerate(blocks):
+        logger.info("...correlations of columns {} - {}".format(offsets[i], offsets[i + 1] - 1))
+        # block i is not used after this row of tiles
+        loaded_i = loaded_blocks.pop(i) if i in loaded_blocks else _load_block(df, block_i, method)
+        for j in range(i, len(blocks)):
+            if i == j:
+                loaded_j = loaded_i
+            elif j in loaded_blocks:
+                loaded_j = loaded_blocks[j]
+            else:
+                loaded_j = _load_block(df, blocks[j], method)
+                if cached_bytes + _get_nbytes(loaded_j) <= CACHE_BYTES:
+                    loaded_blocks[j] = loaded_j
+                    cached_bytes += _get_nbytes(loaded_j)
+            tile = _calc_tile(loaded_i, loaded_j)
+            result[offsets[i]:offsets[i + 1], offsets[j]:offsets[j + 1]] = tile
+            result[offsets[j]:offsets[j + 1], offsets[i]:offsets[i + 1]] = tile.T
+    positions = numpy.argsort(order)
+    return result[numpy.ix_(positions, positions)]
+
+
+def _load_block(df, columns, method):
+    """Standardized values (0 for null), their squares and validity (None if all valid) of columns"""
+    values = numpy.empty((len(df), len(columns)), order="F")
+    for k, c in enumerate(columns):
+        series = df[c].rank() if method == "spearman" else df[c]
+        values[:, k] = series.to_numpy(dtype=numpy.float64, na_value=numpy.nan)
+    is_invalid = ~numpy.isfinite(values)
+    has_invalid = is_invalid.any()
+    num_valid = len(df) - is_invalid.sum(axis=0)
+    if has_invalid:
+        values[is_invalid] = 0.0
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        means = numpy.nan_to_num(values.sum(axis=0) / num_valid)
+        values -= means
+        if has_invalid:
+            values[is_invalid] = 0.0
+        stds = numpy.sqrt((values ** 2).sum(axis=0) / num_valid)
+    stds[~(stds > 0)] = 1.0
+    values /= stds
+    return {
+        "values": values,
+        "squares": values ** 2,
+        "mask": (~is_invalid).astype(numpy.float64) if has_invalid else None,
+    }
+
+
+def _get_nbytes(loaded):
+    return sum(array.nbytes for array in loaded.values() if array is not None)
+
+
+def _calc_tile(loaded_i, loaded_j):
+    """
+    Pearson correlation of pairwise complete rows: sums over rows where both columns are valid are
+    matrix products of standardized values (0 for null), their squares and validity masks
+    """
+    values_i, values_j = loaded_i["values"], loaded_j["values"]
+    mask_i, mask_j = loaded_i["mask"], loaded_j["mask"]
+    sum_xy = values_i.T @ values_j
+    shape = sum_xy.shape
+    if mask_j is None:
+        sum_x = numpy.broadcast_to(values_i.sum(axis=0)[:, numpy.newaxis], shape)
+        sum_xx = numpy.broadcast_to(loaded_i["squares"].sum(axis=0)[:, numpy.newaxis], shape)
+    else:
+        sum_x = values_i.T @ mask_j
+        sum_xx = loaded_i["squares"].T @ mask_j
+    if mask_i is None:
+        sum_y = numpy.broadcast_to(values_j.sum(axis=0)[numpy.newaxis, :], shape)
+        sum_yy = numpy.broadcast_to(loaded_j["squares"].sum(axis=0)[numpy.newaxis, :], shape)
+    elif loaded_i is loaded_j:
+        sum_y, sum_yy = sum_x.T, sum_xx.T
+    else:
+        sum_y = mask_i.T @ values_j
+        sum_yy = mask_i.T @ loaded_j["squares"]
+    if mask_i is None and mask_j is None:
+        num_rows = numpy.full(shape, float(len(values_i)))
+    elif mask_j is None:
+        num_rows = numpy.broadcast_to(mask_i.sum(axis=0)[:, numpy.newaxis], shape)
+    elif mask_i is None:
+        num_rows = numpy.broadcast_to(mask_j.sum(axis=0)[numpy.newaxis, :], shape)
+    else:
+        num_rows = mask_i.T @ mask_j
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        covariance = num_rows * sum_xy - sum_x * sum_y
+        variance_x = num_rows * sum_xx - sum_x ** 2
+        variance_y = num_rows * sum_yy - sum_y ** 2
+        tile = covariance / numpy.sqrt(variance_x * variance_y)
+    tile[~((variance_x > 1e-12 * num_rows ** 2) & (variance_y > 1e-12 * num_rows ** 2))] = numpy.nan
+    return numpy.clip(tile, -1.0, 1.0)
+
+
+def _factorize_categories(df, columns, max_categories):
+    codes = {}
+    for c in columns:
+        column_codes, uniques = pandas.factorize(stat_calculator.to_canonical(df[c]))
+        if 1 < len(uniques) <= max_categories:
+            codes[c] = (column_codes, len(uniques))
+        else:
+            logger.info("{} is excluded from Cramér's V ({} categories)".format(c, len(uniques)))
+    return codes
+
+
+def _calc_cramers_v(codes):
+    columns = list(codes.keys())
+    result = numpy.eye(len(columns))
+    for i in range(len(columns)):
+        codes_i, num_categories_i = codes[columns[i]]
+        for j in range(i + 1, len(columns)):
+            codes_j, num_categories_j = codes[columns[j]]
+            is_valid = (codes_i >= 0) & (codes_j >= 0)
+            table = numpy.bincount(
+                codes_i[is_valid] * num_categories_j + codes_j[is_valid],
+                minlength=num_categories_i * num_categories_j).reshape(num_categories_i, num_categories_j)
+            result[i, j] = result[j, i] = _cramers_v(table)
+    return result
+
+
+def _cramers_v(table):
+    """Cramér's V from contingency counts (categories which do not appear are ignored)"""
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0].astype(numpy.float64)
+    num_rows = table.sum()
+    if min(table.shape) < 2:
+        return numpy.nan
+    expected = table.sum(axis=1)[:, numpy.newaxis] * table.sum(axis=0)[numpy.newaxis, :] / num_rows
+    chi2 = ((table - expected) ** 2 / expected).sum()
+    return float(numpy.sqrt(chi2 / num_rows / (min(table.shape) - 1)))
@@ -0,0 +1,88 @@
+"""Coverage of foreign keys in key table, computed by vectorized key factorization / hashing."""
+
+import numpy
+import pandas
+
+from conjurer.logic.eda.check import sketch, stat_calculator
+
+
+METHODS = ["exact", "bloom"]
+DEFAULT_NUM_SAMPLES = 10
+
+
+def calc_fk_coverage(fk_df, k_df, fk_columns, k_columns, method="exact",
+                     false_positive_rate=sketch.DEFAULT_ERROR_RATE, num_samples=DEFAULT_NUM_SAMPLES):
+    """
+    Returns report dictionary of how many keys / rows in `fk_df` exist in `k_df`.
+    Rows with null in key columns are excluded as `get_unique_values`.
+    With method="bloom", keys in `k_df` are only kept in Bloom filter (coverage may be overestimated
+    by about `false_positive_rate`)
+    """
+    if method not in METHODS:
+        raise ValueError("method must be one of {}; got {!r}".format(METHODS, method))
+    fk_columns = _to_list(fk_columns)
+    k_columns = _to_list(k_columns)
+    if len(fk_columns) != len(k_columns):
+        raise ValueError("fk_columns and k_columns must have the same length; got {} and {}".format(
+            fk_columns, k_columns))
+    fk_key_values = fk_df[fk_columns].dropna()
+    k_keys = k_df[k_columns].dropna()
+    fk_keys, k_keys = _align_keys(fk_key_values, k_keys)
+    fk_keys = stat_calculator.to_canonical(fk_keys)
+    k_keys = stat_calculator.to_canonical(k_keys)
+    if method == "exact":
+        codes = stat_calculator.factorize_rows(pandas.concat([fk_keys, k_keys], ignore_index=True))
+        fk_codes = codes[:len(fk_keys)]
+        is_key = numpy.zeros(codes.max() + 1 if len(codes) > 0 else 0, dtype=bool)
+        is_key[codes[len(fk_keys):]] = True
+        is_row_covered = is_key[fk_codes]
+    else:
+        bloom_filter = sketch.BloomFilter(len(k_keys), false_positive_rate)
+        bloom_filter.add(stat_calculator.hash_values(k_keys))
+        fk_codes = stat_calculator.factorize_rows(fk_keys)
+        is_row_covered = bloom_filter.contains(stat_calculator.hash_values(fk_keys))
+    return _create_report(fk_df, fk_key_values, fk_codes, is_row_covered, num_samples)
+
+
+def _create_report(fk_df, fk_keys, fk_codes, is_row_covered, num_samples):
+    # codes of fk rows are 0, 1, ... in order of appearance (fk rows come first in "exact" method)
+    num_keys = int(fk_codes.max()) + 1 if len(fk_codes) > 0 else 0
+    rows_per_key = numpy.bincount(fk_codes, minlength=num_keys)
+    is_key_covered = numpy.zeros(num_keys, dtype=bool)
+    is_key_covered[fk_codes[is_row_covered]] = True
+    first_rows = numpy.unique(fk_codes, return_index=True)[1]
+    fan_out = pandas.Series(rows_per_key).value_counts().sort_index()
+    orphan_codes = numpy.flatnonzero(~is_key_covered)
+    orphan_codes = orphan_codes[numpy.argsort(-rows_per_key[orphan_codes], kind="stable")][:num_samples]
+    orphan_df = fk_keys.iloc[first_rows[orphan_codes]].reset_index(drop=True)
+    orphan_df["num_rows"] = rows_per_key[orphan_codes]
+    num_covered_keys = int(is_key_covered.sum())
+    num_covered_rows = int(is_row_covered.sum())
+    return {
+        "key_coverage": stat_calculator.calc_ratio(num_covered_keys, num_keys),
+        "row_coverage": stat_calculator.calc_ratio(num_covered_rows, len(fk_keys)),
+        "num_keys": num_keys,
+        "num_covered_keys": num_covered_keys,
+        "num_rows": len(fk_keys),
+        "num_covered_rows": num_covered_rows,
+        "num_null_rows": len(fk_df) - len(fk_keys),
+        "fan_out": pandas.DataFrame({"fan_out": fan_out.index, "num_keys": fan_out.values}),
+        "orphan_samples": orphan_df,
+    }
+
+
+def _align_keys(fk_keys, k_keys):
+    """Cast key columns to common dtypes with the same column names, so that equal values have equal hashes"""
+    k_keys = k_keys.set_axis(fk_keys.columns, axis=1)
+    for i in range(len(fk_keys.columns)):
+        fk_series, k_series = fk_keys.iloc[:, i], k_keys.iloc[:, i]
+        if fk_series.dtype != k_series.dtype:
+            dtype = pandas.concat([fk_series.iloc[:0], k_series.iloc[:0]]).dtype
+            fk_keys = fk_keys.astype({fk_keys.columns[i]: dtype})
+            k_keys = k_keys.astype({k_keys.columns[i]: dtype})
+    return fk_keys, k_keys
+
+
+def _to_list(columns):
+    return [columns] if isinstance(columns, str) else list(columns)
+
@@ -0,0 +1,117 @@
+"""Discover foreign key (inclusion dependency) candidates across tables with column sketches."""
+
+import logging
+
+import numpy
+import pandas
+from pandas.api import types
+
+from conjurer.logic.eda.check import sketch, stat_calculator, fk_coverage
+
+
+logger = logging.getLogger(__name__)
+
+# The number of the smallest distinct hash values kept for each column (bottom-k MinHash)
+DEFAULT_NUM_HASHES = 256
+# Candidates are verified if estimated coverage is at least min_coverage minus this margin
+COVERAGE_MARGIN = 0.1
+OUTPUT_COLUMN_NAMES = [
+    "fk_table", "fk_column", "k_table", "k_column", "key_coverage", "row_coverage",
+    "estimated_coverage", "num_keys", "num_covered_keys"
+]
+
+
+def discover_fks(df_dict, min_coverage=0.9, min_key_uniqueness=0.99, num_hashes=DEFAULT_NUM_HASHES,
+                 false_positive_rate=sketch.DEFAULT_ERROR_RATE):
+    """
+    Find single-column FK -> K pairs across tables in `df_dict` ({table name: data frame}).
+    Each column is hashed once into bottom-k MinHash sample of distinct values, and (nearly) unique columns
+    are also kept in Bloom filter as K candidates. Pairs are pruned by dtype kind, the number of distinct values
+    and coverage estimated from the sample, then only remaining pairs are verified exactly.
+    Returns pairs with key coverage >= `min_coverage` ranked by coverage
+    """
+    sketches = [
+        _sketch_column(name, c, df[c], num_hashes, min_key_uniqueness, false_positive_rate)
+        for name, df in df_dict.items() for c in df.columns
+    ]
+    sketches = [s for s in sketches if s is not None]
+    key_sketches = [s for s in sketches if s["bloom_filter"] is not None]
+    logger.info("{} columns sketched, {} key candidates".format(len(sketches), len(key_sketches)))
+    records = []
+    for fk_sketch in sketches:
+        for k_sketch in key_sketches:
+            estimated_coverage = _estimate_coverage(fk_sketch, k_sketch, min_coverage)
+            if estimated_coverage is None:
+                continue
+            logger.info("...verifying {}.{} -> {}.{} (estimated coverage: {:.2%})".format(
+                fk_sketch["table"], fk_sketch["column"], k_sketch["table"], k_sketch["column"], estimated_coverage))
+            report = fk_coverage.calc_fk_coverage(
+                df_dict[fk_sketch["table"]], df_dict[k_sketch["table"]], fk_sketch["column"], k_sketch["column"],
+                num_samples=0)
+            if report["key_coverage"] >= min_coverage:
+                records.append({
+                    "fk_table": fk_sketch["table"],
+                    "fk_column": fk_sketch["column"],
+                    "k_table": k_sketch["table"],
+                    "k_column": k_sketch["column"],
+                    "estimated_coverage": estimated_coverage,
+                    **{k: report[k] for k in ["key_coverage", "row_coverage", "num_keys", "num_covered_keys"]}
+                })
+    return pandas.DataFrame(records, columns=OUTPUT_COLUMN_NAMES).sort_values(
+        ["key_coverage", "row_coverage", "num_keys"], ascending=False, kind="stable", ignore_index=True)
+
+
+def _sketch_column(table, column, series, num_hashes, min_key_uniqueness, false_positive_rate):
+    kind = _get_key_kind(series.dtype)
+    if kind is None:
+        return None
+    valid = series.dropna()
+    if kind == "datetime":
+        # hash depends on time unit
+        valid = pandas.Series(pandas.DatetimeIndex(valid).as_unit("ns"))
+    elif kind == "integer" and types.is_signed_integer_dtype(valid.dtype):
+        # hash of negative values depends on width (e.g. int32 from optimize_memory), non-negative values
+        # of any signed / unsigned width have the same hash as int64
+        valid = pandas.Series(valid.to_numpy(dtype=numpy.int64))
+    distinct_hashes = pandas.unique(stat_calculator.hash_values(valid))
+    num_distinct = len(distinct_hashes)
+    if num_distinct == 0:
+        return None
+    is_key = num_distinct >= min_key_uniqueness * len(valid)
+    bloom_filter = sketch.BloomFilter(num_distinct, false_positive_rate).add(distinct_hashes) if is_key else None
+    return {
+        "table": table,
+        "column": column,
+        "kind": kind,
+        "num_distinct": num_distinct,
+        "min_hashes": numpy.sort(distinct_hashes)[:num_hashes] if num_distinct <= num_hashes
+        else numpy.sort(numpy.partition(distinct_hashes, num_hashes - 1)[:num_hashes]),
+        "bloom_filter": bloom_filter,
+    }
+
+
+def _estimate_coverage(fk_sketch, k_sketch, min_coverage):
+    """Estimated key coverage, or None if the pair is pruned"""
+    if fk_sketch["table"] == k_sketch["table"] and fk_sketch["column"] == k_sketch["column"]:
+        return None
+    if fk_sketch["kind"] != k_sketch["kind"]:
+        return None
+    threshold = min_coverage - COVERAGE_MARGIN
+    if k_sketch["num_distinct"] < threshold * fk_sketch["num_distinct"]:
+        # K does not have enough distinct values to cover FK
+        return None
+    # min hashes are uniform sample of distinct FK values
+    estimated_coverage = float(k_sketch["bloom_filter"].contains(fk_sketch["min_hashes"]).mean())
+    return estimated_coverage if estimated_coverage >= threshold else None
+
+
+def _get_key_kind(dtype):
+    if types.is_bool_dtype(dtype) or types.is_float_dtype(dtype):
+        return None
+    if types.is_integer_dtype(dtype):
+        return "integer"
+    if types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    if types.is_string_dtype(dtype) or types.is_object_dtype(dtype) or isinstance(dtype, pandas.CategoricalDtype):
+        return "string"
+    return None
@@ -0,0 +1,100 @@
+"""Discover minimal unique column combinations (candidate keys) of a data frame."""
+
+import logging
+import itertools
+
+import numpy
+import pandas
+
+from conjurer.logic.eda.check import stat_calculator
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_COLUMNS = 3
+DEFAULT_SAMPLE_ROWS = 10000
+RANDOM_SEED = 0
+
+
+def discover_unique_keys(df, max_columns=DEFAULT_MAX_COLUMNS, sample_rows=DEFAULT_SAMPLE_ROWS, columns=None):
+    """
+    Find minimal combinations of at most `max_columns` columns which identify each row (null is treated as a value).
+    Combinations are generated level by level only from non-unique combinations, so supersets of unique ones
+    are never tested. Each combination is rejected early if it has duplicates in `sample_rows` sampled rows,
+    otherwise it is verified by partition refinement over factorized codes of all rows
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    num_rows = len(df)
+    codes, num_uniques = {}, {}
+    for c in columns:
+        codes[c], uniques = pandas.factorize(stat_calculator.to_canonical(df[c]), use_na_sentinel=False)
+        num_uniques[c] = len(uniques)
+    sample_index = _get_sample_index(num_rows, sample_rows)
+    sample_codes = {c: codes[c][sample_index] for c in columns}
+    unique_keys = [(c,) for c in columns if num_uniques[c] == num_rows]
+    # constant columns never make a combination unique
+    non_unique = [(c,) for c in columns if 1 < num_uniques[c] < num_rows]
+    for level in range(2, max_columns + 1):
+        non_unique_set = set(non_unique)
+        next_non_unique = []
+        for candidate in _generate_candidates(non_unique, non_unique_set):
+            if _is_unique(candidate, codes, num_uniques, sample_codes, num_rows):
+                unique_keys.append(candidate)
+            else:
+                next_non_unique.append(candidate)
+        logger.info("level {}: {} unique / {} non-unique combinations".format(
+            level, sum(len(k) == level for k in unique_keys), len(next_non_unique)))
+        non_unique = next_non_unique
+    return pandas.DataFrame({
+        "column_names": [list(k) for k in unique_keys],
+        "num_columns": [len(k) for k in unique_keys],
+    })
+
+
+def _generate_candidates(non_unique, non_unique_set):
+    """Apriori join of non-unique combinations sharing all but the last column, all subsets must be non-unique"""
+    position = {}
+    for combination in non_unique:
+        for c in combination:
+            position.setdefault(c, len(position))
+    by_prefix = {}
+    for combination in non_unique:
+        by_prefix.setdefault(combination[:-1], []).append(combination[-1])
+    for prefix, last_columns in by_prefix.items():
+        for c1, c2 in itertools.combinations(sorted(last_columns, key=position.get), 2):
+            candidate = prefix + (c1, c2)
+            if all(subset in non_unique_set for subset in itertools.combinations(candidate, len(candidate) - 1)):
+                yield candidate
+
+
+def _is_unique(candidate, codes, num_uniques, sample_codes, num_rows):
+    if numpy.prod([float(num_uniques[c]) for c in candidate]) < num_rows:
+        # not enough combinations of values
+        return False
+    multipliers = [num_uniques[c] for c in candidate]
+    if not _is_unique_rows([sample_codes[c] for c in candidate], multipliers):
+        # duplicated in sample rows
+        return False
+    return _is_unique_rows([codes[c] for c in candidate], multipliers)
+
+
+def _is_unique_rows(code_arrays, multipliers):
+    """
+    Partition refinement: rows are grouped by codes of one column after another,
+    and rows which are already in a group of their own are dropped
+    """
+    rows = numpy.arange(len(code_arrays[0]))
+    group_codes = numpy.zeros(len(rows), dtype=numpy.int64)
+    for column_codes, multiplier in zip(code_arrays, multipliers):
+        group_codes, _ = pandas.factorize(group_codes * multiplier + column_codes[rows])
+        is_duplicated = numpy.bincount(group_codes)[group_codes] > 1
+        rows, group_codes = rows[is_duplicated], group_codes[is_duplicated]
+        if len(rows) == 0:
+            return True
+    return False
+
+
+def _get_sample_index(num_rows, sample_rows):
+    if num_rows <= sample_rows:
+        return numpy.arange(num_rows)
+    return numpy.sort(numpy.random.default_rng(RANDOM_SEED).choice(num_rows, sample_rows, replace=False))
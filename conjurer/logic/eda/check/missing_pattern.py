@@ -0,0 +1,107 @@
+"""Missing-value patterns of rows counted over null masks packed into 64 bit words."""
+
+import logging
+
+import numpy
+import pandas
+
+from conjurer.logic.eda.check import stat_calculator
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_N = 10
+# Rows packed at once: memory is about BLOCK_ROWS * ceil(# of columns / 64) * 8 bytes
+BLOCK_ROWS = 1024 ** 2
+WORD_BITS = 64
+# Distinct patterns unpacked at once for co-null counts: memory is about BLOCK_PATTERNS * # of columns * 8 bytes
+BLOCK_PATTERNS = 4096
+PATTERN_COLUMN_NAMES = ["missing_columns", "num_missing_columns", "num_rows", "ratio"]
+
+
+class MissingPatternCounter(object):
+    """
+    Count null patterns of rows over data frame chunks. Null flags of each row are packed into
+    ceil(# of columns / 64) uint64 words block by block, and distinct patterns in a block are found
+    by hash-based factorization of the words, so only (distinct pattern, count) pairs are kept.
+    Co-null counts of column pairs are computed from blocks of the distinct patterns weighted by their counts
+    """
+    def __init__(self, block_rows=BLOCK_ROWS):
+        self.block_rows = block_rows
+        self.columns = None
+        self.num_rows = 0
+        self._counts = {}
+
+    def update(self, df):
+        if self.columns is None:
+            self.columns = list(df.columns)
+        elif list(df.columns) != self.columns:
+            raise ValueError("columns must be the same as the first chunk; got {}".format(list(df.columns)))
+        for start in range(0, len(df), self.block_rows):
+            self._update_block(df.iloc[start:start + self.block_rows])
+        return self
+
+    def update_all(self, chunks):
+        for i, chunk in enumerate(chunks):
+            logger.info("...counting missing patterns of chunk {} ({} rows)".format(i, len(chunk)))
+            self.update(chunk)
+        return self
+
+    def get_patterns(self, top_n=DEFAULT_TOP_N):
+        """The most frequent `top_n` patterns (including the pattern without null) with PATTERN_COLUMN_NAMES"""
+        words, counts = self._get_pattern_array()
+        order = numpy.argsort(-counts, kind="stable")[:top_n]
+        bits = self._unpack(words[order])
+        return pandas.DataFrame({
+            "missing_columns": [[self.columns[j] for j in numpy.flatnonzero(row)] for row in bits],
+            "num_missing_columns": bits.sum(axis=1),
+            "num_rows": counts[order],
+            "ratio": [stat_calculator.calc_ratio(int(c), self.num_rows) for c in counts[order]],
+        }, columns=PATTERN_COLUMN_NAMES)
+
+    def get_co_null_df(self):
+        """The number of rows where both columns are null (diagonal is the number of nulls of each column)"""
+        words, counts = self._get_pattern_array()
+        co_null = numpy.zeros((len(self.columns), len(self.columns)), dtype=numpy.int64)
+        for start in range(0, len(words), BLOCK_PATTERNS):
+            bits = self._unpack(words[start:start + BLOCK_PATTERNS]).astype(numpy.float64)
+            weighted = bits * counts[start:start + BLOCK_PATTERNS, numpy.newaxis].astype(numpy.float64)
+            co_null += (weighted.T @ bits).round().astype(numpy.int64)
+        return pandas.DataFrame(co_null, index=self.columns, columns=self.columns)
+
+    @property
+    def num_patterns(self):
+        return len(self._counts)
+
+    def _update_block(self, block_df):
+        words = numpy.zeros((len(block_df), max(1, -(-len(self.columns) // WORD_BITS))), dtype=numpy.uint64)
+        for j in range(len(self.columns)):
+            is_na = block_df.iloc[:, j].isna().to_numpy()
+            words[:, j // WORD_BITS] |= is_na.astype(numpy.uint64) << numpy.uint64(j % WORD_BITS)
+        codes = stat_calculator.factorize_rows(pandas.DataFrame(words))
+        counts = numpy.bincount(codes)
+        first_rows = numpy.unique(codes, return_index=True)[1]
+        for key, count in zip(map(bytes, words[first_rows]), counts):
+            self._counts[key] = self._counts.get(key, 0) + int(count)
+        self.num_rows += len(block_df)
+
+    def _get_pattern_array(self):
+        num_words = max(1, -(-len(self.columns or []) // WORD_BITS))
+        words = numpy.frombuffer(b"".join(self._counts.keys()), dtype=numpy.uint64).reshape(-1, num_words)
+        return words, numpy.fromiter(self._counts.values(), dtype=numpy.int64, count=len(self._counts))
+
+    def _unpack(self, words):
+        bits = numpy.unpackbits(words.astype("<u8").view(numpy.uint8), axis=1, bitorder="little")
+        return bits[:, :len(self.columns)]
+
+
+def calc_missing_patterns(df, top_n=DEFAULT_TOP_N, block_rows=BLOCK_ROWS):
+    """
+    Returns (top null patterns of rows, co-null counts of column pairs) for a data frame or an iterator of chunks
+    """
+    chunks = [df] if isinstance(df, pandas.DataFrame) else df
+    counter = MissingPatternCounter(block_rows).update_all(chunks)
+    if counter.columns is None:
+        raise ValueError("chunks must include at least one data frame; got no chunks")
+    logger.info("{} distinct patterns in {} rows".format(counter.num_patterns, counter.num_rows))
+    return counter.get_patterns(top_n), counter.get_co_null_df()
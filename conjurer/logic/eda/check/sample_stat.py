@@ -0,0 +1,246 @@
+"""Column statistics estimated from a uniform / stratified reservoir sample with confidence intervals."""
+
+import math
+import logging
+import statistics
+
+import numpy
+import pandas
+from pandas.api import types
+
+from conjurer.logic.eda.check import stat_calculator, column_state
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_SIZE = 100000
+DEFAULT_CONFIDENCE = 0.95
+RANDOM_SEED = 0
+INTERVAL_STAT_NAMES = ["mean", "std", "ratio_na", "ratio_zero", "unique_count"]
+INTERVAL_COLUMN_NAMES = [
+    "{}_{}".format(name, bound) for name in INTERVAL_STAT_NAMES for bound in ["lower", "upper"]
+]
+
+
+class ReservoirSampler(object):
+    """
+    Keep a uniform sample of `sample_size` rows (or `sample_size` rows for each stratum of `strata` columns)
+    over data frame chunks in one pass: each row gets a random priority and rows with the smallest priorities
+    are kept, so rows which cannot enter the reservoir are dropped before copying.
+    Min / max of numeric / datetime columns are tracked exactly in the same pass
+    """
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE, strata=None, random_state=RANDOM_SEED):
+        self.sample_size = sample_size
+        self.strata = [strata] if isinstance(strata, str) else strata
+        self.num_rows = 0
+        self.dtypes = None
+        self.head = None
+        self.sample = None
+        self._rng = numpy.random.default_rng(random_state)
+        self._priorities = numpy.zeros(0)
+        self._stratum_ids = numpy.zeros(0, dtype=numpy.uint64)
+        self._stratum_sizes = pandas.Series(dtype=numpy.int64)
+        self._thresholds = pandas.Series(dtype=numpy.float64)
+        self._column_states = {}
+
+    def update(self, df):
+        if self.dtypes is None:
+            self.dtypes = df.dtypes
+            self.head = df.head()
+            self.sample = df.iloc[:0]
+        self.num_rows += len(df)
+        for c in df.columns:
+            if c not in self._column_states:
+                self._column_states[c] = column_state.ColumnState(df.dtypes[c], count_unique=False)
+            self._column_states[c].update(df[c])
+        priorities = self._rng.random(len(df))
+        stratum_ids = stat_calculator.hash_values(df[self.strata]) if self.strata \
+            else numpy.zeros(len(df), dtype=numpy.uint64)
+        self._stratum_sizes = self._stratum_sizes.add(pandas.Series(stratum_ids).value_counts(), fill_value=0)
+        # rows with larger priority than the current k-th smallest of their full stratum are never kept
+        thresholds = pandas.Series(stratum_ids).map(self._thresholds).fillna(numpy.inf).to_numpy()
+        candidates = numpy.flatnonzero(priorities < thresholds)
+        candidates = candidates[self._get_kept(priorities[candidates], stratum_ids[candidates])]
+        sample = pandas.concat([self.sample, df.iloc[candidates]])
+        priorities = numpy.concatenate([self._priorities, priorities[candidates]])
+        stratum_ids = numpy.concatenate([self._stratum_ids, stratum_ids[candidates]])
+        kept = self._get_kept(priorities, stratum_ids)
+        self.sample = sample.iloc[kept]
+        self._priorities = priorities[kept]
+        self._stratum_ids = stratum_ids[kept]
+        kept_priorities = pandas.Series(self._priorities).groupby(self._stratum_ids).agg(["max", "size"])
+        self._thresholds = kept_priorities.loc[kept_priorities["size"] >= self.sample_size, "max"]
+        return self
+
+    def update_all(self, chunks):
+        for i, chunk in enumerate(chunks):
+            logger.info("...sampling chunk {} ({} rows)".format(i, len(chunk)))
+            self.update(chunk)
+        return self
+
+    def get_stat_df(self, confidence=DEFAULT_CONFIDENCE):
+        """
+        Same columns as `calc_column_stat` with `{stat}_lower` / `{stat}_upper` interval columns.
+        Mean, std and ratios are weighted by stratum and their intervals use the normal approximation
+        (with finite population correction). unique_count is estimated by GEE (Charikar et al.) weighted by stratum
+        within its error bounds, and is_unique means no duplicated value in the sample
+        """
+        z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+        design = self._get_design()
+        records = []
+        for c in self.dtypes.index:
+            stat = self._estimate_column(self.sample[c], design, z)
+            exact_stat = self._column_states[c].get_stat()
+            records.append({
+                "column_name": c,
+                "dtype": str(self.dtypes[c]),
+                "min": exact_stat["min"],
+                "max": exact_stat["max"],
+                **stat,
+                "is_unique": stat["unique_count"] == self.num_rows,
+            })
+        return pandas.DataFrame(
+            records, columns=stat_calculator.STAT_COLUMN_NAMES + INTERVAL_COLUMN_NAMES, index=[0] * len(records))
+
+    def _get_kept(self, priorities, stratum_ids):
+        """Sorted positions of `sample_size` rows with the smallest priorities in each stratum"""
+        if not self.strata:
+            if len(priorities) <= self.sample_size:
+                return numpy.arange(len(priorities))
+            return numpy.sort(numpy.argpartition(priorities, self.sample_size - 1)[:self.sample_size])
+        order = numpy.lexsort((priorities, stratum_ids))
+        sorted_ids = stratum_ids[order]
+        is_start = numpy.r_[True, sorted_ids[1:] != sorted_ids[:-1]] if len(order) > 0 else numpy.zeros(0, bool)
+        starts = numpy.maximum.accumulate(numpy.where(is_start, numpy.arange(len(order)), 0))
+        return numpy.sort(order[numpy.arange(len(order)) - starts < self.sample_size])
+
+    def _get_design(self):
+        codes, ids = pandas.factorize(self._stratum_ids)
+        sample_sizes = numpy.bincount(codes, minlength=len(ids)).astype(numpy.float64)
+        population_sizes = self._stratum_sizes.reindex(ids).to_numpy(dtype=numpy.float64)
+        return {
+            "codes": codes,
+            "sample_sizes": sample_sizes,
+            "population_sizes": population_sizes,
+            "weights": (population_sizes / sample_sizes)[codes],
+        }
+
+    def _estimate_column(self, series, design, z):
+        is_na = series.isna().to_numpy()
+        ratio_na, ratio_na_se = _estimate_ratio(is_na.astype(numpy.float64), numpy.ones(len(is_na)), design)
+        stat = {
+            "ratio_na": ratio_na,
+            **_get_ratio_interval("ratio_na", ratio_na, ratio_na_se, z, design),
+            **{
+                "{}{}".format(name, suffix): pandas.NA
+                for name in ["mean", "std", "ratio_zero"] for suffix in ["", "_lower", "_upper"]
+            },
+        }
+        if types.is_numeric_dtype(series.dtype):
+            stat.update(_estimate_numeric(series, is_na, design, z))
+        stat.update(self._estimate_unique_count(series[~is_na], ratio_na, design["weights"][~is_na]))
+        return stat
+
+    def _estimate_unique_count(self, valid, ratio_na, weights):
+        """
+        GEE: sqrt(N / n) * (values seen once) + (values seen more than once), within factor sqrt(N / n).
+        With strata, each value seen once is scaled by sqrt of the weight (N_h / n_h) of its stratum,
+        so that an oversampled small stratum does not dominate, and the error factor is the largest scale
+        """
+        codes, _ = pandas.factorize(stat_calculator.to_canonical(valid))
+        frequencies = numpy.bincount(codes)
+        num_sampled, num_distinct = len(codes), len(frequencies)
+        num_singletons = int(numpy.count_nonzero(frequencies == 1))
+        num_valid = self.num_rows * (1 - ratio_na)
+        if num_sampled == 0 or len(self.sample) == self.num_rows:
+            return {"unique_count": num_distinct, "unique_count_lower": num_distinct,
+                    "unique_count_upper": num_distinct}
+        # weights of valid rows sum up to the estimated number of valid rows (N / n without strata)
+        scales = numpy.sqrt(numpy.maximum(weights * num_valid / weights.sum(), 1.0))
+        scale = float(scales.max())
+        estimate = float(scales[frequencies[codes] == 1].sum()) + num_distinct - num_singletons
+        lower = max(num_distinct, estimate / scale)
+        upper = max(lower, min(num_valid, estimate * scale))
+        if num_singletons == num_sampled:
+            # no duplicated value in the sample
+            estimate = num_valid
+        return {
+            "unique_count": int(round(min(max(estimate, lower), upper))),
+            "unique_count_lower": int(math.floor(lower)),
+            "unique_count_upper": int(math.ceil(upper)),
+        }
+
+
+def _estimate_numeric(series, is_na, design, z):
+    is_valid = (~is_na).astype(numpy.float64)
+    values = numpy.where(is_na, 0.0, series.to_numpy(dtype=numpy.float64, na_value=numpy.nan))
+    ratio_zero, ratio_zero_se = _estimate_ratio(((values == 0) & ~is_na).astype(numpy.float64), 1.0, design)
+    stat = {
+        "ratio_zero": ratio_zero,
+        **_get_ratio_interval("ratio_zero", ratio_zero, ratio_zero_se, z, design),
+    }
+    num_valid = int(is_valid.sum())
+    if num_valid == 0:
+        return stat
+    mean, mean_se = _estimate_ratio(values * is_valid, is_valid, design)
+    stat.update({"mean": mean, **_get_interval("mean", mean, mean_se, z)})
+    if num_valid < 2:
+        return stat
+    correction = num_valid / (num_valid - 1)
+    variance, variance_se = _estimate_ratio((values - mean) ** 2 * is_valid, is_valid, design)
+    variance, variance_se = variance * correction, variance_se * correction
+    stat.update({
+        "std": math.sqrt(variance),
+        "std_lower": math.sqrt(max(variance - z * variance_se, 0.0)),
+        "std_upper": math.sqrt(variance + z * variance_se),
+    })
+    return stat
+
+
+def _estimate_ratio(numerators, denominators, design):
+    """
+    Stratified ratio estimate sum(w * y) / sum(w * x) and its standard error by linearization:
+    Var = sum_h N_h^2 (1 - n_h / N_h) s_h^2 / n_h / (sum(w * x))^2 for u = y - R x
+    """
+    denominators = numpy.broadcast_to(denominators, numerators.shape)
+    weights = design["weights"]
+    total = float((weights * denominators).sum())
+    if total == 0:
+        return numpy.nan, numpy.nan
+    ratio = float((weights * numerators).sum()) / total
+    residuals = numerators - ratio * denominators
+    codes, sample_sizes, population_sizes = design["codes"], design["sample_sizes"], design["population_sizes"]
+    sums = numpy.bincount(codes, weights=residuals, minlength=len(sample_sizes))
+    squares = numpy.bincount(codes, weights=residuals ** 2, minlength=len(sample_sizes))
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        variances = numpy.where(
+            sample_sizes > 1, (squares - sums ** 2 / sample_sizes) / (sample_sizes - 1), 0.0)
+        variance = (population_sizes ** 2 * (1 - sample_sizes / population_sizes)
+                    * numpy.maximum(variances, 0.0) / sample_sizes).sum()
+    return ratio, math.sqrt(variance) / total
+
+
+def _get_interval(name, estimate, standard_error, z):
+    if numpy.isnan(estimate):
+        return {"{}_lower".format(name): pandas.NA, "{}_upper".format(name): pandas.NA}
+    return {
+        "{}_lower".format(name): estimate - z * standard_error,
+        "{}_upper".format(name): estimate + z * standard_error,
+    }
+
+
+def _get_ratio_interval(name, ratio, standard_error, z, design):
+    """
+    Wilson score interval with effective sample size of the design, so that the interval is not empty
+    for ratio 0 / 1 (e.g. a few nulls not in the sample)
+    """
+    if numpy.all(design["sample_sizes"] == design["population_sizes"]):
+        return {"{}_lower".format(name): ratio, "{}_upper".format(name): ratio}
+    num_effective = ratio * (1 - ratio) / standard_error ** 2 if standard_error > 0 else design["sample_sizes"].sum()
+    denominator = 1 + z ** 2 / num_effective
+    center = (ratio + z ** 2 / (2 * num_effective)) / denominator
+    half_width = z * math.sqrt(ratio * (1 - ratio) / num_effective + z ** 2 / (4 * num_effective ** 2)) / denominator
+    return {
+        "{}_lower".format(name): max(center - half_width, 0.0),
+        "{}_upper".format(name): min(center + half_width, 1.0),
+    }
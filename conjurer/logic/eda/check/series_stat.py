@@ -0,0 +1,123 @@
+"""Statistics of each series in a data frame of multiple series, computed in one grouping pass."""
+
+import numpy
+import pandas
+from pandas.api import types
+
+from conjurer.logic.eda.check import stat_calculator
+
+
+def calc_series_stat(df, unit_keys):
+    """
+    Same as groupby(unit_keys) with count (the maximum number of non-null values in columns),
+    min / max / mean / std for numeric columns, min / max for datetime columns and nunique for other columns.
+    Keys are factorized once and rows are sorted by group once, then each column is reduced over contiguous
+    group segments with numpy, so that no per-group python object is created for millions of series
+    """
+    unit_keys = list(unit_keys)
+    group_codes, num_groups = _factorize_keys(df, unit_keys)
+    rows = numpy.flatnonzero(group_codes >= 0)
+    order = rows[numpy.argsort(group_codes[rows], kind="stable")]
+    sorted_codes = group_codes[order]
+    first_rows = order[_get_segment_starts(sorted_codes)]
+    index_df = df[unit_keys].iloc[first_rows]
+    index = index_df.set_index(unit_keys).index
+    count = numpy.zeros(num_groups, dtype=numpy.int64) if len(df.columns) > len(unit_keys) \
+        else numpy.bincount(sorted_codes, minlength=num_groups)
+    args_dict = {}
+    for c in df.columns:
+        if c in unit_keys:
+            continue
+        series = df[c].iloc[order]
+        is_valid = series.notna().to_numpy()
+        valid_codes = sorted_codes[is_valid]
+        valid_count = numpy.bincount(valid_codes, minlength=num_groups)
+        count = numpy.maximum(count, valid_count)
+        if types.is_numeric_dtype(series.dtype):
+            args_dict.update(_calc_numeric_stat(c, series, is_valid, valid_codes, valid_count, num_groups))
+        elif types.is_datetime64_any_dtype(series.dtype):
+            args_dict.update(_calc_datetime_stat(c, series, is_valid, valid_codes, num_groups))
+        else:
+            args_dict["nunique({})".format(c)] = _count_unique(series, is_valid, valid_codes, num_groups)
+    return pandas.DataFrame({"count": count, **args_dict}, index=index)
+
+
+def _factorize_keys(df, unit_keys):
+    """Group codes in sorted order of keys (-1 for rows with null key, which are dropped as groupby)"""
+    group_codes = numpy.zeros(len(df), dtype=numpy.int64)
+    num_groups = 1
+    for k in unit_keys:
+        codes, uniques = pandas.factorize(df[k], sort=True)
+        combined = numpy.where((group_codes < 0) | (codes < 0), -1, group_codes * len(uniques) + codes)
+        group_codes, uniques = pandas.factorize(combined, sort=True, use_na_sentinel=False)
+        if len(uniques) > 0 and uniques[0] == -1:
+            group_codes = group_codes - 1
+        num_groups = int(group_codes.max()) + 1 if len(group_codes) > 0 else 0
+    return group_codes, num_groups
+
+
+def _calc_numeric_stat(column_name, series, is_valid, valid_codes, valid_count, num_groups):
+    values = series.to_numpy(dtype=numpy.float64, na_value=numpy.nan)[is_valid]
+    raw_values = series.to_numpy()[is_valid] if isinstance(series.dtype, numpy.dtype) else values
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        mean = numpy.bincount(valid_codes, weights=values, minlength=num_groups) / valid_count
+        # two-pass variance for numerical stability
+        squared_deviation = numpy.bincount(
+            valid_codes, weights=(values - mean[valid_codes]) ** 2, minlength=num_groups)
+        std = numpy.where(valid_count > 1, numpy.sqrt(squared_deviation / (valid_count - 1)), numpy.nan)
+    minv, maxv = [
+        _restore_dtype(_reduce_segments(ufunc, raw_values, valid_codes, num_groups), series.dtype)
+        for ufunc in [numpy.minimum, numpy.maximum]
+    ]
+    return {
+        "min({})".format(column_name): minv,
+        "max({})".format(column_name): maxv,
+        "mean({})".format(column_name): _restore_float_dtype(mean, series.dtype),
+        "std({})".format(column_name): _restore_float_dtype(std, series.dtype),
+    }
+
+
+def _calc_datetime_stat(column_name, series, is_valid, valid_codes, num_groups):
+    tz = getattr(series.dtype, "tz", None)
+    values = (series if tz is None else series.dt.tz_convert(None)).to_numpy()[is_valid]
+    result_dict = {}
+    for agg, ufunc in [("min", numpy.minimum), ("max", numpy.maximum)]:
+        result = _reduce_segments(ufunc, values, valid_codes, num_groups, fill_value=numpy.datetime64("NaT"))
+        result_dict["{}({})".format(agg, column_name)] = result if tz is None \
+            else pandas.DatetimeIndex(result).tz_localize("UTC").tz_convert(tz).array
+    return result_dict
+
+
+def _count_unique(series, is_valid, valid_codes, num_groups):
+    codes, uniques = pandas.factorize(stat_calculator.to_canonical(series))
+    pairs = pandas.unique(valid_codes * max(len(uniques), 1) + codes[is_valid])
+    return numpy.bincount(pairs // max(len(uniques), 1), minlength=num_groups)
+
+
+def _reduce_segments(ufunc, values, sorted_codes, num_groups, fill_value=numpy.nan):
+    """Reduce values over segments of the same group code (`fill_value` for groups without values)"""
+    starts = _get_segment_starts(sorted_codes)
+    reduced = ufunc.reduceat(values, starts) if len(values) > 0 else values[:0]
+    if len(starts) == num_groups:
+        return reduced
+    result = numpy.full(num_groups, fill_value, dtype=numpy.result_type(reduced.dtype, numpy.asarray(fill_value)))
+    result[sorted_codes[starts]] = reduced
+    return result
+
+
+def _get_segment_starts(sorted_codes):
+    return numpy.flatnonzero(numpy.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(sorted_codes) > 0 \
+        else numpy.zeros(0, dtype=numpy.int64)
+
+
+def _restore_dtype(values, dtype):
+    if isinstance(dtype, numpy.dtype):
+        return values
+    return pandas.array(values, dtype=dtype)
+
+
+def _restore_float_dtype(values, dtype):
+    if isinstance(dtype, numpy.dtype):
+        return values
+    # nullable dtypes (e.g. Int64) are aggregated into nullable float as pandas
+    return pandas.array(values, dtype="Float64")
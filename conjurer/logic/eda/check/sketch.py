@@ -0,0 +1,207 @@
+"""Probabilistic sketches to summarize columns without keeping all values."""
+
+import math
+
+import numpy
+
+
+DEFAULT_ERROR_RATE = 0.01
+# Larger compression keeps more centroids (about compression / 2) for more accurate percentiles
+DEFAULT_COMPRESSION = 200
+MIN_PRECISION = 4
+MAX_PRECISION = 18
+
+
+class HyperLogLog(object):
+    """
+    HyperLogLog sketch for the number of distinct values. Relative standard error is about `error_rate`,
+    memory is 2 ** precision bytes regardless of the number of values.
+    Sketches with the same `error_rate` can be merged (e.g. one for each chunk)
+    """
+    def __init__(self, error_rate=DEFAULT_ERROR_RATE):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be in (0, 1); got {!r}".format(error_rate))
+        precision = int(math.ceil(math.log2((1.04 / error_rate) ** 2)))
+        self.precision = min(max(precision, MIN_PRECISION), MAX_PRECISION)
+        self.registers = numpy.zeros(1 << self.precision, dtype=numpy.uint8)
+
+    def update(self, hashes):
+        """Add 64 bit hash values of the items"""
+        hashes = numpy.asarray(hashes, dtype=numpy.uint64)
+        num_rest_bits = 64 - self.precision
+        index = (hashes >> numpy.uint64(num_rest_bits)).astype(numpy.intp)
+        rest = hashes & numpy.uint64((1 << num_rest_bits) - 1)
+        # position of the leftmost 1 bit in the remaining bits
+        rank = (num_rest_bits + 1 - _bit_length(rest)).astype(numpy.uint8)
+        numpy.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        if self.precision != other.precision:
+            raise ValueError("cannot merge HyperLogLog with precision {} and {}".format(
+                self.precision, other.precision))
+        numpy.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        num_registers = len(self.registers)
+        estimate = _get_alpha(num_registers) * num_registers ** 2 / numpy.sum(
+            numpy.exp2(-self.registers.astype(numpy.float64)))
+        num_zeros = int(numpy.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * num_registers and num_zeros > 0:
+            # linear counting is more accurate for small cardinality
+            estimate = num_registers * math.log(num_registers / num_zeros)
+        return int(round(estimate))
+
+
+class Moments(object):
+    """
+    Count, mean and sum of squared differences from the mean (Welford), merged by Chan's formula
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        """Add float values without nulls"""
+        if len(values) == 0:
+            return self
+        mean = values.mean()
+        return self._merge(len(values), mean, float(((values - mean) ** 2).sum()))
+
+    def merge(self, other):
+        return self._merge(other.count, other.mean, other.m2)
+
+    def get_mean(self):
+        return self.mean if self.count > 0 else numpy.nan
+
+    def get_std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else numpy.nan
+
+    def _merge(self, count, mean, m2):
+        if count == 0:
+            return self
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        return self
+
+
+class QuantileDigest(object):
+    """
+    t-digest style sketch for percentiles: sorted centroids (mean, weight), where centroids near
+    both tails are kept small so that extreme percentiles stay accurate. Min / max are exact
+    """
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = numpy.zeros(0)
+        self.weights = numpy.zeros(0)
+        self.min = numpy.nan
+        self.max = numpy.nan
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values):
+        """Add float values without nulls"""
+        if len(values) == 0:
+            return self
+        self.min = numpy.fmin(self.min, values.min())
+        self.max = numpy.fmax(self.max, values.max())
+        self._compress(numpy.concatenate([self.means, values]),
+                       numpy.concatenate([self.weights, numpy.ones(len(values))]))
+        return self
+
+    def merge(self, other):
+        self.min = numpy.fmin(self.min, other.min)
+        self.max = numpy.fmax(self.max, other.max)
+        self._compress(numpy.concatenate([self.means, other.means]),
+                       numpy.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantile(self, ratios):
+        positions, values = self._get_knots()
+        if len(values) == 0:
+            return numpy.full(len(ratios), numpy.nan)
+        return numpy.interp(numpy.asarray(ratios, dtype=float) * self.count, positions, values)
+
+    def cdf(self, values):
+        """Estimated ratio of values less than or equal to `values`"""
+        positions, knot_values = self._get_knots()
+        if len(knot_values) == 0:
+            return numpy.full(len(values), numpy.nan)
+        return numpy.interp(values, knot_values, positions, left=0.0, right=self.count) / self.count
+
+    def _get_knots(self):
+        if len(self.weights) == 0:
+            return numpy.zeros(0), numpy.zeros(0)
+        centers = numpy.cumsum(self.weights) - self.weights / 2
+        return numpy.concatenate([[0.0], centers, [self.count]]), \
+            numpy.concatenate([[self.min], self.means, [self.max]])
+
+    def _compress(self, means, weights):
+        order = numpy.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        ratios = (numpy.cumsum(weights) - weights / 2) / weights.sum()
+        # k1 scale function: each centroid spans at most 1 in k, which is narrow near both tails
+        scales = self.compression / (2 * math.pi) * numpy.arcsin(2 * ratios - 1)
+        groups = numpy.floor(scales - scales[0]).astype(numpy.int64)
+        _, groups = numpy.unique(groups, return_inverse=True)
+        self.weights = numpy.bincount(groups, weights=weights)
+        self.means = numpy.bincount(groups, weights=means * weights) / self.weights
+
+
+class BloomFilter(object):
+    """
+    Bloom filter for membership of 64 bit hash values. `contains` has no false negative,
+    and false positive rate is about `false_positive_rate` when `capacity` items were added
+    """
+    def __init__(self, capacity, false_positive_rate=DEFAULT_ERROR_RATE):
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be in (0, 1); got {!r}".format(false_positive_rate))
+        capacity = max(capacity, 1)
+        self.num_bits = int(math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = numpy.zeros((self.num_bits + 7) // 8, dtype=numpy.uint8)
+
+    def add(self, hashes):
+        for positions in self._iter_positions(hashes):
+            numpy.bitwise_or.at(self.bits, positions >> 3, (1 << (positions & 7)).astype(numpy.uint8))
+        return self
+
+    def contains(self, hashes):
+        result = numpy.ones(len(hashes), dtype=bool)
+        for positions in self._iter_positions(hashes):
+            result &= (self.bits[positions >> 3] >> (positions & 7)) & 1 == 1
+        return result
+
+    def _iter_positions(self, hashes):
+        # double hashing: i-th position is h1 + i * h2
+        hashes = numpy.asarray(hashes, dtype=numpy.uint64)
+        h1 = (hashes & numpy.uint64(0xFFFFFFFF)).astype(numpy.int64)
+        h2 = (hashes >> numpy.uint64(32)).astype(numpy.int64) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+
+def _bit_length(values):
+    _, lengths = numpy.frexp(values.astype(numpy.float64))
+    lengths = numpy.minimum(lengths, 64)
+    # float64 rounding may carry values just below a power of 2 up to it
+    is_rounded_up = (lengths > 0) & (
+        values < numpy.left_shift(numpy.uint64(1), (numpy.maximum(lengths, 1) - 1).astype(numpy.uint64)))
+    return lengths - is_rounded_up
+
+
+def _get_alpha(num_registers):
+    if num_registers <= 16:
+        return 0.673
+    if num_registers <= 32:
+        return 0.697
+    if num_registers <= 64:
+        return 0.709
+    return 0.7213 / (1 + 1.079 / num_registers)
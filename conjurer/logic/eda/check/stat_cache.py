@@ -0,0 +1,122 @@
+"""In-memory cache of column statistics keyed by column content fingerprint."""
+
+import hashlib
+import logging
+import threading
+import collections
+from concurrent import futures
+
+import numpy
+import pandas
+
+from conjurer.logic.eda.check import sketch, stat_calculator, column_state
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 1024 ** 3
+# The number of cached states of the same column checked as a prefix of appended column
+MAX_PREFIX_CANDIDATES = 3
+# Columns are looked up by evenly spaced blocks of rows (including the first and last rows)
+SAMPLE_BLOCKS = 16
+SAMPLE_BLOCK_ROWS = 64
+
+
+class StatCache(object):
+    """
+    Cache of mergeable column statistics for `calc_column_stat`. Columns with the same name, dtype and content
+    are served from the cache, and if a cached column is a prefix of the column (rows were appended),
+    only appended rows are scanned and merged. Entries are evicted in least-recently-used order
+    when the total size (mainly unique values for exact unique_count) exceeds `max_bytes`.
+    Columns are looked up by length and sampled rows. If `verify` is True, a found entry is used only if
+    the content hash of the whole column matches, which still reads every value (hashing only, no statistics);
+    if False, changes outside of sampled rows are not detected
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, verify=True):
+        self.max_bytes = max_bytes
+        self.verify = verify
+        self._entries = collections.OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def calc_column_stat(self, df, approx=False, error_rate=sketch.DEFAULT_ERROR_RATE, n_jobs=None):
+        if n_jobs is None or n_jobs <= 1:
+            states = [self._get_state(df[c], c, approx, error_rate) for c in df.columns]
+        else:
+            with futures.ThreadPoolExecutor(max_workers=n_jobs) as pool:
+                states = list(pool.map(
+                    lambda c: self._get_state(df[c], c, approx, error_rate), df.columns))
+        records = [
+            {"column_name": c, **state.get_stat()}
+            for c, state in zip(df.columns, states)
+        ]
+        return pandas.DataFrame(records, columns=stat_calculator.STAT_COLUMN_NAMES, index=[0] * len(records))
+
+    def clear(self):
+        self._entries.clear()
+        self._total_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get_state(self, series, name, approx, error_rate):
+        key = (name, str(series.dtype), approx, error_rate, len(series), get_sample_fingerprint(series))
+        with self._lock:
+            entry = self._entries.get(key)
+            candidates = [(k, self._entries[k]) for k in self._get_prefix_candidates(key)]
+        fingerprint = get_fingerprint(series) if self.verify else None
+        if entry is not None and entry[1] == fingerprint:
+            logger.info("...cache hit: {}".format(name))
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+            return entry[0]
+        state = None
+        for prefix_key, (prefix_state, prefix_fingerprint) in candidates:
+            prefix = series.iloc[:prefix_key[4]]
+            if get_sample_fingerprint(prefix) == prefix_key[5] and \
+                    (not self.verify or get_fingerprint(prefix) == prefix_fingerprint):
+                logger.info("...{} rows appended to {}".format(len(series) - len(prefix), name))
+                appended_state = column_state.ColumnState.from_series(series.iloc[len(prefix):], approx, error_rate)
+                state = prefix_state.copy().merge(appended_state)
+                break
+        if state is None:
+            logger.info("...calculating {} (dtype: {})".format(name, series.dtype))
+            state = column_state.ColumnState.from_series(series, approx, error_rate)
+        with self._lock:
+            self._put(key, state, fingerprint)
+        return state
+
+    def _get_prefix_candidates(self, key):
+        candidates = [
+            k for k in reversed(self._entries.keys()) if k[:4] == key[:4] and k[4] < key[4]
+        ]
+        return candidates[:MAX_PREFIX_CANDIDATES]
+
+    def _put(self, key, state, fingerprint):
+        if key in self._entries:
+            self._total_bytes -= self._entries.pop(key)[0].nbytes
+        self._entries[key] = (state, fingerprint)
+        self._total_bytes += state.nbytes
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._total_bytes -= evicted.nbytes
+
+
+def get_fingerprint(series):
+    """Content hash of column values (index is ignored)"""
+    return _hash_content(series)
+
+
+def get_sample_fingerprint(series):
+    """Content hash of SAMPLE_BLOCKS evenly spaced blocks of rows, which does not read the whole column"""
+    if len(series) <= SAMPLE_BLOCKS * SAMPLE_BLOCK_ROWS:
+        return _hash_content(series)
+    starts = numpy.linspace(0, len(series) - SAMPLE_BLOCK_ROWS, SAMPLE_BLOCKS).astype(numpy.int64)
+    return _hash_content(series.iloc[(starts[:, numpy.newaxis] + numpy.arange(SAMPLE_BLOCK_ROWS)).ravel()])
+
+
+def _hash_content(series):
+    values = series.to_numpy() if isinstance(series.dtype, numpy.dtype) and series.dtype != object \
+        else stat_calculator.hash_values(series)
+    return hashlib.blake2b(numpy.ascontiguousarray(values).view(numpy.uint8), digest_size=16).hexdigest()
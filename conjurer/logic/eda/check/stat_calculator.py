@@ -1,41 +1,208 @@
+import json
 import math
 import copy
+import numbers
 import logging
+from concurrent import futures
 
 import numpy
 import pandas
 from pandas.api import types
 
+from conjurer.logic.eda.check import sketch
+
 
 logger = logging.getLogger(__name__)
 
 
-def calc_column_stat(df):
+# Numeric columns of the same dtype are processed together as 2D blocks of at most this size
+BLOCK_BYTES = 64 * 1024 ** 2
+EXECUTORS = {
+    "thread": futures.ThreadPoolExecutor,
+    "process": futures.ProcessPoolExecutor,
+}
+NESTED_VALUE_PREFIX = "\x1e"
+# Percentiles with more ranks than this are read from sorted values instead of partitioned values
+MAX_SELECTED_RANKS = 16
+STAT_COLUMN_NAMES = [
+    "column_name", "dtype", "min", "max", "mean", "std", "ratio_na",
+    "ratio_zero", "unique_count", "is_unique"
+]
+# Additional columns of calc_column_stat(robust=True), only for numeric columns
+ROBUST_STAT_COLUMN_NAMES = ["q1", "median", "q3", "mad", "lower_fence", "upper_fence", "ratio_outlier"]
+OUTLIER_IQR_SCALE = 1.5
+
+
+def calc_column_stat(df, approx=False, error_rate=sketch.DEFAULT_ERROR_RATE, n_jobs=None, executor="thread",
+                     cache=None, robust=False):
+    """
+    If `approx` is True, unique_count is estimated by HyperLogLog (relative error is about `error_rate`).
+    If `n_jobs` > 1, numeric blocks and other columns are calculated concurrently with "thread" or "process"
+    executor (process workers receive only their columns). Results do not depend on `n_jobs`.
+    `df` can be an iterator of data frame chunks, then statistics are accumulated in one pass
+    (see `chunk_stat.StatAccumulator`).
+    If `cache` (stat_cache.StatCache) is set, unchanged columns are served from it and appended rows are merged.
+    If `robust`, quartiles, MAD, Tukey fences and outlier ratio of numeric columns (ROBUST_STAT_COLUMN_NAMES)
+    are added, computed from the same in-memory values as the other statistics
+    """
+    if robust and (cache is not None or not isinstance(df, pandas.DataFrame)):
+        raise ValueError("robust statistics are not supported for cache or chunks")
+    if not isinstance(df, pandas.DataFrame):
+        # chunk_stat depends on this module
+        from conjurer.logic.eda.check import chunk_stat
+        return chunk_stat.StatAccumulator(error_rate=error_rate).update_all(df).get_stat_df()
+    if cache is not None:
+        return cache.calc_column_stat(df, approx, error_rate, n_jobs)
     df_size = len(df)
-    output_column_names = [
-        "column_name", "dtype", "min", "max", "mean", "std", "ratio_na", 
-        "ratio_zero", "unique_count", "is_unique"
+    numeric_blocks = _get_numeric_blocks(df)
+    numeric_columns = {c for columns in numeric_blocks for c in columns}
+    tasks = [(_calc_numeric_block_stat, columns) for columns in numeric_blocks] + [
+        (_calc_other_stat, [c]) for c in df.columns if c not in numeric_columns
+    ]
+    if n_jobs is None or n_jobs <= 1:
+        results = [_run_stat_task(func, df[columns], approx, error_rate, robust) for func, columns in tasks]
+    else:
+        if executor not in EXECUTORS:
+            raise ValueError("executor must be one of {}; got {!r}".format(tuple(EXECUTORS.keys()), executor))
+        with EXECUTORS[executor](max_workers=n_jobs) as pool:
+            results = list(pool.map(
+                _run_stat_task, *zip(*[(func, df[columns], approx, error_rate, robust) for func, columns in tasks])))
+    stats = {column: stat for result in results for column, stat in result.items()}
+    records = []
+    for column in df.columns:
+        stat = stats[column]
+        records.append({
+            "column_name": column,
+            "dtype": str(df.dtypes[column]),
+            **{k: stat[k] for k in ["min", "max", "mean", "std", "unique_count"]},
+            "ratio_na": calc_ratio(stat["num_na"], df_size),
+            "ratio_zero": pandas.NA if stat["num_zero"] is pandas.NA else calc_ratio(stat["num_zero"], df_size),
+            "is_unique": stat["unique_count"] == df_size
+        })
+        if robust:
+            records[-1].update({k: stat.get(k, pandas.NA) for k in ROBUST_STAT_COLUMN_NAMES[:-1]})
+            records[-1]["ratio_outlier"] = \
+                calc_ratio(stat["num_outlier"], df_size) if "num_outlier" in stat else pandas.NA
+    # index is 0 for every row as a result of concatenating 1-row data frames for each column
+    return pandas.DataFrame(
+        records, columns=STAT_COLUMN_NAMES + (ROBUST_STAT_COLUMN_NAMES if robust else []), index=[0] * len(records))
+
+
+def _run_stat_task(func, df, approx, error_rate, robust=False):
+    logger.info("...calculating {} (dtype: {})".format(", ".join(map(str, df.columns)), df.dtypes.iloc[0]))
+    stats = func(df, robust)
+    for column in df.columns:
+        stats[column]["unique_count"] = count_unique_values(df, column, approx, error_rate)
+    return stats
+
+
+def _get_numeric_blocks(df):
+    """Group numeric columns by dtype, then split each group so that a block fits in BLOCK_BYTES"""
+    columns_by_dtype = {}
+    for column in df.columns:
+        dtype = df.dtypes[column]
+        if types.is_numeric_dtype(dtype) and _get_numpy_dtype(dtype) is not None:
+            columns_by_dtype.setdefault(dtype, []).append(column)
+    block_columns = max(1, BLOCK_BYTES // max(8 * len(df), 1))
+    return [
+        columns[i:i + block_columns]
+        for columns in columns_by_dtype.values()
+        for i in range(0, len(columns), block_columns)
     ]
-    def _calc_stat(column, df_size):
-        unique_count = len(get_unique_values(df, column))
-        logger.info("...calculating {} (dtype: {})".format(column, df.dtypes[column]))
-        return pandas.DataFrame(
-            {
-                "column_name": [column],
-                "dtype": [str(df.dtypes[column])],
-                "min": [df[column].min()] if _orderable(df.dtypes[column]) else [pandas.NA],
-                "max": [df[column].max()] if _orderable(df.dtypes[column]) else [pandas.NA],
-                "mean": [df[column].mean()] if types.is_numeric_dtype(df.dtypes[column]) else [pandas.NA],
-                "std": [df[column].std()] if types.is_numeric_dtype(df.dtypes[column]) else [pandas.NA],
-                "ratio_na": [pandas.isnull(df[column]).sum() / float(df_size)],
-                "ratio_zero": [len(df[df[column]==0]) / float(df_size)]\
-                    if types.is_numeric_dtype(df.dtypes[column]) else [pandas.NA],
-                "unique_count": [unique_count],
-                "is_unique": [unique_count == df_size]
-            },
-            columns=output_column_names
-        )
-    return pandas.concat([_calc_stat(c, df_size) for c in df.columns], axis=0)
+
+
+def _calc_numeric_block_stat(block_df, robust=False):
+    """Calculate min, max, mean, std, null count and zero count of all columns in one pass over 2D array"""
+    dtype = block_df.dtypes.iloc[0]
+    numpy_dtype = _get_numpy_dtype(dtype)
+    if isinstance(dtype, numpy.dtype):
+        values = block_df.to_numpy()
+        mask = numpy.isnan(values) if numpy_dtype.kind == "f" else numpy.zeros(values.shape, dtype=bool)
+    else:
+        mask = block_df.isna().to_numpy()
+        values = numpy.column_stack([
+            block_df[c].to_numpy(dtype=numpy_dtype, na_value=numpy_dtype.type(0)) for c in block_df.columns
+        ])
+    num_valid = (~mask).sum(axis=0)
+    upper, lower = _get_bounds(numpy_dtype)
+    mins = numpy.where(mask, upper, values).min(axis=0, initial=upper)
+    maxs = numpy.where(mask, lower, values).max(axis=0, initial=lower)
+    float_values = numpy.where(mask, 0.0, values.astype(numpy.float64))
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        means = float_values.sum(axis=0) / num_valid
+        squares = numpy.where(mask, 0.0, (float_values - means) ** 2).sum(axis=0)
+        stds = numpy.sqrt(squares / (num_valid - 1))
+    stds[num_valid < 2] = numpy.nan
+    num_zero = ((values == 0) & ~mask).sum(axis=0)
+    return {
+        column: {
+            "min": mins[i] if num_valid[i] > 0 else pandas.NA,
+            "max": maxs[i] if num_valid[i] > 0 else pandas.NA,
+            "mean": means[i],
+            "std": stds[i],
+            "num_na": int(len(block_df) - num_valid[i]),
+            "num_zero": int(num_zero[i]),
+            **(_calc_robust_stat(float_values[:, i][~mask[:, i]]) if robust else {}),
+        }
+        for i, column in enumerate(block_df.columns)
+    }
+
+
+def _calc_robust_stat(values):
+    """Quartiles, median absolute deviation, Tukey fences (1.5 IQR) and the number of values outside of them"""
+    if len(values) == 0:
+        return {"num_outlier": 0}
+    q1, median, q3 = _select_ranks(values.copy(), [_get_ind(len(values), ratio) for ratio in [0.25, 0.5, 0.75]])
+    mad = _select_ranks(numpy.abs(values - median), [_get_ind(len(values), 0.5)])[0]
+    lower_fence = q1 - OUTLIER_IQR_SCALE * (q3 - q1)
+    upper_fence = q3 + OUTLIER_IQR_SCALE * (q3 - q1)
+    return {
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "mad": mad,
+        "lower_fence": lower_fence,
+        "upper_fence": upper_fence,
+        "num_outlier": int(numpy.count_nonzero((values < lower_fence) | (values > upper_fence))),
+    }
+
+
+def _calc_other_stat(df, robust=False):
+    series = df.iloc[:, 0]
+    dtype = series.dtype
+    is_numeric = types.is_numeric_dtype(dtype)
+    robust_stat = _calc_robust_stat(series.dropna().to_numpy(dtype=numpy.float64)) if robust and is_numeric else {}
+    return {df.columns[0]: {
+        **robust_stat,
+        "min": series.min() if _orderable(dtype) else pandas.NA,
+        "max": series.max() if _orderable(dtype) else pandas.NA,
+        "mean": series.mean() if is_numeric else pandas.NA,
+        "std": series.std() if is_numeric else pandas.NA,
+        "num_na": int(series.isna().sum()),
+        "num_zero": int((series == 0).sum()) if is_numeric else pandas.NA,
+    }}
+
+
+def _get_numpy_dtype(dtype):
+    """numpy dtype of numeric column values, or None if the column cannot be processed as a block"""
+    numpy_dtype = dtype if isinstance(dtype, numpy.dtype) else getattr(dtype, "numpy_dtype", None)
+    if numpy_dtype is None or numpy_dtype.kind not in "biuf":
+        return None
+    return numpy_dtype
+
+
+def _get_bounds(numpy_dtype):
+    """Values which never become min / max, used in place of null values"""
+    if numpy_dtype.kind == "b":
+        return True, False
+    if numpy_dtype.kind == "f":
+        return numpy.inf, -numpy.inf
+    info = numpy.iinfo(numpy_dtype)
+    return info.max, info.min
+
+
+def calc_ratio(count, df_size):
+    return count / float(df_size) if df_size > 0 else numpy.nan
 
 
 def to_hashable(value):
@@ -53,24 +220,93 @@ def to_hashable(value):
     return value
 
 
-def count_duplicated_rows(df):
-    """Count duplicated rows; works even when cells contain dict/list values."""
-    try:
-        return int(df.duplicated().sum())
-    except TypeError:
-        hashed = df.apply(lambda col: col.map(to_hashable))
-        return int(hashed.duplicated().sum())
+def count_duplicated_rows(df, return_groups=False):
+    """
+    Count duplicated rows (rows which are the same as a previous row); works even when cells contain dict/list values.
+    Rows are compared by 64 bit hash first, then only rows whose hashes collide are compared exactly.
+    If `return_groups` is True, also returns rows of duplicated groups with "duplicate_group" column (group id)
+    """
+    canonical_df = to_canonical(df)
+    if len(df.columns) == 0:
+        # rows without columns are all the same
+        is_candidate = numpy.ones(len(df), dtype=bool)
+    else:
+        hashes = pandas.Series(pandas.util.hash_pandas_object(canonical_df, index=False).to_numpy())
+        is_candidate = hashes.duplicated(keep=False).to_numpy()
+    codes = factorize_rows(canonical_df[is_candidate])
+    num_duplicated = int(pandas.Series(codes).duplicated().sum())
+    if not return_groups:
+        return num_duplicated
+    is_grouped = numpy.bincount(codes, minlength=1)[codes] > 1
+    groups_df = df[is_candidate][is_grouped].copy()
+    groups_df.insert(0, "duplicate_group", pandas.factorize(codes[is_grouped])[0])
+    return num_duplicated, groups_df.sort_values("duplicate_group", kind="stable")
+
+
+def count_unique_values(df, columns, approx=False, error_rate=sketch.DEFAULT_ERROR_RATE):
+    """
+    The number of unique values (rows which include null are excluded as `get_unique_values`),
+    counted by factorization without python objects, or estimated by HyperLogLog if `approx` is True
+    """
+    df_tmp = df[columns].dropna()
+    if approx:
+        hll = sketch.HyperLogLog(error_rate).update(hash_values(df_tmp))
+        # estimate never exceeds the number of values
+        return min(hll.count(), len(df_tmp))
+    if isinstance(df_tmp, pandas.Series):
+        return len(pandas.factorize(to_canonical(df_tmp))[1])
+    codes = factorize_rows(to_canonical(df_tmp))
+    return int(codes.max()) + 1 if len(codes) > 0 else 0
+
+
+def factorize_rows(df):
+    """Code of each row (0, 1, ... in order of appearance), equal rows have the same code. Null equals null"""
+    codes = numpy.zeros(len(df), dtype=numpy.int64)
+    for i in range(len(df.columns)):
+        column_codes, uniques = pandas.factorize(df.iloc[:, i], use_na_sentinel=False)
+        # combine codes of columns into one code, then compact to keep it small
+        codes, _ = pandas.factorize(codes * len(uniques) + column_codes)
+    return codes
+
+
+def hash_values(df_or_series):
+    """64 bit hash of each value (Series) or each row (DataFrame), dict / list values are hashed by their content"""
+    return pandas.util.hash_pandas_object(to_canonical(df_or_series), index=False).to_numpy()
+
+
+def to_canonical(df_or_series):
+    """
+    Replace dict / list / set cells of object columns with canonical JSON strings (keys and set elements are sorted),
+    and equal numbers / bools (e.g. 1, 1.0 and True) with the same python int or float, so that equal values
+    have the same hash, as they are equal for df.duplicated. Columns of other dtypes are returned as they are
+    """
+    if isinstance(df_or_series, pandas.DataFrame):
+        canonical_df = df_or_series
+        for i in range(len(df_or_series.columns)):
+            series = df_or_series.iloc[:, i]
+            canonical_series = to_canonical(series)
+            if canonical_series is not series:
+                if canonical_df is df_or_series:
+                    canonical_df = df_or_series.copy(deep=False)
+                canonical_df.isetitem(i, canonical_series)
+        return canonical_df
+    if not types.is_object_dtype(df_or_series.dtype):
+        return df_or_series
+    return df_or_series.map(_to_canonical_value)
 
 
 def get_unique_values(df, columns):
     df_tmp = df[columns].dropna()
     if isinstance(df_tmp, pandas.Series):
-        values = list(df_tmp.values)
+        # pyarrow-backed column deduplicates natively, only unique values become python objects
+        values = list(df_tmp.unique()) if _is_arrow_dtype(df_tmp.dtype) else list(df_tmp.values)
         try:
             return set(values)
         except TypeError:
             # object columns may contain dict/list; return hashable forms
             return {to_hashable(v) for v in values}
+    elif any(_is_arrow_dtype(dtype) for dtype in df_tmp.dtypes):
+        return set(df_tmp.drop_duplicates().itertuples(index=False, name=None))
     else:
         rows = [tuple(v) for v in df_tmp.values]
         try:
@@ -79,17 +315,26 @@ def get_unique_values(df, columns):
             return {tuple(to_hashable(x) for x in row) for row in rows}
 
 
-def calculate_percentiles_for_df(df, column_list, ratio_list):
+def calculate_percentiles_for_df(df, column_list, ratio_list, approx=False, compression=sketch.DEFAULT_COMPRESSION):
+    """
+    Percentile table of numeric / datetime columns (null and infinite values are excluded).
+    Columns of the same kind are processed as 2D block, and only requested ranks are selected by partition
+    instead of sorting. If `approx`, percentiles are estimated by `sketch.QuantileDigest` (min / max are exact)
+    """
+    ratio_list = [0] + list(ratio_list) + [1]
+    if approx:
+        percentiles = {c: _calc_approx_percentiles(df[c], ratio_list, compression) for c in column_list}
+    else:
+        percentiles = {}
+        for columns in _get_percentile_blocks(df, column_list):
+            percentiles.update(_calc_block_percentiles(df[columns], ratio_list))
     value_dic = {
         **{
             "name": ["min"] +
-                     ["{0:.2%}-percentile".format(ratio) for ratio in ratio_list]
+                     ["{0:.2%}-percentile".format(ratio) for ratio in ratio_list[1:-1]]
                      + ["max"]
         },
-        **{
-            c: calculate_percentiles(df[column].values, ratio_list)
-            for c in column_list
-        }
+        **{c: percentiles[c] for c in column_list}
     }
     return pandas.DataFrame(value_dic, columns=["name"] + column_list).set_index("name")
 
@@ -100,27 +345,152 @@ def calculate_percentiles(array, ratio_list):
     n_record = valid_array.shape[0]
     if n_record0 - n_record > 0:
         logger.info("{0} records have missing values (out of {1} records)".format(n_record0 - n_record, n_record0))
-    sorted_array = numpy.sort(valid_array)
-    ind_list = [_get_ind(n_record, ratio) for ratio in ratio_list]
-    return numpy.array([sorted_array[ind] for ind in ind_list])
-
-
-def calculate_series_stats(column_name, column_dtype, grb_obj):
-    if types.is_numeric_dtype(column_dtype):
-        return [f"{agg}({column_name})" for agg in ["min", "max", "mean", "std"]], \
-            [grb_obj[column_name].min(), grb_obj[column_name].max(),
-             grb_obj[column_name].mean(), grb_obj[column_name].std()]
-    elif types.is_datetime64_any_dtype(column_dtype):
-        return [f"{agg}({column_name})" for agg in ["min", "max"]], \
-            [grb_obj[column_name].min(), grb_obj[column_name].max()]
+    return _select_ranks(valid_array.copy(), [_get_ind(n_record, ratio) for ratio in ratio_list])
+
+
+def _get_percentile_blocks(df, column_list):
+    """Group columns by kind of sortable values (float, int or datetime), then split by BLOCK_BYTES"""
+    columns_by_kind = {}
+    for column in column_list:
+        columns_by_kind.setdefault(_get_percentile_kind(df.dtypes[column]), []).append(column)
+    block_columns = max(1, BLOCK_BYTES // max(8 * len(df), 1))
+    return [
+        columns[i:i + block_columns]
+        for columns in columns_by_kind.values()
+        for i in range(0, len(columns), block_columns)
+    ]
+
+
+def _get_percentile_kind(dtype):
+    if types.is_datetime64_any_dtype(dtype):
+        if isinstance(dtype, pandas.ArrowDtype):
+            return "datetime", dtype.pyarrow_dtype.unit, str(dtype.pyarrow_dtype.tz)
+        unit = dtype.unit if hasattr(dtype, "unit") else numpy.datetime_data(dtype)[0]
+        return "datetime", unit, str(getattr(dtype, "tz", None))
+    if types.is_float_dtype(dtype):
+        return "float",
+    if types.is_integer_dtype(dtype) or types.is_bool_dtype(dtype):
+        return "int",
+    raise ValueError("percentiles are only for numeric / datetime columns; got {}".format(dtype))
+
+
+def _calc_block_percentiles(block_df, ratio_list):
+    kind = _get_percentile_kind(block_df.dtypes.iloc[0])
+    if kind[0] == "datetime" and kind[2] != "None":
+        block_df = block_df.apply(lambda s: s.dt.tz_convert(None))
+    # column-major so that each column is contiguous
+    values = numpy.empty((len(block_df), len(block_df.columns)), dtype=_get_percentile_dtype(kind), order="F")
+    for i, c in enumerate(block_df.columns):
+        values[:, i] = block_df[c].to_numpy(dtype="M8[{}]".format(kind[1])).view(numpy.int64) if kind[0] == "datetime" \
+            else block_df[c].to_numpy(dtype=values.dtype, na_value=numpy.nan if kind[0] == "float" else 0)
+    is_valid = numpy.isfinite(values) if kind[0] == "float" else numpy.asfortranarray(~block_df.isna().to_numpy())
+    num_valid = is_valid.sum(axis=0)
+    num_missing = len(block_df) * len(num_valid) - num_valid.sum()
+    if num_missing > 0:
+        logger.info("{0} values are missing (out of {1} records in {2} columns)".format(
+            num_missing, len(block_df), len(num_valid)))
+    return {
+        c: _restore_percentiles(
+            _select_ranks(values[:, i][is_valid[:, i]], [_get_ind(num_valid[i], ratio) for ratio in ratio_list]),
+            num_valid[i], kind)
+        for i, c in enumerate(block_df.columns)
+    }
+
+
+def _get_percentile_dtype(kind):
+    return numpy.dtype(numpy.float64) if kind[0] == "float" else numpy.dtype(numpy.int64)
+
+
+def _select_ranks(values, ind_list):
+    """
+    Values at `ind_list` in sorted order. `values` (a copy) is partitioned in place around the middle rank,
+    then each side is partitioned for the remaining ranks, because partition with single kth is much faster
+    than with multiple kth. Min / max are reduced directly. Many ranks are read from fully sorted values
+    """
+    if len(values) == 0:
+        return numpy.zeros(len(ind_list), dtype=values.dtype)
+    ranks = sorted({ind for ind in ind_list if 0 < ind < len(values) - 1})
+    if len(ranks) > MAX_SELECTED_RANKS:
+        values.sort()
     else:
-        return [f"nunique({column_name})"], [grb_obj[column_name].nunique()]
+        _partition_ranks(values, ranks, 0, len(values))
+    selected = {0: values.min(), len(values) - 1: values.max(), **{ind: values[ind] for ind in ranks}}
+    return numpy.array([selected[ind] for ind in ind_list], dtype=values.dtype)
+
+
+def _partition_ranks(values, ranks, start, end):
+    if len(ranks) == 0:
+        return
+    middle = len(ranks) // 2
+    rank = ranks[middle]
+    values[start:end].partition(rank - start)
+    _partition_ranks(values, ranks[:middle], start, rank)
+    _partition_ranks(values, ranks[middle + 1:], rank + 1, end)
+
+
+def _restore_percentiles(values, num_valid, kind):
+    if kind[0] == "datetime":
+        timestamps = pandas.Series(values.view("M8[{}]".format(kind[1])))
+        if num_valid == 0:
+            timestamps[:] = pandas.NaT
+        return (timestamps.dt.tz_localize("UTC").dt.tz_convert(kind[2]) if kind[2] != "None" else timestamps).array
+    if num_valid == 0:
+        return numpy.full(len(values), numpy.nan)
+    return values
+
+
+def _calc_approx_percentiles(series, ratio_list, compression):
+    kind = _get_percentile_kind(series.dtype)
+    if kind[0] == "datetime":
+        series = series.dt.tz_convert(None) if kind[2] != "None" else series
+        values = series.dropna().to_numpy(dtype="M8[{}]".format(kind[1])).view(numpy.int64).astype(numpy.float64)
+    else:
+        values = series.to_numpy(dtype=numpy.float64, na_value=numpy.nan)
+        values = values[numpy.isfinite(values)]
+    digest = sketch.QuantileDigest(compression)
+    digest.update(values)
+    percentiles = digest.quantile(ratio_list)
+    if kind[0] != "datetime":
+        return percentiles
+    timestamps = pandas.Series(pandas.to_datetime(percentiles, unit=kind[1])).dt.as_unit(kind[1])
+    return (timestamps.dt.tz_localize("UTC").dt.tz_convert(kind[2]) if kind[2] != "None" else timestamps).array
+
+
+def _to_canonical_value(value):
+    if isinstance(value, (bool, numpy.bool_, numbers.Integral)):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        # object columns are hashed by string form, where 1.0 and 1 differ
+        return int(value) if float(value).is_integer() else float(value)
+    if not isinstance(value, (dict, list, tuple, set, frozenset)):
+        return value
+    try:
+        serialized = _CANONICAL_JSON_ENCODER.encode(value)
+    except TypeError:
+        # e.g. dict keys of mixed types cannot be sorted
+        serialized = repr(to_hashable(value))
+    # prefix so that serialized nested value is not equal to a plain string value
+    return NESTED_VALUE_PREFIX + serialized
+
+
+def _to_json_default(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    return repr(value)
+
+
+_CANONICAL_JSON_ENCODER = json.JSONEncoder(
+    sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_to_json_default)
 
 
 def _get_ind(n_record, ratio):
     return 0 if ratio == 0 else int(math.ceil(n_record * ratio)) - 1
 
 
+def _is_arrow_dtype(dtype):
+    return isinstance(dtype, pandas.ArrowDtype)
+
+
 def _orderable(dtype):
     if types.is_numeric_dtype(dtype) or types.is_datetime64_any_dtype(dtype):
         return True
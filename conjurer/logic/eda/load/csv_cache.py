@@ -0,0 +1,239 @@
+"""On-disk columnar cache for data frames loaded from CSV files (one .npy file per column)."""
+
+import os
+import json
+import pickle
+import shutil
+import hashlib
+import logging
+
+import numpy
+import pandas
+from pandas.api import types
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+META_FILENAME = "meta.json"
+LINK_SUFFIX = ".link"
+FORMAT_VERSION = 3
+
+
+class CsvCache(object):
+    """
+    Cache of converted data frames keyed by file content hash and read kwargs.
+    Each entry is also linked from a key of file path, size and mtime, so that the file is hashed
+    only when the link is missing (e.g. new or touched file), at most once per read.
+    Entries are evicted in least-recently-used order when the total size exceeds `max_bytes`
+    """
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # (file stat key, content hash) of the last hashed file, reused between get and put
+        self._last_content_hash = None
+
+    def get(self, filepath, read_kwargs):
+        entry_dir = self._find_entry_dir(filepath, read_kwargs)
+        if entry_dir is None:
+            logger.info("cache miss: {}".format(filepath))
+            return None
+        meta_path = os.path.join(entry_dir, META_FILENAME)
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        # Touch meta file to record the access for LRU eviction
+        os.utime(meta_path)
+        logger.info("cache hit: {}".format(filepath))
+        return _load_df(entry_dir, meta)
+
+    def put(self, filepath, read_kwargs, df):
+        entry_dir = os.path.join(self.cache_dir, self._get_content_key(filepath, read_kwargs))
+        tmp_dir = "{}.tmp{}".format(entry_dir, os.getpid())
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        meta = _save_df(tmp_dir, df)
+        with open(os.path.join(tmp_dir, META_FILENAME), "w") as f:
+            json.dump(meta, f)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+        self._link(filepath, read_kwargs, entry_dir)
+        self.evict()
+
+    def evict(self):
+        entries = [
+            (os.path.getmtime(os.path.join(entry_dir, META_FILENAME)), _get_dir_size(entry_dir), entry_dir)
+            for entry_dir in [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)]
+            if os.path.exists(os.path.join(entry_dir, META_FILENAME))
+        ]
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            logger.info("evict cache entry: {}".format(entry_dir))
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_bytes -= size
+        for name in os.listdir(self.cache_dir):
+            link_path = os.path.join(self.cache_dir, name)
+            if name.endswith(LINK_SUFFIX) and not os.path.exists(os.path.join(_read_link(link_path), META_FILENAME)):
+                os.remove(link_path)
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _find_entry_dir(self, filepath, read_kwargs):
+        link_path = os.path.join(self.cache_dir, get_stat_key(filepath, read_kwargs) + LINK_SUFFIX)
+        if os.path.exists(link_path):
+            entry_dir = _read_link(link_path)
+            if os.path.exists(os.path.join(entry_dir, META_FILENAME)):
+                return entry_dir
+        entry_dir = os.path.join(self.cache_dir, self._get_content_key(filepath, read_kwargs))
+        if not os.path.exists(os.path.join(entry_dir, META_FILENAME)):
+            return None
+        self._link(filepath, read_kwargs, entry_dir)
+        return entry_dir
+
+    def _get_content_key(self, filepath, read_kwargs):
+        stat_key = get_stat_key(filepath, {})
+        if self._last_content_hash is None or self._last_content_hash[0] != stat_key:
+            with open(filepath, "rb") as f:
+                self._last_content_hash = stat_key, hashlib.file_digest(f, "blake2b").hexdigest()
+        return _hash_key((FORMAT_VERSION, self._last_content_hash[1], _normalize_kwargs(read_kwargs)))
+
+    def _link(self, filepath, read_kwargs, entry_dir):
+        link_path = os.path.join(self.cache_dir, get_stat_key(filepath, read_kwargs) + LINK_SUFFIX)
+        with open(link_path, "w") as f:
+            f.write(os.path.basename(entry_dir))
+
+
+def is_cacheable(filepath_or_buffer):
+    return isinstance(filepath_or_buffer, (str, os.PathLike)) and os.path.isfile(filepath_or_buffer)
+
+
+def get_stat_key(filepath, read_kwargs):
+    """Key of file path, size, mtime and read kwargs, which does not read the file"""
+    stat = os.stat(filepath)
+    return _hash_key((
+        FORMAT_VERSION, os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns, _normalize_kwargs(read_kwargs)))
+
+
+def _normalize_kwargs(read_kwargs):
+    return sorted((k, repr(v)) for k, v in read_kwargs.items())
+
+
+def _hash_key(key_source):
+    return hashlib.blake2b(repr(key_source).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _read_link(link_path):
+    with open(link_path, "r") as f:
+        return os.path.join(os.path.dirname(link_path), f.read().strip())
+
+
+def _save_df(dirpath, df):
+    return {
+        "columns": [
+            _save_array(dirpath, "column{}".format(i), df[c]) for i, c in enumerate(df.columns)
+        ],
+        "column_names": list(df.columns),
+        "index": None if _is_default_index(df.index) else _save_array(dirpath, "index", df.index),
+        "num_rows": len(df),
+    }
+
+
+def _load_df(dirpath, meta):
+    index = None if meta["index"] is None else pandas.Index(_load_array(dirpath, meta["index"]))
+    return pandas.DataFrame(
+        {
+            name: pandas.Series(_load_array(dirpath, column_meta), index=index, copy=False)
+            for name, column_meta in zip(meta["column_names"], meta["columns"])
+        },
+        columns=meta["column_names"],
+        index=index if index is not None else pandas.RangeIndex(meta["num_rows"]),
+    )
+
+
+def _save_array(dirpath, name, values):
+    """Save one column, returns metadata to restore it with exactly the same dtype"""
+    dtype = values.dtype
+    if isinstance(dtype, numpy.dtype) and dtype != object:
+        numpy.save(os.path.join(dirpath, name), values.to_numpy())
+        return {"kind": "numpy", "name": name}
+    if _is_arrow_backed(dtype):
+        # pyarrow arrays pickle their buffers as they are, and keep the exact arrow type
+        return _pickle_array(dirpath, name, values)
+    if isinstance(dtype, pandas.api.extensions.ExtensionDtype) and hasattr(dtype, "numpy_dtype") \
+            and (types.is_numeric_dtype(dtype) or types.is_bool_dtype(dtype)):
+        # nullable Int* / Float* / boolean: values + mask
+        mask = numpy.asarray(pandas.isna(values))
+        numpy.save(os.path.join(dirpath, name), values.to_numpy(dtype=dtype.numpy_dtype, na_value=0))
+        numpy.save(os.path.join(dirpath, name + "_mask"), mask)
+        return {"kind": "masked", "name": name, "dtype": str(dtype)}
+    if isinstance(dtype, pandas.CategoricalDtype):
+        numpy.save(os.path.join(dirpath, name), numpy.asarray(values.cat.codes))
+        return {
+            "kind": "category", "name": name, "ordered": bool(dtype.ordered),
+            "categories": _save_array(dirpath, name + "_categories", pandas.Series(dtype.categories))
+        }
+    if types.is_string_dtype(dtype) and dtype != object:
+        # UTF-8 bytes of all values + offsets, fixed width unicode arrays would pad to the longest value
+        mask = numpy.asarray(pandas.isna(values))
+        encoded = [value.encode("utf-8") for value in values.fillna("").to_numpy(dtype=object)]
+        offsets = numpy.zeros(len(encoded) + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.fromiter(map(len, encoded), dtype=numpy.int64, count=len(encoded)), out=offsets[1:])
+        numpy.save(os.path.join(dirpath, name), numpy.frombuffer(b"".join(encoded), dtype=numpy.uint8))
+        numpy.save(os.path.join(dirpath, name + "_offsets"), offsets)
+        numpy.save(os.path.join(dirpath, name + "_mask"), mask)
+        return {"kind": "string", "name": name, "dtype": str(dtype), "storage": dtype.storage}
+    # object columns (may contain any python objects) and other extension arrays
+    return _pickle_array(dirpath, name, values)
+
+
+def _pickle_array(dirpath, name, values):
+    with open(os.path.join(dirpath, name + ".pkl"), "wb") as f:
+        pickle.dump(values.array, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return {"kind": "pickle", "name": name}
+
+
+def _is_arrow_backed(dtype):
+    return isinstance(dtype, pandas.ArrowDtype) or getattr(dtype, "storage", None) == "pyarrow"
+
+
+def _get_string_dtype(meta):
+    dtype = pandas.api.types.pandas_dtype(meta["dtype"])
+    if dtype.storage == meta["storage"]:
+        return dtype
+    # "string" / "str" resolve to the default storage, which may differ from the stored one
+    if meta["dtype"] == "str":
+        return pandas.StringDtype(storage=meta["storage"], na_value=numpy.nan)
+    return pandas.StringDtype(storage=meta["storage"])
+
+
+def _load_array(dirpath, meta):
+    path = os.path.join(dirpath, meta["name"])
+    if meta["kind"] == "numpy":
+        return numpy.load(path + ".npy")
+    if meta["kind"] == "masked":
+        dtype = pandas.api.types.pandas_dtype(meta["dtype"])
+        return dtype.construct_array_type()(numpy.load(path + ".npy"), numpy.load(path + "_mask.npy"))
+    if meta["kind"] == "category":
+        categories = _load_array(dirpath, meta["categories"])
+        return pandas.Categorical.from_codes(numpy.load(path + ".npy"), categories, ordered=meta["ordered"])
+    if meta["kind"] == "string":
+        buffer = numpy.load(path + ".npy").tobytes()
+        offsets = numpy.load(path + "_offsets.npy").tolist()
+        strings = numpy.array(
+            [buffer[start:end].decode("utf-8") for start, end in zip(offsets[:-1], offsets[1:])], dtype=object)
+        strings[numpy.load(path + "_mask.npy")] = None
+        return pandas.array(strings, dtype=_get_string_dtype(meta))
+    with open(path + ".pkl", "rb") as f:
+        return pickle.load(f)
+
+
+def _is_default_index(index):
+    return isinstance(index, pandas.RangeIndex) and index.start == 0 and index.step == 1 and index.name is None
+
+
+def _get_dir_size(dirpath):
+    return sum(entry.stat().st_size for entry in os.scandir(dirpath) if entry.is_file())
@@ -1,6 +1,25 @@
+import os
+import json
+import time
+import logging
+from concurrent import futures
+
+import pandas
+from pandas.api import types
+
 from conjurer.logic.eda.load import pandas_csv
 
 
+logger = logging.getLogger(__name__)
+
+# Rough ratio of in-memory data frame size to CSV file size, used for memory budget
+MEMORY_PER_FILE_BYTE = 3
+EXECUTORS = {
+    "process": futures.ProcessPoolExecutor,
+    "thread": futures.ThreadPoolExecutor,
+}
+
+
 class DfDictLoader(object):
     """
     Class to load df dictionary as the same dtypes as previous dictionary
@@ -9,13 +28,115 @@ class DfDictLoader(object):
         self.dtypes = {}
         for name in df_dict.keys():
             self.dtypes[name] = df_dict[name].dtypes
+        self.load_report = None
 
-    def load(self, filepath_dict: dict):
-        self._validate(filepath_dict)
-        return {
-            name: pandas_csv.read_csv(filepath_dict[name], dtype=self.dtypes[name])
-            for name in filepath_dict.keys()
+    @classmethod
+    def from_schema(cls, filepath):
+        """
+        Create loader from schema file saved by `save_schema`, without any data frame
+        """
+        with open(filepath, "r") as f:
+            schema = json.load(f)
+        loader = cls({})
+        loader.dtypes = {
+            name: pandas.Series({c: types.pandas_dtype(dtype) for c, dtype in column_dtypes.items()}, dtype=object)
+            for name, column_dtypes in schema.items()
+        }
+        return loader
+
+    def save_schema(self, filepath):
+        """
+        Save dtypes of each table as JSON ({table name: {column name: dtype}})
+        """
+        schema = {
+            name: {c: str(dtype) for c, dtype in dtypes.items()}
+            for name, dtypes in self.dtypes.items()
         }
+        with open(filepath, "w") as f:
+            json.dump(schema, f, indent=2)
+
+    def load(self, filepath_dict: dict, cache=None, max_workers=None, executor="process",
+             memory_budget_bytes=None, optimize_memory=False, dtype_backend=None):
+        """
+        Load all files in `filepath_dict`. If `max_workers` > 1, tables are parsed concurrently with
+        "process" or "thread" executor, and tables in progress are limited so that their estimated memory
+        stays within `memory_budget_bytes`. Time and the number of rows for each table is stored in `load_report`.
+        If `optimize_memory` is True, columns are downcasted after loading with the stored dtypes.
+        If `dtype_backend` is "pyarrow", stored dtypes are converted to corresponding pyarrow-backed dtypes
+        """
+        self._validate(filepath_dict)
+        load_args = (cache, optimize_memory, dtype_backend)
+        if max_workers is None or max_workers <= 1:
+            results = [
+                _load_table(name, filepath_dict[name], self.dtypes[name], *load_args)
+                for name in filepath_dict.keys()
+            ]
+        else:
+            results = self._load_concurrently(filepath_dict, load_args, max_workers, executor, memory_budget_bytes)
+        df_dict = {name: df for name, df, _ in results}
+        self.load_report = pandas.DataFrame({
+            "table_name": [name for name, _, _ in results],
+            "num_rows": [len(df) for _, df, _ in results],
+            "num_columns": [len(df.columns) for _, df, _ in results],
+            "seconds": [seconds for _, _, seconds in results],
+        }).sort_values("seconds", ascending=False, ignore_index=True)
+        logger.info("load report:\n{}".format(self.load_report))
+        return {name: df_dict[name] for name in filepath_dict.keys()}
+
+    def _load_concurrently(self, filepath_dict, load_args, max_workers, executor, memory_budget_bytes):
+        if executor not in EXECUTORS:
+            raise ValueError("executor must be one of {}; got {!r}".format(tuple(EXECUTORS.keys()), executor))
+        # Largest tables first to shorten the total time
+        pending = sorted(filepath_dict.keys(), key=lambda name: -_estimate_memory(filepath_dict[name]))
+        results = []
+        with EXECUTORS[executor](max_workers=max_workers) as pool:
+            running = {}
+            while pending or running:
+                while pending and _fits_budget(
+                        _estimate_memory(filepath_dict[pending[0]]), running.values(), memory_budget_bytes):
+                    name = pending.pop(0)
+                    future = pool.submit(_load_table, name, filepath_dict[name], self.dtypes[name], *load_args)
+                    running[future] = _estimate_memory(filepath_dict[name])
+                done, _ = futures.wait(running.keys(), return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    results.append(future.result())
+        return results
 
     def _validate(self, filepath_dict: dict):
-        assert set(filepath_dict.keys()) == set(self.dtypes.keys())
+        mismatches = {
+            **{name: "missing table" for name in self.dtypes.keys() if name not in filepath_dict},
+            **{name: "unexpected table" for name in filepath_dict.keys() if name not in self.dtypes},
+        }
+        if mismatches:
+            raise pandas_csv.SchemaMismatchError(mismatches)
+
+
+def _load_table(name, filepath, dtypes, cache, optimize_memory, dtype_backend):
+    start = time.perf_counter()
+    kwargs = {}
+    if dtype_backend is not None:
+        kwargs["dtype_backend"] = dtype_backend
+        if dtype_backend == "pyarrow":
+            dtypes = pandas_csv.to_arrow_dtypes(dtypes)
+    try:
+        df = pandas_csv.read_csv(filepath, dtypes=dtypes, cache=cache, optimize_memory=optimize_memory, **kwargs)
+    except pandas_csv.SchemaMismatchError as e:
+        raise pandas_csv.SchemaMismatchError({
+            "{}.{}".format(name, c): message for c, message in e.mismatches.items()
+        }) from e
+    return name, df, time.perf_counter() - start
+
+
+def _estimate_memory(filepath_or_buffer):
+    if isinstance(filepath_or_buffer, (str, os.PathLike)) and os.path.isfile(filepath_or_buffer):
+        return os.path.getsize(filepath_or_buffer) * MEMORY_PER_FILE_BYTE
+    return 0
+
+
+def _fits_budget(memory, running_memories, memory_budget_bytes):
+    running_memories = list(running_memories)
+    if memory_budget_bytes is None or not running_memories:
+        # Always run at least one table even if it exceeds the budget alone
+        return True
+    return sum(running_memories) + memory <= memory_budget_bytes
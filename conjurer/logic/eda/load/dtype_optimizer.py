@@ -0,0 +1,85 @@
+"""Downcast columns to the smallest dtypes which keep all values."""
+
+import numpy
+import pandas
+from pandas.api import types
+
+
+INTEGER_DTYPES = ["Int8", "Int16", "Int32", "Int64"]
+ARROW_INTEGER_DTYPES = ["int8[pyarrow]", "int16[pyarrow]", "int32[pyarrow]", "int64[pyarrow]"]
+# Text columns are converted to category if (# of unique values) / (# of non-null values) is at most this ratio
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def optimize_dtypes(df, category_max_unique_ratio=CATEGORY_MAX_UNIQUE_RATIO):
+    """
+    Returns data frame with downcasted columns and memory report for each column
+    """
+    bytes_before = df.memory_usage(deep=True, index=False)
+    dtypes_before = df.dtypes
+    for c in df.columns:
+        df[c] = optimize_column(df[c], category_max_unique_ratio)
+    bytes_after = df.memory_usage(deep=True, index=False)
+    report_df = pandas.DataFrame({
+        "column_name": list(df.columns),
+        "dtype_before": [str(dtypes_before[c]) for c in df.columns],
+        "dtype_after": [str(df.dtypes[c]) for c in df.columns],
+        "bytes_before": bytes_before.values,
+        "bytes_after": bytes_after.values,
+    })
+    report_df["reduction_ratio"] = 1 - report_df["bytes_after"] / report_df["bytes_before"].where(
+        report_df["bytes_before"] > 0)
+    return df, report_df
+
+
+def optimize_column(series, category_max_unique_ratio=CATEGORY_MAX_UNIQUE_RATIO):
+    if types.is_bool_dtype(series.dtype) or isinstance(series.dtype, pandas.CategoricalDtype):
+        return series
+    if types.is_integer_dtype(series.dtype):
+        return _downcast_integer(series)
+    if types.is_float_dtype(series.dtype):
+        return _downcast_float(series)
+    if types.is_object_dtype(series.dtype) or types.is_string_dtype(series.dtype):
+        return _to_category(series, category_max_unique_ratio)
+    return series
+
+
+def _downcast_integer(series):
+    if series.isna().all():
+        return series
+    minv, maxv = series.min(), series.max()
+    candidates = ARROW_INTEGER_DTYPES if isinstance(series.dtype, pandas.ArrowDtype) else INTEGER_DTYPES
+    for dtype, numpy_dtype in zip(candidates, [numpy.int8, numpy.int16, numpy.int32, numpy.int64]):
+        info = numpy.iinfo(numpy_dtype)
+        if info.min <= minv and maxv <= info.max:
+            return series.astype(dtype)
+    return series
+
+
+def _downcast_float(series):
+    if series.dtype.itemsize <= 4:
+        return series
+    if isinstance(series.dtype, pandas.ArrowDtype):
+        float32_dtype = "float[pyarrow]"
+    elif isinstance(series.dtype, pandas.api.extensions.ExtensionDtype):
+        float32_dtype = "Float32"
+    else:
+        float32_dtype = "float32"
+    downcasted = series.astype(float32_dtype)
+    # Lossless only if every value (incl. inf) survives the float64 -> float32 -> float64 round trip
+    is_same = (downcasted.astype(series.dtype) == series) | (series.isna() & downcasted.isna())
+    return downcasted if bool(is_same.all()) else series
+
+
+def _to_category(series, category_max_unique_ratio):
+    num_values = series.count()
+    if num_values == 0:
+        return series
+    try:
+        num_unique = series.nunique()
+    except TypeError:
+        # dict / list cells
+        return series
+    if num_unique / num_values > category_max_unique_ratio:
+        return series
+    return series.astype("category")
@@ -1,25 +1,150 @@
+import os
 import logging
 import warnings
+from concurrent import futures
 
 import pandas
 from pandas.api import types
+from pandas.tseries.api import guess_datetime_format
+
+from conjurer.logic.eda.load import (
+    csv_cache,
+    dtype_optimizer
+)
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SAMPLE_ROWS = 10000
+TIMESTAMP_DETECTION_ROWS = 100
+TIMESTAMP_PARSE_WORKERS = min(4, os.cpu_count() or 1)
+
 
-def read_csv(filepath_or_buffer, **kwargs):
+def read_csv(filepath_or_buffer, chunksize=None, sample_rows=DEFAULT_SAMPLE_ROWS, single_parse=False, dtypes=None,
+             cache=None, optimize_memory=False, **kwargs):
     """
     pandas.read_csv with automatic data type inference for int / timestamp, and resolve string issue
     https://pandas.pydata.org/pandas-docs/stable/reference/api/pandas.errors.DtypeWarning.html
+
+    If `chunksize` is set, returns an iterator of chunks (see `iter_csv`)
+    If `dtypes` is set, no inference is done and the file is parsed once with those dtypes
+    If `single_parse` is True, dtypes are inferred from the first `sample_rows` rows and the file is parsed once
+    with them; it falls back to the full inference if the sample does not represent the whole file
+    If `cache` (csv_cache.CsvCache) is set, converted data frame is stored to / loaded from the cache
+    If `optimize_memory` is True, columns are downcasted to the smallest dtypes (see dtype_optimizer)
     """
+    if chunksize is not None:
+        if optimize_memory:
+            raise ValueError("optimize_memory cannot be used with chunksize since dtypes may differ between chunks")
+        return iter_csv(filepath_or_buffer, chunksize, sample_rows, **kwargs)
+    if cache is not None and csv_cache.is_cacheable(filepath_or_buffer):
+        read_kwargs = dict(
+            kwargs, single_parse=single_parse, dtypes=None if dtypes is None else dict(dtypes),
+            optimize_memory=optimize_memory)
+        df = cache.get(filepath_or_buffer, read_kwargs)
+        if df is None:
+            df = read_csv(filepath_or_buffer, sample_rows=sample_rows, single_parse=single_parse, dtypes=dtypes,
+                          optimize_memory=optimize_memory, **kwargs)
+            cache.put(filepath_or_buffer, read_kwargs, df)
+        return df
+    df = _read_csv(filepath_or_buffer, sample_rows, single_parse, dtypes, **kwargs)
+    if optimize_memory:
+        df, report_df = dtype_optimizer.optimize_dtypes(df)
+        logger.info("memory usage by column:\n{}".format(report_df))
+    return df
+
+
+def _read_csv(filepath_or_buffer, sample_rows, single_parse, dtypes, **kwargs):
+    if dtypes is not None:
+        return read_csv_with_dtypes(filepath_or_buffer, dtypes, **kwargs)
+    position = _tell(filepath_or_buffer)
+    if single_parse:
+        sample_df = _read_sample(filepath_or_buffer, sample_rows, **kwargs)
+        timestamp_formats = get_timestamp_formats(sample_df)
+        nullable_columns = sample_df.columns[sample_df.isna().any()]
+        sampled_dtypes = infer_dtypes(sample_df, timestamp_formats)
+        try:
+            return read_csv_with_dtypes(
+                filepath_or_buffer, sampled_dtypes, timestamp_formats, nullable_columns, **kwargs)
+        except SchemaMismatchError as e:
+            logger.info("dtypes inferred from sample do not match, fall back to full inference: {}".format(
+                e.message))
+            _seek(filepath_or_buffer, position)
     df = pandas.read_csv(filepath_or_buffer, **kwargs)
+    return convert_columns(df)
+
+
+def read_csv_with_dtypes(filepath_or_buffer, dtypes, timestamp_formats=None, nullable_columns=None, **kwargs):
+    """
+    Parse CSV once with parser dtype / parse_dates / date_format hints generated from `dtypes`
+    and `timestamp_formats` ({column name: strftime format}).
+    Integer columns not in `nullable_columns` (None means every column may have nulls) are parsed as numpy
+    integers, and the others as float64 then converted, since the parser is slow for nullable integer dtypes.
+    If the parser rejects the hints, parse without hints and convert afterwards.
+    Raises SchemaMismatchError if the file cannot be converted to `dtypes`
+    """
+    position = _tell(filepath_or_buffer)
+    try:
+        df = pandas.read_csv(
+            filepath_or_buffer, **_get_parser_kwargs(dtypes, timestamp_formats, nullable_columns, kwargs))
+    except (TypeError, ValueError, NotImplementedError) as e:
+        logger.info("parser rejected dtype hints, parse without hints: {}".format(e))
+        _seek(filepath_or_buffer, position)
+        df = pandas.read_csv(filepath_or_buffer, **kwargs)
+    return apply_dtypes(df, dtypes, timestamp_formats)
+
+
+def iter_csv(filepath_or_buffer, chunksize, sample_rows=DEFAULT_SAMPLE_ROWS, **kwargs):
+    """
+    Read CSV chunk by chunk. Data types are inferred once from the first `sample_rows` rows,
+    then every chunk is converted to exactly the same dtypes.
+    Columns without any value in the sample are read as text, since later chunks may have any values.
+    Buffers have to be seekable since the sample is read before the chunks.
+    Raises SchemaMismatchError if a chunk cannot be converted to the inferred dtypes
+    """
+    sample_df = _read_sample(filepath_or_buffer, sample_rows, **kwargs)
+    null_columns = sample_df.columns[sample_df.isna().all()]
+    timestamp_formats = get_timestamp_formats(sample_df)
+    dtypes = _widen_null_columns(infer_dtypes(sample_df, timestamp_formats), null_columns)
+    kwargs["dtype"] = _merge_dtype(_get_text_dtype_hints(dtypes), kwargs.get("dtype"))
+    with pandas.read_csv(filepath_or_buffer, chunksize=chunksize, **kwargs) as reader:
+        for chunk in reader:
+            yield apply_dtypes(chunk, dtypes, timestamp_formats)
+
+
+def convert_columns(df, timestamp_formats=None):
     df = convert_integer_columns(df)
-    df = convert_timestamp_columns(df)
+    df = convert_timestamp_columns(df, timestamp_formats)
     df = convert_string_columns(df)
     return df
 
 
+def infer_dtypes(df, timestamp_formats=None):
+    return convert_columns(df, timestamp_formats).dtypes
+
+
+def apply_dtypes(df, dtypes, timestamp_formats=None):
+    """
+    Convert columns of raw `df` (as returned by pandas.read_csv) to `dtypes`
+    """
+    timestamp_formats = timestamp_formats or {}
+    mismatches = {}
+    for c, dtype in dtypes.items():
+        if c not in df.columns:
+            mismatches[c] = "missing column"
+            continue
+        try:
+            df[c] = _cast_column(df[c], dtype, timestamp_formats.get(c))
+        except (TypeError, ValueError) as e:
+            mismatches[c] = "cannot convert {} to {}: {}".format(df[c].dtype, dtype, e)
+    for c in df.columns:
+        if c not in dtypes.keys():
+            mismatches[c] = "unexpected column"
+    if mismatches:
+        raise SchemaMismatchError(mismatches)
+    return df
+
+
 def convert_integer_columns(df):
     for c in df.columns:
         if not types.is_numeric_dtype(df.dtypes[c]):
@@ -28,7 +153,7 @@ def convert_integer_columns(df):
             continue
         try:
             # pandas 3 raises on non-integral floats; older pandas truncated then we rejected
-            integer_series = df[c].astype("Int64")
+            integer_series = df[c].astype(_integer_dtype(df.dtypes[c]))
         except (TypeError, ValueError):
             continue
         if (integer_series - df[c]).abs().max() == 0:
@@ -36,34 +161,240 @@ def convert_integer_columns(df):
     return df
 
 
-def convert_timestamp_columns(df):
-    timestamp_columns = get_timestamp_columns(df)
-    for c in timestamp_columns:
+def convert_timestamp_columns(df, timestamp_formats=None):
+    """
+    Convert timestamp columns with the format detected for each column ({column name: format or None}).
+    Multiple columns are parsed concurrently
+    """
+    if timestamp_formats is None:
+        timestamp_formats = get_timestamp_formats(df)
+    timestamp_columns = [c for c in timestamp_formats.keys() if c in df.columns]
+
+    def _convert(c):
         # Normalize to ns for stable dtype across pandas versions (pandas 3 defaults to us)
-        df[c] = pandas.to_datetime(df[c]).astype("datetime64[ns]")
+        return _to_datetime(df[c], timestamp_formats[c]).astype(_timestamp_dtype(df.dtypes[c]))
+    if len(timestamp_columns) > 1 and TIMESTAMP_PARSE_WORKERS > 1:
+        with futures.ThreadPoolExecutor(max_workers=TIMESTAMP_PARSE_WORKERS) as pool:
+            converted = list(pool.map(_convert, timestamp_columns))
+    else:
+        converted = [_convert(c) for c in timestamp_columns]
+    for c, series in zip(timestamp_columns, converted):
+        df[c] = series
     return df
 
 
 def convert_string_columns(df):
     for c in [c for c in df.columns if _is_text_like_dtype(df.dtypes[c])]:
-        df[c] = df[c].fillna("").astype(str).replace("", pandas.NA)
+        if _is_arrow_dtype(df.dtypes[c]):
+            # already native string column, no need to materialize python strings
+            continue
+        df[c] = _to_string(df[c])
     return df
 
 
+def to_arrow_dtypes(dtypes):
+    """
+    Convert dtypes (e.g. Int64 / datetime64[ns] / str) to corresponding pyarrow-backed dtypes
+    """
+    pyarrow = _import_pyarrow()
+    return pandas.Series({c: _to_arrow_dtype(dtype, pyarrow) for c, dtype in dtypes.items()}, dtype=object)
+
+
 def get_timestamp_columns(df):
-    timestamp_columns = []
+    return list(get_timestamp_formats(df).keys())
+
+
+def get_timestamp_formats(df):
+    """
+    Detect timestamp columns from the first non-null values of each text column.
+    Returns {column name: strftime format}, format is None if no single format fits
+    """
+    timestamp_formats = {}
     for c in [c for c in df.columns if _is_text_like_dtype(df.dtypes[c])]:
-        series = df[~df[c].isnull()][c].head(100)
-        try:
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore", UserWarning)
-                pandas.to_datetime(series)
-        except Exception:
-            continue
-        else:
-            logger.debug("column {} is detected as timestamp: {}".format(c, series))
-            timestamp_columns.append(c)
-    return timestamp_columns
+        series = df[c].dropna().head(TIMESTAMP_DETECTION_ROWS)
+        timestamp_format = _detect_timestamp_format(series)
+        if timestamp_format is not False:
+            timestamp_formats[c] = timestamp_format
+    if timestamp_formats:
+        logger.info("columns promoted to timestamp: {}".format(
+            ", ".join("{} ({})".format(c, f or "inferred per value") for c, f in timestamp_formats.items())))
+    return timestamp_formats
+
+
+def _detect_timestamp_format(series):
+    """Returns format, None (parseable without single format), or False (not timestamp)"""
+    if len(series) > 0 and isinstance(series.iloc[0], str):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            timestamp_format = guess_datetime_format(series.iloc[0])
+        if timestamp_format is not None:
+            try:
+                pandas.to_datetime(series, format=timestamp_format)
+                return timestamp_format
+            except (TypeError, ValueError):
+                pass
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            pandas.to_datetime(series)
+    except Exception:
+        return False
+    return None
+
+
+def _to_datetime(series, timestamp_format=None):
+    if timestamp_format is None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            return pandas.to_datetime(series)
+    try:
+        return pandas.to_datetime(series, format=timestamp_format)
+    except (TypeError, ValueError):
+        logger.info("column {} does not match format {}, parse values individually".format(
+            series.name, timestamp_format))
+        return pandas.to_datetime(series, format="mixed")
+
+
+def _widen_null_columns(dtypes, null_columns):
+    dtypes = dtypes.copy()
+    text_dtype = _to_string(pandas.Series([None], dtype=object)).dtype
+    for c in null_columns:
+        dtypes[c] = _to_arrow_dtype(text_dtype, _import_pyarrow()) if _is_arrow_dtype(dtypes[c]) else text_dtype
+    return dtypes
+
+
+def _read_sample(filepath_or_buffer, sample_rows, **kwargs):
+    position = _tell(filepath_or_buffer)
+    # the sample never exceeds rows requested by the caller
+    nrows = kwargs.pop("nrows", None)
+    nrows = sample_rows if nrows is None else min(sample_rows, nrows)
+    sample_df = pandas.read_csv(filepath_or_buffer, nrows=nrows, **kwargs)
+    _seek(filepath_or_buffer, position)
+    return sample_df
+
+
+def _tell(filepath_or_buffer):
+    return filepath_or_buffer.tell() if hasattr(filepath_or_buffer, "seek") else None
+
+
+def _seek(filepath_or_buffer, position):
+    if position is not None:
+        filepath_or_buffer.seek(position)
+
+
+def _get_parser_kwargs(dtypes, timestamp_formats, nullable_columns, kwargs):
+    timestamp_columns = [c for c, dtype in dtypes.items() if types.is_datetime64_any_dtype(dtype)]
+    dtype_hints = {
+        c: _get_parser_dtype(dtype, nullable_columns is None or c in nullable_columns) for c, dtype in dtypes.items()
+        if c not in timestamp_columns and not _is_arrow_null_dtype(dtype)
+    }
+    parser_kwargs = dict(kwargs)
+    parser_kwargs["dtype"] = _merge_dtype(dtype_hints, kwargs.get("dtype"))
+    parser_kwargs.setdefault("parse_dates", timestamp_columns)
+    date_formats = {
+        c: f for c, f in (timestamp_formats or {}).items() if f is not None and c in timestamp_columns
+    }
+    if date_formats and "date_format" not in kwargs:
+        parser_kwargs["date_format"] = date_formats
+    return parser_kwargs
+
+
+def _get_text_dtype_hints(dtypes):
+    # Keep text / timestamp columns as text in every chunk, e.g. "0012" must not become 12
+    return {
+        c: "string[pyarrow]" if _is_arrow_dtype(dtype) else object for c, dtype in dtypes.items()
+        if _is_text_like_dtype(dtype) or types.is_datetime64_any_dtype(dtype)
+    }
+
+
+def _get_parser_dtype(dtype, is_nullable):
+    if types.is_integer_dtype(dtype) and not _is_arrow_dtype(dtype):
+        # nullable integer dtypes go through the slow per-value path of the parser;
+        # float64 keeps missing values and apply_dtypes converts it to the integer dtype
+        return "float64" if is_nullable else getattr(dtype, "numpy_dtype", dtype)
+    if isinstance(dtype, pandas.CategoricalDtype):
+        # categories are taken from data; fixed categories would turn new values into NaN
+        return "category"
+    return dtype
+
+
+def _merge_dtype(dtype_hints, dtype):
+    if dtype is None:
+        return dtype_hints
+    if isinstance(dtype, dict):
+        return {**dtype_hints, **dtype}
+    return dtype
+
+
+def _cast_column(series, dtype, timestamp_format=None):
+    if series.dtype == dtype and not types.is_object_dtype(dtype):
+        return series
+    if types.is_integer_dtype(dtype):
+        return _to_integer(series, dtype)
+    if types.is_datetime64_any_dtype(dtype):
+        if types.is_datetime64_any_dtype(series.dtype):
+            # already parsed by the parser (parse_dates), only the unit may differ
+            return series.astype(dtype)
+        return _to_datetime(series, timestamp_format).astype(dtype)
+    if isinstance(dtype, pandas.CategoricalDtype):
+        return series if isinstance(series.dtype, pandas.CategoricalDtype) else series.astype("category")
+    if _is_arrow_null_dtype(dtype):
+        if series.notna().any():
+            raise ValueError("non-null values found")
+        return pandas.Series([None] * len(series), index=series.index, dtype=dtype)
+    if _is_text_like_dtype(dtype) and not _is_arrow_dtype(dtype):
+        return _to_string(series)
+    return series.astype(dtype)
+
+
+def _integer_dtype(dtype):
+    return "int64[pyarrow]" if _is_arrow_dtype(dtype) else "Int64"
+
+
+def _timestamp_dtype(dtype):
+    return "timestamp[ns][pyarrow]" if _is_arrow_dtype(dtype) else "datetime64[ns]"
+
+
+def _to_arrow_dtype(dtype, pyarrow):
+    if _is_arrow_dtype(dtype) or isinstance(dtype, pandas.CategoricalDtype):
+        return dtype
+    if _is_text_like_dtype(dtype):
+        return pandas.ArrowDtype(pyarrow.string())
+    if isinstance(dtype, pandas.DatetimeTZDtype):
+        return pandas.ArrowDtype(pyarrow.timestamp(dtype.unit, tz=str(dtype.tz)))
+    return pandas.ArrowDtype(pyarrow.from_numpy_dtype(getattr(dtype, "numpy_dtype", dtype)))
+
+
+def _is_arrow_dtype(dtype):
+    return isinstance(dtype, pandas.ArrowDtype)
+
+
+def _is_arrow_null_dtype(dtype):
+    # all-null column; the parser cannot convert strings to null type
+    return _is_arrow_dtype(dtype) and str(dtype.pyarrow_dtype) == "null"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("pyarrow is required for dtype_backend=\"pyarrow\" (pip install pyarrow)") from e
+    return pyarrow
+
+
+def _to_integer(series, dtype="Int64"):
+    integer_series = series.astype(dtype)
+    is_masked = types.is_extension_array_dtype(dtype) and not _is_arrow_dtype(types.pandas_dtype(dtype))
+    if is_masked and (types.is_integer_dtype(series.dtype) or types.is_float_dtype(series.dtype)):
+        # casting numbers to nullable integers raises on non-integral / overflowing values by itself
+        return integer_series
+    if series.notna().any() and (integer_series - series).abs().max() != 0:
+        raise ValueError("non-integer values found")
+    return integer_series
+
+
+def _to_string(series):
+    return series.fillna("").astype(str).replace("", pandas.NA)
 
 
 def _is_text_like_dtype(dtype):
@@ -74,3 +405,14 @@ def _is_text_like_dtype(dtype):
 def _is_integer(series):
     if abs(pandas.Series(series, dtype="Int64") - series).max() == 0:
         return True
+
+
+class SchemaMismatchError(Exception):
+    def __init__(self, mismatches):
+        self.mismatches = mismatches
+        self.message = "; ".join("{}: {}".format(c, m) for c, m in mismatches.items())
+        super().__init__(self.message)
+
+    def __reduce__(self):
+        # Keep per-column details when raised in worker processes
+        return self.__class__, (self.mismatches,)
@@ -0,0 +1,110 @@
+"""Load JSON Lines as flat pandas.DataFrame with the same dtype inference as pandas_csv."""
+
+import io
+import json
+import itertools
+
+import pandas
+from pandas.api import types
+
+from conjurer.logic.eda.load import pandas_csv
+
+
+DEFAULT_CHUNKSIZE = 100000
+
+
+def read_jsonl(filepath_or_buffer, chunksize=None, sample_rows=pandas_csv.DEFAULT_SAMPLE_ROWS, sep="."):
+    """
+    Read JSON Lines, nested objects are flattened into columns joined by `sep` (e.g. "user.id"),
+    lists are kept as canonical JSON strings, then Int64 / timestamp / string types are inferred.
+    If `chunksize` is set, returns an iterator of chunks (see `iter_jsonl`)
+    """
+    if chunksize is not None:
+        return iter_jsonl(filepath_or_buffer, chunksize, sample_rows, sep)
+    with _open(filepath_or_buffer) as f:
+        df = flatten_records(list(_iter_records(f)), sep)
+    return convert_columns(df)
+
+
+def iter_jsonl(filepath_or_buffer, chunksize=DEFAULT_CHUNKSIZE, sample_rows=pandas_csv.DEFAULT_SAMPLE_ROWS, sep="."):
+    """
+    Stream JSON Lines chunk by chunk. Columns and dtypes are inferred once from the first `sample_rows` records,
+    keys missing in a chunk become null columns, and every chunk has exactly the same dtypes.
+    Raises SchemaMismatchError if a chunk has keys or values which do not fit the inferred schema
+    """
+    with _open(filepath_or_buffer) as f:
+        records = _iter_records(f)
+        sample_records = list(itertools.islice(records, sample_rows))
+        sample_df = flatten_records(sample_records, sep)
+        timestamp_formats = pandas_csv.get_timestamp_formats(sample_df)
+        dtypes = convert_columns(sample_df.copy(), timestamp_formats).dtypes
+        num_rows = 0
+        all_records = itertools.chain(sample_records, records)
+        while True:
+            chunk_records = list(itertools.islice(all_records, chunksize))
+            if not chunk_records:
+                break
+            chunk = flatten_records(chunk_records, sep)
+            chunk = chunk.reindex(columns=list(chunk.columns) + [c for c in dtypes.keys() if c not in chunk.columns])
+            chunk.index = pandas.RangeIndex(num_rows, num_rows + len(chunk))
+            num_rows += len(chunk)
+            yield pandas_csv.apply_dtypes(chunk, dtypes, timestamp_formats)[list(dtypes.keys())]
+
+
+def flatten_records(records, sep="."):
+    df = pandas.json_normalize(records, sep=sep)
+    for c in df.columns:
+        if types.is_bool_dtype(df.dtypes[c]):
+            # nullable, so that the dtype does not depend on missing keys in each chunk
+            df[c] = df[c].astype("boolean")
+        elif types.is_object_dtype(df.dtypes[c]):
+            df[c] = _convert_object_column(df[c])
+    return df
+
+
+def convert_columns(df, timestamp_formats=None):
+    """pandas_csv.convert_columns except for boolean columns, which would be converted to Int64"""
+    columns = [c for c in df.columns if not types.is_bool_dtype(df.dtypes[c])]
+    converted_df = pandas_csv.convert_columns(df[columns], timestamp_formats)
+    for c in columns:
+        df[c] = converted_df[c]
+    return df
+
+
+def _convert_object_column(series):
+    values = series.dropna()
+    if len(values) == 0:
+        return series
+    value_types = set(values.map(type))
+    if value_types <= {bool}:
+        return series.astype("boolean")
+    if value_types & {list, dict}:
+        # hashable canonical form, so that unique / duplicate checks do not hash nested objects
+        return series.map(
+            lambda v: json.dumps(v, sort_keys=True, ensure_ascii=False) if isinstance(v, (list, dict)) else v)
+    return series
+
+
+def _iter_records(f):
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _open(filepath_or_buffer):
+    if hasattr(filepath_or_buffer, "read"):
+        # do not close buffer owned by caller
+        return _NonClosingBuffer(filepath_or_buffer)
+    return io.open(filepath_or_buffer, "r", encoding="utf-8")
+
+
+class _NonClosingBuffer(object):
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def __enter__(self):
+        return self.buffer
+
+    def __exit__(self, *args):
+        return False
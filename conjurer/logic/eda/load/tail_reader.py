@@ -0,0 +1,154 @@
+"""Incremental reader for append-only CSV files."""
+
+import io
+import os
+import csv
+import logging
+
+import numpy
+import pandas
+
+from conjurer.logic.eda.load import pandas_csv
+
+
+logger = logging.getLogger(__name__)
+
+
+class CsvTailReader(object):
+    """
+    Read append-only CSV file (1st line is header) incrementally. The 1st read infers dtypes from the whole file,
+    following reads parse only rows appended after the previous read with exactly the same dtypes.
+    Trailing incomplete record (without newline, or with an open quoted field) is left for the next read.
+    All rows read so far are kept in `df`. If the file is rotated (replaced or truncated),
+    the new file is read from the beginning with the same dtypes
+    """
+    def __init__(self, filepath, **kwargs):
+        self.filepath = filepath
+        self.kwargs = kwargs
+        self.dtypes = None
+        self.timestamp_formats = None
+        self.offset = 0
+        self.num_rows = 0
+        self.df = None
+        self._header = None
+        self._file_id = None
+
+    def read(self, concat=False):
+        """
+        Returns rows appended since the previous read, or all rows read so far if `concat` is True
+        """
+        stat = os.stat(self.filepath)
+        if self._is_rotated(stat):
+            logger.info("{} was rotated, read from the beginning".format(self.filepath))
+            self.offset = 0
+            self._header = None
+        self._file_id = (stat.st_dev, stat.st_ino)
+        with open(self.filepath, "rb") as f:
+            end = _find_record_end(f, self.offset, stat.st_size, self._get_quotechar(), self._get_delimiter())
+            if self._header is None:
+                new_df = self._read_first(f, end)
+            else:
+                new_df = self._read_appended(f, end)
+        new_df.index = pandas.RangeIndex(self.num_rows, self.num_rows + len(new_df))
+        self.num_rows += len(new_df)
+        if self._header is not None:
+            # no columns are known before the 1st complete row
+            self.df = new_df if self.df is None else pandas.concat([self.df, new_df])
+        if concat:
+            return self.df if self.df is not None else new_df
+        return new_df
+
+    def _read_first(self, f, end):
+        f.seek(0)
+        header = f.readline()
+        if end <= len(header):
+            # dtypes cannot be inferred before the 1st complete row
+            return pandas.DataFrame()
+        f.seek(0)
+        data = io.BytesIO(f.read(end))
+        if self.dtypes is None:
+            raw_df = pandas.read_csv(data, **self.kwargs)
+            self.timestamp_formats = pandas_csv.get_timestamp_formats(raw_df)
+            df = pandas_csv.convert_columns(raw_df, self.timestamp_formats)
+            self.dtypes = df.dtypes
+        else:
+            df = pandas_csv.read_csv_with_dtypes(data, self.dtypes, self.timestamp_formats, **self.kwargs)
+        self._header = header
+        self.offset = end
+        return df
+
+    def _read_appended(self, f, end):
+        f.seek(self.offset)
+        data = f.read(max(end - self.offset, 0))
+        df = pandas_csv.read_csv_with_dtypes(
+            io.BytesIO(self._header + data), self.dtypes, self.timestamp_formats, **self.kwargs)
+        # Advance only after successful parse so that rows are not skipped on SchemaMismatchError
+        self.offset += len(data)
+        return df
+
+    def _get_quotechar(self):
+        if self.kwargs.get("quoting") == csv.QUOTE_NONE:
+            return None
+        return self.kwargs.get("quotechar", '"')
+
+    def _get_delimiter(self):
+        return self.kwargs.get("sep", self.kwargs.get("delimiter")) or ","
+
+    def _is_rotated(self, stat):
+        if self._file_id is None:
+            return False
+        return self._file_id != (stat.st_dev, stat.st_ino) or stat.st_size < self.offset
+
+
+def _find_record_end(f, start, size, quotechar, delimiter=","):
+    """
+    Position after the last newline in [start, size) which is not in a quoted field, or `start` if there is none.
+    Quotes are counted from `start`, which is always a record boundary (escaped quotes "" keep the parity).
+    A quote opens a quoted field only at the start of a field, so if a quote counted as opening is not
+    at the start of a field (e.g. 5" in an unquoted field), quoted fields are traced quote by quote
+    """
+    f.seek(start)
+    data = numpy.frombuffer(f.read(size - start), dtype=numpy.uint8)
+    is_end = data == ord("\n")
+    if quotechar is not None:
+        quote_positions = numpy.flatnonzero(data == ord(quotechar))
+        openings = quote_positions[::2]
+        previous = data[numpy.maximum(openings - 1, 0)]
+        # a quote right after a quote is an escaped quote "" in a quoted field
+        is_field_start = (openings == 0) | (previous == ord(quotechar)) \
+            | numpy.isin(previous, _get_field_separators(delimiter))
+        if is_field_start.all():
+            is_end &= numpy.cumsum(data == ord(quotechar)) % 2 == 0
+        else:
+            is_end &= ~_get_quoted(data, quote_positions, delimiter)
+    positions = numpy.flatnonzero(is_end)
+    return start + int(positions[-1]) + 1 if len(positions) > 0 else start
+
+
+def _get_field_separators(delimiter):
+    return numpy.frombuffer("\n\r{}".format(delimiter).encode("utf-8"), dtype=numpy.uint8)
+
+
+def _get_quoted(data, quote_positions, delimiter):
+    """Flags of bytes in quoted fields, where quotes in unquoted fields are literal"""
+    field_separators = set(_get_field_separators(delimiter).tolist())
+    openings, closings = [], []
+    i = 0
+    while i < len(quote_positions):
+        position = int(quote_positions[i])
+        if len(openings) == len(closings):
+            if position == 0 or int(data[position - 1]) in field_separators:
+                openings.append(position)
+            i += 1
+        elif i + 1 < len(quote_positions) and quote_positions[i + 1] == position + 1:
+            # escaped quote ""
+            i += 2
+        else:
+            closings.append(position)
+            i += 1
+    if len(openings) > len(closings):
+        closings.append(len(data))
+    is_quoted = numpy.zeros(len(data) + 1, dtype=numpy.int64)
+    numpy.add.at(is_quoted, openings, 1)
+    numpy.add.at(is_quoted, closings, -1)
+    return numpy.cumsum(is_quoted[:-1]) > 0
@@ -42,17 +42,18 @@ def count_frequency_quantitative(series, num_bins, minv, maxv):
 def count_frequency_categorical(series, num_bins):
     name = series.name or "value"
     vcounts = get_categorical_value_counts(series, num_bins)
-    total = vcounts.values.sum()
+    # Series arithmetic works for numpy and pyarrow-backed counts alike
+    total = vcounts.sum()
     return pandas.DataFrame({
         name: list(vcounts.index),
         FREQUENCY_CNAME: list(vcounts.values),
-        RATIO_CNAME: [v / total for v in vcounts.values]
+        RATIO_CNAME: list(vcounts / total)
     })
 
 
 def create_bins_quantitative(series, num_bins, minv=None, maxv=None):
-    array = series.values
-    if numpy.array(array[~numpy.isnan(array)]).size == 0:
+    # notna() instead of numpy.isnan(series.values): no object conversion for pyarrow-backed columns
+    if not series.notna().any():
         raise BinCreationError("all values are null")
     minv = minv if minv is not None else series.min()  # cannot use "or" for the case minv==0
     maxv = maxv if maxv is not None else series.max()  # cannot use "or" for the case maxv==0
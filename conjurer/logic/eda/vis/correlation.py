@@ -0,0 +1,35 @@
+import altair as alt
+import numpy
+import pandas
+
+
+DEFAULT_MAX_COLUMNS = 50
+
+
+def plot_correlation_heatmap(corr_df, max_columns=DEFAULT_MAX_COLUMNS):
+    """
+    Heatmap of correlation matrix (`check.correlation.calc_correlations`). If there are more than `max_columns`
+    columns, columns with the largest absolute correlation to another column are plotted
+    """
+    columns = _select_columns(corr_df, max_columns)
+    chart_df = corr_df.loc[columns, columns].rename_axis(index="column_y", columns="column_x")\
+        .stack().rename("value").reset_index().dropna(subset=["value"])
+    title = "Correlation" if len(columns) == len(corr_df) \
+        else "Correlation (top {} of {} columns)".format(len(columns), len(corr_df))
+    return alt.Chart(chart_df).mark_rect().encode(
+        x=alt.X("column_x:N", sort=columns, title=None),
+        y=alt.Y("column_y:N", sort=columns, title=None),
+        color=alt.Color("value:Q", scale=alt.Scale(scheme="redblue", domain=[-1, 1], reverse=True)),
+        tooltip=["column_x", "column_y", alt.Tooltip("value:Q", format=".3f")]
+    ).properties(title=title)
+
+
+def _select_columns(corr_df, max_columns):
+    if len(corr_df) <= max_columns:
+        return list(corr_df.columns)
+    values = numpy.abs(corr_df.to_numpy())
+    numpy.fill_diagonal(values, numpy.nan)
+    max_values = pandas.Series(numpy.nan_to_num(values, nan=-1.0).max(axis=1), index=corr_df.index)
+    selected = set(max_values.sort_values(ascending=False, kind="stable").index[:max_columns])
+    # keep the original order
+    return [c for c in corr_df.columns if c in selected]
@@ -14,6 +14,10 @@ def plot_histogram(values, num_bins=50, normalize=False, minv=None, maxv=None):
         bin_df = binning.create_frequency_table(values, num_bins, minv, maxv)
     except Exception as e:
         raise e
+    return plot_frequency_table(bin_df, normalize)
+
+
+def plot_frequency_table(bin_df, normalize=False):
     return plot_frequency_numeric(bin_df, normalize) if len(bin_df.columns) > 3\
         else plot_frequency_category(bin_df, normalize)
 
@@ -30,6 +34,15 @@ def plot_histogram_for_stats(df, stat_df, num_bins=50, normalize=False):
             logger.info("Histogram for {} was skipped: {}".format(column, e.message))
 
 
+def plot_histogram_for_accumulator(accumulator, normalize=False):
+    """Plot histograms accumulated by `chunk_stat.StatAccumulator` without the whole data frame"""
+    for column in accumulator.dtypes.index:
+        try:
+            plot_frequency_table(accumulator.get_frequency_table(column), normalize).display()
+        except binning.BinCreationError as e:
+            logger.info("Histogram for {} was skipped: {}".format(column, e.message))
+
+
 
 def plot_frequency_numeric(df, normalize, xname=None):
     column_lb = df.columns[0]
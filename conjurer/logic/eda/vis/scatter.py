@@ -1,4 +1,6 @@
 import altair as alt
+import pandas
+from pandas.api import types
 
 from conjurer.logic.eda.vis import binning
 
@@ -47,7 +49,7 @@ def _get_encode_args(column_x, column_y, is_quantitative_x, is_quantitative_y):
 
 def plot_points(df, column_x, column_y, xmin=None, xmax=None, ymin=None, ymax=None):
     title = "{} vs {} (Scatter)".format(column_y, column_x)
-    return alt.Chart(df).mark_circle().encode(
+    return alt.Chart(_get_chart_data(df, [column_x, column_y])).mark_circle().encode(
         x=alt.X(column_x, **_get_axis_args(df, column_x, xmin, xmax)),
         y=alt.Y(column_y, **_get_axis_args(df, column_y, ymin, ymax)),
         tooltip=[column_x, column_y]
@@ -61,3 +63,17 @@ def _get_axis_args(df, column, minv, maxv):
         return dict(domain=[minv, maxv])
     else:
         return {}
+
+
+def _get_chart_data(df, columns):
+    chart_df = df[list(dict.fromkeys(columns))]
+    # altair cannot serialize pyarrow-backed timestamps with nulls
+    return chart_df.astype({
+        c: _get_numpy_timestamp_dtype(dtype) for c, dtype in chart_df.dtypes.items()
+        if isinstance(dtype, pandas.ArrowDtype) and types.is_datetime64_any_dtype(dtype)
+    })
+
+
+def _get_numpy_timestamp_dtype(arrow_dtype):
+    tz = arrow_dtype.pyarrow_dtype.tz
+    return "datetime64[ns, {}]".format(tz) if tz else "datetime64[ns]"
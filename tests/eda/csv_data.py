@@ -11,3 +11,9 @@ ALL_TYPE_TEST_CSV = """date1,date2,timestamp1,int1,float1,str1,null
 2000/3/1,2020-03-31,2020-01-01T00:00:59,2,3.8,,
 2000/3/1,2020-07-30,2020-01-01T00:00:59,3,-1.3,C-1335,
 """
+
+CHUNK_TEST_CSV = "id,code,score,timestamp\n" + "".join(
+    "{},{},{},2020-01-{:02d}T00:00:00\n".format(
+        i, "A{}".format(i) if i < 10 else "{:04d}".format(i), "" if i % 7 == 0 else i * 0.5, i % 28 + 1)
+    for i in range(100)
+)
@@ -0,0 +1,61 @@
+import numpy
+import pandas
+
+from conjurer import eda
+from conjurer.logic.eda.check import alert, stat_calculator
+
+
+def _input_df():
+    num_rows = 2000
+    return pandas.DataFrame({
+        "mostly_null": pandas.Series([1.0] + [None] * (num_rows - 1)),
+        "constant": ["x"] * num_rows,
+        "text_id": ["id{}".format(i) for i in range(num_rows)],
+        "value": numpy.r_[numpy.linspace(0, 1, num_rows - 50), numpy.full(50, 100.0)],
+        "old": pandas.Series(pandas.to_datetime(["1800-01-01"] + ["2020-01-01"] * (num_rows - 1))),
+        "future": pandas.Series(pandas.to_datetime(["2020-01-01"] * (num_rows - 1) + ["3000-01-01"])).dt.tz_localize(
+            "Asia/Tokyo"),
+    })
+
+
+def test_default_rules():
+    stat_df = stat_calculator.calc_column_stat(_input_df(), robust=True)
+    alert_df = eda.check_alerts(stat_df)
+    assert list(alert_df.columns) == alert.ALERT_COLUMN_NAMES
+    assert list(zip(alert_df["column_name"], alert_df["rule"])) == [
+        ("old", "old_timestamp"),
+        ("future", "future_timestamp"),
+        ("mostly_null", "missing_ratio"),
+        ("mostly_null", "single_value"),
+        ("constant", "single_value"),
+        ("text_id", "unique_count"),
+        ("value", "outliers"),
+    ]
+    assert list(alert_df["level"]) == ["ERROR"] * 2 + ["WARN"] * 5
+    assert alert_df["message"].iloc[2] == "too many missing values 99.95%"
+
+
+def test_robust_stats():
+    df = pandas.DataFrame({"x": numpy.arange(101.0), "y": pandas.Series(list(range(100)) + [None], dtype="Int64")})
+    stat_df = stat_calculator.calc_column_stat(df, robust=True).set_index("column_name")
+    assert list(stat_df.loc["x", ["q1", "median", "q3", "mad"]]) == [25.0, 50.0, 75.0, 25.0]
+    assert list(stat_df.loc["x", ["lower_fence", "upper_fence", "ratio_outlier"]]) == [-50.0, 150.0, 0.0]
+    assert stat_df.loc["y", "median"] == 49.0
+
+
+def test_custom_rule_without_robust_stats():
+    stat_df = stat_calculator.calc_column_stat(_input_df())
+    rule = eda.AlertRule(
+        "small_min", "ERROR", lambda df: pandas.to_numeric(df["min"].where(df["kind"] == "numeric")) < 0.5,
+        "min is {min}")
+    alert_df = eda.check_alerts(stat_df, alert.DEFAULT_RULES + [rule])
+    assert "outliers" not in set(alert_df["rule"])
+    assert list(alert_df.loc[alert_df["rule"] == "small_min", "column_name"]) == ["value"]
+
+
+def test_no_rules_or_no_alerts():
+    stat_df = stat_calculator.calc_column_stat(pandas.DataFrame({"x": numpy.arange(100.0)}))
+    for rules in [[], None]:
+        alert_df = eda.check_alerts(stat_df, rules)
+        assert list(alert_df.columns) == alert.ALERT_COLUMN_NAMES
+        assert len(alert_df) == 0
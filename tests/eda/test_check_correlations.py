@@ -0,0 +1,89 @@
+import numpy
+import pandas
+import pytest
+from pandas import testing
+
+from conjurer import eda
+from conjurer.logic.eda.check import correlation, stat_calculator
+
+
+def _input_df(num_rows=2000):
+    rng = numpy.random.default_rng(0)
+    x = rng.normal(size=num_rows)
+    df = pandas.DataFrame({
+        "x": x,
+        "x2": 2 * x + rng.normal(scale=0.1, size=num_rows),
+        "x_cubed": pandas.Series(numpy.round(x ** 3 * 100), dtype="Int64"),
+        "noise": rng.normal(size=num_rows),
+        "constant": numpy.ones(num_rows),
+        "color": rng.choice(["red", "blue", "green"], num_rows),
+        "id": ["id{}".format(i) for i in range(num_rows)],
+        "timestamp": pandas.date_range("2020-01-01", periods=num_rows, freq="h"),
+    })
+    df["shade"] = df["color"].map({"red": "warm", "blue": "cold", "green": "cold"})
+    df["flag"] = rng.random(num_rows) < 0.5
+    df.loc[::7, "x2"] = numpy.nan
+    df.loc[::5, "x_cubed"] = None
+    df.loc[::11, "color"] = None
+    return df
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_numeric_correlations(monkeypatch, method):
+    # small blocks to check correlations across blocks
+    monkeypatch.setattr(stat_calculator, "BLOCK_BYTES", 8 * 2000 * 2)
+    df = _input_df()
+    corr_df = eda.check_correlations(df, method=method)
+    numeric_columns = ["x", "x2", "x_cubed", "noise", "constant"]
+    assert list(corr_df.columns) == numeric_columns + ["color", "shade", "flag"]
+    expected_df = df[numeric_columns].astype(float).corr(method=method)
+    if method == "spearman":
+        # columns are ranked over their own non-null values
+        expected_df = df[numeric_columns].astype(float).rank().corr()
+    testing.assert_frame_equal(
+        corr_df.loc[numeric_columns, numeric_columns].drop(index="constant", columns="constant"),
+        expected_df.drop(index="constant", columns="constant"), check_exact=False, atol=1e-10)
+    assert corr_df.loc["constant"].isna().all()
+    assert numpy.isnan(corr_df.loc["x", "color"])
+
+
+def test_cramers_v():
+    df = _input_df()
+    corr_df = eda.check_correlations(df)
+    assert corr_df.loc["color", "color"] == 1.0
+    assert corr_df.loc["color", "shade"] == pytest.approx(1.0)
+    assert corr_df.loc["flag", "color"] < 0.1
+    table = pandas.crosstab(df["color"], df["flag"]).to_numpy()
+    assert corr_df.loc["flag", "color"] == pytest.approx(correlation._cramers_v(table))
+    assert "id" not in corr_df.columns and "timestamp" not in corr_df.columns
+
+
+def test_correlated_pairs_and_heatmap():
+    corr_df = eda.check_correlations(_input_df())
+    pair_df = eda.get_correlated_pairs(corr_df, threshold=0.9)
+    assert list(zip(pair_df["column_x"], pair_df["column_y"])) == [("color", "shade"), ("x", "x2")]
+    chart = eda.plot_correlation_heatmap(corr_df, max_columns=4)
+    assert set(chart.data["column_x"]) == {"x", "x2", "color", "shade"}
+    assert chart.to_dict()["mark"]["type"] == "rect"
+
+
+def test_invalid_method():
+    with pytest.raises(ValueError):
+        eda.check_correlations(_input_df(), method="kendall")
+
+
+@pytest.mark.parametrize("cache_bytes,num_loads", [(1024 ** 3, 4), (0, 10)])
+def test_blocks_are_loaded_once(monkeypatch, cache_bytes, num_loads):
+    monkeypatch.setattr(stat_calculator, "BLOCK_BYTES", 8 * 100)
+    monkeypatch.setattr(correlation, "CACHE_BYTES", cache_bytes)
+    load_block = correlation._load_block
+    loaded_columns = []
+
+    def _count(df, columns, method):
+        loaded_columns.append(columns)
+        return load_block(df, columns, method)
+    monkeypatch.setattr(correlation, "_load_block", _count)
+    df = pandas.DataFrame(numpy.random.default_rng(0).normal(size=(100, 4)), columns=list("abcd"))
+    corr_df = correlation.calc_correlations(df, method="spearman")
+    assert len(loaded_columns) == num_loads
+    testing.assert_frame_equal(corr_df, df.corr(method="spearman"))
@@ -33,3 +33,33 @@ def test_single_key(data):
             "std(num_visitors)": [numpy.std([100, 105], ddof=1), numpy.std([80, 75, 80, 95], ddof=1)]
         }).set_index("store_id")
     )
+
+
+def test_multiple_keys_with_null():
+    rng = numpy.random.default_rng(0)
+    num_rows = 1000
+    df = pandas.DataFrame({
+        "store_id": pandas.Series(rng.integers(0, 5, num_rows), dtype="Int64"),
+        "item_id": rng.choice(["a", "b", "c"], num_rows),
+        "sales": rng.normal(100, 10, num_rows),
+        "quantity": pandas.Series(rng.integers(0, 10, num_rows), dtype="Int64"),
+        "date": pandas.Series(pandas.date_range("2023-01-01", periods=num_rows, freq="D", tz="Asia/Tokyo")),
+        "promo": rng.choice(["x", "y", None], num_rows),
+    })
+    df.loc[::7, "store_id"] = None
+    df.loc[::3, "sales"] = numpy.nan
+    df.loc[df["store_id"] == 4, "quantity"] = None
+    df.loc[::11, "date"] = pandas.NaT
+    result = eda.check_series(df, ["store_id", "item_id"])
+    grb_obj = df.groupby(["store_id", "item_id"])
+    expected = pandas.DataFrame({
+        "count": grb_obj.count().max(axis=1),
+        **{"{}(sales)".format(agg): getattr(grb_obj["sales"], agg)() for agg in ["min", "max", "mean", "std"]},
+        **{"{}(quantity)".format(agg): getattr(grb_obj["quantity"], agg)() for agg in ["min", "max", "mean", "std"]},
+        "min(date)": grb_obj["date"].min(),
+        "max(date)": grb_obj["date"].max(),
+        "nunique(promo)": grb_obj["promo"].nunique(),
+    })
+    testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert result["min(date)"].dtype == df["date"].dtype
+    assert result["min(quantity)"].dtype == df["quantity"].dtype
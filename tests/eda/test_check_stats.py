@@ -1,5 +1,7 @@
 import io
 
+import numpy
+import pytest
 import pandas
 from pandas import testing
 
@@ -63,3 +65,94 @@ def test_check_stats_dict_columns_with_histogram():
     })
     stat_df = eda.check_stats(df)
     assert len(stat_df) == 4
+
+
+def test_numeric_blocks_match_column_wise_stats(monkeypatch):
+    # tiny blocks so that columns of the same dtype are split into several blocks
+    monkeypatch.setattr(stat_calculator, "BLOCK_BYTES", 1)
+    df = pandas.DataFrame({
+        "int": [3, 0, -2, 7],
+        "float": [1.5, numpy.nan, 0.0, -2.5],
+        "nullable_int": pandas.Series([pandas.NA, 0, 0, 5], dtype="Int64"),
+        "nullable_int2": pandas.Series([1, 2, pandas.NA, pandas.NA], dtype="Int64"),
+        "all_null": pandas.Series([pandas.NA] * 4, dtype="Float64"),
+        "bool": [True, False, True, True],
+        "str": ["a", "b", None, "a"],
+    })
+    stat_df = stat_calculator.calc_column_stat(df).set_index("column_name")
+    for c in ["int", "float", "nullable_int", "nullable_int2", "bool"]:
+        assert stat_df.loc[c, "min"] == df[c].min()
+        assert stat_df.loc[c, "max"] == df[c].max()
+        assert numpy.isclose(stat_df.loc[c, "mean"], df[c].mean())
+        assert numpy.isclose(stat_df.loc[c, "std"], df[c].std())
+        assert stat_df.loc[c, "ratio_na"] == df[c].isna().mean()
+        assert stat_df.loc[c, "ratio_zero"] == (df[c] == 0).sum() / len(df)
+    assert stat_df.loc["all_null", "min"] is pandas.NA
+    assert stat_df.loc["all_null", "ratio_na"] == 1.0
+    assert stat_df.loc["str", "ratio_zero"] is pandas.NA
+    assert stat_df.loc["str", "unique_count"] == 2
+
+
+def test_empty_data_frame():
+    stat_df = stat_calculator.calc_column_stat(pandas.DataFrame({"x": pandas.Series([], dtype="float64")}))
+    assert stat_df.iloc[0]["min"] is pandas.NA
+    assert stat_df.iloc[0]["unique_count"] == 0
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_n_jobs(monkeypatch, executor):
+    monkeypatch.setattr(stat_calculator, "BLOCK_BYTES", 1)
+    df = eda.read_csv(io.StringIO(csv_data.ALL_TYPE_TEST_CSV))
+    df["float"] = numpy.linspace(0, 1, len(df))
+    expected_df = stat_calculator.calc_column_stat(df)
+    stat_df = stat_calculator.calc_column_stat(df, n_jobs=3, executor=executor)
+    testing.assert_frame_equal(stat_df, expected_df)
+
+
+def test_invalid_executor():
+    with pytest.raises(ValueError):
+        eda.check_stats(pandas.DataFrame({"x": [1]}), skip_histogram=True, n_jobs=2, executor="unknown")
+
+
+def test_duplicated_groups():
+    df = pandas.DataFrame({
+        "id": [1, 2, 1, 3, 1, 2],
+        "payload": [{"x": 1, "y": [1, 2]}, {"x": 2}, {"y": [1, 2], "x": 1}, {"x": 3}, {"x": 1, "y": [2, 1]}, {"x": 2}],
+        "note": [None, "a", None, "b", None, "a"],
+    })
+    num_duplicated, groups_df = stat_calculator.count_duplicated_rows(df, return_groups=True)
+    assert num_duplicated == 2
+    assert list(groups_df.index) == [0, 2, 1, 5]
+    assert list(groups_df["duplicate_group"]) == [0, 0, 1, 1]
+    assert list(groups_df.columns) == ["duplicate_group", "id", "payload", "note"]
+
+
+def test_nested_value_is_not_equal_to_string():
+    df = pandas.DataFrame({"x": [[1, 2], "[1,2]", {"a": 1}, '{"a":1}']})
+    assert stat_calculator.count_duplicated_rows(df) == 0
+    assert stat_calculator.count_unique_values(df, "x") == 4
+
+
+def test_no_duplicated_rows():
+    df = pandas.DataFrame({"x": [1, 2, 3], "y": [1.0, numpy.nan, 2.0]})
+    num_duplicated, groups_df = stat_calculator.count_duplicated_rows(df, return_groups=True)
+    assert num_duplicated == 0
+    assert len(groups_df) == 0
+
+
+def test_zero_columns_rows_are_duplicated():
+    df = pandas.DataFrame(index=range(3))
+    num_duplicated, groups_df = stat_calculator.count_duplicated_rows(df, return_groups=True)
+    assert num_duplicated == 2
+    assert list(groups_df["duplicate_group"]) == [0, 0, 0]
+    assert stat_calculator.count_duplicated_rows(pandas.DataFrame()) == 0
+
+
+def test_equal_numbers_of_different_types_are_duplicated():
+    df = pandas.DataFrame({"x": pandas.Series([1, 1.0, True, numpy.int64(1), 1.5, "1"], dtype=object)})
+    assert stat_calculator.count_duplicated_rows(df) == int(df.duplicated().sum()) == 3
+    assert stat_calculator.count_unique_values(df, "x") == 3
+    # hashes do not depend on the first occurrence in each call (e.g. for sketches merged over chunks)
+    assert stat_calculator.hash_values(pandas.Series([1.0], dtype=object))[0] == \
+        stat_calculator.hash_values(pandas.Series([True], dtype=object))[0] == \
+        stat_calculator.hash_values(pandas.Series([1], dtype=object))[0]
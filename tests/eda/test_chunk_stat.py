@@ -0,0 +1,89 @@
+import io
+
+import numpy
+import pandas
+import pytest
+
+from conjurer import eda
+from conjurer.logic.eda.check import sketch, stat_calculator
+from conjurer.logic.eda.vis import binning
+from . import csv_data
+
+
+def _iter_chunks(df, chunksize):
+    for i in range(0, len(df), chunksize):
+        yield df.iloc[i:i + chunksize]
+
+
+def test_chunks_match_full_stats():
+    df = eda.read_csv(io.StringIO(csv_data.CHUNK_TEST_CSV))
+    expected_df = stat_calculator.calc_column_stat(df).set_index("column_name")
+    stat_df = stat_calculator.calc_column_stat(
+        eda.iter_csv(io.StringIO(csv_data.CHUNK_TEST_CSV), chunksize=30, sample_rows=10)).set_index("column_name")
+    assert list(stat_df.index) == list(expected_df.index)
+    assert list(stat_df["dtype"]) == list(expected_df["dtype"])
+    for c in ["min", "max", "ratio_na", "ratio_zero"]:
+        assert list(stat_df[c]) == list(expected_df[c]), c
+    # HyperLogLog estimate
+    numpy.testing.assert_allclose(stat_df["unique_count"], expected_df["unique_count"], rtol=0.03)
+    for c in ["id", "score"]:
+        assert numpy.isclose(stat_df.loc[c, "mean"], expected_df.loc[c, "mean"])
+        assert numpy.isclose(stat_df.loc[c, "std"], expected_df.loc[c, "std"])
+
+
+def test_percentiles():
+    df = pandas.DataFrame({
+        "x": numpy.random.default_rng(0).normal(size=100000),
+        "t": pandas.date_range("2020-01-01", periods=100000, freq="min"),
+    })
+    accumulator = eda.StatAccumulator().update_all(_iter_chunks(df, 7000))
+    percentile_df = accumulator.get_percentiles([0.1, 0.5, 0.9])
+    expected_df = stat_calculator.calculate_percentiles_for_df(df, ["x"], [0.1, 0.5, 0.9])
+    numpy.testing.assert_allclose(percentile_df["x"].values, expected_df["x"].values, atol=0.01)
+    assert percentile_df["t"].iloc[0] == df["t"].min()
+    assert abs(percentile_df["t"].iloc[2] - df["t"].median()) < pandas.Timedelta(hours=1)
+
+
+def test_frequency_tables():
+    df = pandas.DataFrame({
+        "float": numpy.linspace(0, 1, 1000),
+        "small_int": pandas.Series(numpy.arange(1000) % 3, dtype="Int64"),
+        "label": ["c{}".format(i % 60) for i in range(1000)],
+        "null": pandas.Series([numpy.nan] * 1000),
+    })
+    accumulator = eda.StatAccumulator(num_bins=50).update_all(_iter_chunks(df, 300))
+    float_df = accumulator.get_frequency_table("float")
+    assert list(float_df.columns) == ["float_lb", "float_ub", "# of records", "ratio of records"]
+    assert float_df["# of records"].sum() == 1000
+    assert (float_df["# of records"] - 20).abs().max() <= 2
+    small_int_df = accumulator.get_frequency_table("small_int")
+    assert list(small_int_df["# of records"]) == [334, 333, 333]
+    label_df = accumulator.get_frequency_table("label")
+    assert len(label_df) == 51
+    assert label_df["label"].iloc[-1] == "OTHER"
+    assert label_df["# of records"].sum() == 1000
+    with pytest.raises(binning.BinCreationError):
+        accumulator.get_frequency_table("null")
+
+
+def test_check_stats_chunks():
+    chunks = eda.iter_csv(io.StringIO(csv_data.CHUNK_TEST_CSV), chunksize=30, sample_rows=10)
+    stat_df = eda.check_stats(chunks)
+    assert len(stat_df) == 4
+
+
+def test_merge_sketches():
+    values = numpy.random.default_rng(1).exponential(size=20000)
+    moments, digest = sketch.Moments(), sketch.QuantileDigest()
+    for part in numpy.array_split(values, 4):
+        moments.merge(sketch.Moments().update(part))
+        digest.merge(sketch.QuantileDigest().update(part))
+    assert numpy.isclose(moments.get_mean(), values.mean())
+    assert numpy.isclose(moments.get_std(), values.std(ddof=1))
+    assert digest.count == len(values)
+    assert numpy.isclose(digest.quantile([0.5])[0], numpy.median(values), rtol=0.02)
+
+
+def test_no_chunks():
+    with pytest.raises(ValueError):
+        eda.check_stats(iter([]), skip_histogram=True)
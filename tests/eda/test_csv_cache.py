@@ -0,0 +1,111 @@
+import io
+import os
+import hashlib
+
+import pandas
+from pandas import testing
+
+from conjurer import eda
+from conjurer.logic.eda.load import csv_cache
+from . import csv_data
+
+
+def _write_csv(tmp_path, name, content):
+    filepath = os.path.join(str(tmp_path), name)
+    with open(filepath, "w") as f:
+        f.write(content)
+    return filepath
+
+
+def _list_entries(cache):
+    return [name for name in os.listdir(cache.cache_dir) if not name.endswith(csv_cache.LINK_SUFFIX)]
+
+
+def test_cache_hit_keeps_dtypes(tmp_path, monkeypatch):
+    filepath = _write_csv(tmp_path, "all_type.csv", csv_data.ALL_TYPE_TEST_CSV)
+    cache = eda.CsvCache(os.path.join(str(tmp_path), "cache"))
+    df = eda.read_csv(filepath, cache=cache)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("CSV must not be parsed on cache hit")
+    monkeypatch.setattr(pandas, "read_csv", _fail)
+    cached_df = eda.read_csv(filepath, cache=cache)
+    testing.assert_frame_equal(cached_df, df)
+
+
+def test_cache_miss_on_file_change(tmp_path):
+    filepath = _write_csv(tmp_path, "integer.csv", csv_data.INTEGER_TEST_CSV)
+    cache = eda.CsvCache(os.path.join(str(tmp_path), "cache"))
+    eda.read_csv(filepath, cache=cache)
+    _write_csv(tmp_path, "integer.csv", csv_data.INTEGER_TEST_CSV + "4,4\n")
+    assert len(eda.read_csv(filepath, cache=cache)) == 5
+
+
+def test_cache_round_trip_extension_dtypes(tmp_path):
+    df = pandas.DataFrame({
+        "int": pandas.Series([1, None, 3], dtype="Int8"),
+        "float": pandas.Series([1.5, None, 3.0], dtype="Float32"),
+        "bool": pandas.Series([True, None, False], dtype="boolean"),
+        "category": pandas.Series(["a", "b", "a"], dtype="category"),
+        "string": pandas.Series(["a", None, "c"], dtype="string"),
+        "tz": pandas.to_datetime(["2020-01-01", None, "2020-01-03"]).tz_localize("UTC"),
+        "object": [{"x": 1}, None, [1, 2]],
+    })
+    filepath = _write_csv(tmp_path, "dummy.csv", "a\n1\n")
+    cache = eda.CsvCache(os.path.join(str(tmp_path), "cache"))
+    cache.put(filepath, {}, df)
+    testing.assert_frame_equal(cache.get(filepath, {}), df)
+
+
+def test_cache_eviction(tmp_path):
+    cache = eda.CsvCache(os.path.join(str(tmp_path), "cache"), max_bytes=1)
+    filepath1 = _write_csv(tmp_path, "integer1.csv", csv_data.INTEGER_TEST_CSV)
+    filepath2 = _write_csv(tmp_path, "integer2.csv", csv_data.INTEGER_TEST_CSV)
+    eda.read_csv(filepath1, cache=cache)
+    eda.read_csv(filepath2, cache=cache)
+    assert cache.get(filepath1, dict(single_parse=False, dtypes=None)) is None
+    assert len(os.listdir(cache.cache_dir)) == 0
+
+
+def test_df_dict_loader_with_cache(tmp_path):
+    filepath = _write_csv(tmp_path, "all_type.csv", csv_data.ALL_TYPE_TEST_CSV)
+    df = eda.read_csv(filepath)
+    cache = eda.CsvCache(os.path.join(str(tmp_path), "cache"))
+    loader = eda.DfDictLoader({"all_type": df})
+    loader.load({"all_type": filepath}, cache=cache)
+    testing.assert_frame_equal(loader.load({"all_type": filepath}, cache=cache)["all_type"], df)
+    assert len(_list_entries(cache)) == 1
+
+
+def test_buffer_is_not_cacheable():
+    assert not csv_cache.is_cacheable(io.StringIO(csv_data.INTEGER_TEST_CSV))
+
+
+def test_cache_size_of_long_strings(tmp_path):
+    df = pandas.DataFrame({"text": pandas.Series(["a"] * 10000 + ["x" * 5000, None], dtype="string")})
+    filepath = _write_csv(tmp_path, "dummy.csv", "a\n1\n")
+    cache = eda.CsvCache(os.path.join(str(tmp_path), "cache"))
+    cache.put(filepath, {}, df)
+    # not padded to the longest value
+    assert csv_cache._get_dir_size(os.path.join(cache.cache_dir, _list_entries(cache)[0])) < 200000
+    testing.assert_frame_equal(cache.get(filepath, {}), df)
+
+
+def test_cache_hashes_file_once_per_read(tmp_path, monkeypatch):
+    filepath = _write_csv(tmp_path, "integer.csv", csv_data.INTEGER_TEST_CSV)
+    cache = eda.CsvCache(os.path.join(str(tmp_path), "cache"))
+    file_digest = hashlib.file_digest
+    num_calls = []
+
+    def _count(*args, **kwargs):
+        num_calls.append(1)
+        return file_digest(*args, **kwargs)
+    monkeypatch.setattr(hashlib, "file_digest", _count)
+    df = eda.read_csv(filepath, cache=cache)
+    assert len(num_calls) == 1
+    testing.assert_frame_equal(eda.read_csv(filepath, cache=cache), df)
+    assert len(num_calls) == 1
+    # touched file with the same content is found by its content hash
+    os.utime(filepath, ns=(0, 0))
+    testing.assert_frame_equal(eda.read_csv(filepath, cache=cache), df)
+    assert len(num_calls) == 2
@@ -0,0 +1,77 @@
+import io
+import os
+
+import pytest
+from pandas import testing
+
+from conjurer import eda
+from . import csv_data
+
+
+def test_load_with_same_dtypes():
+    df_dict = {
+        "all_type": eda.read_csv(io.StringIO(csv_data.ALL_TYPE_TEST_CSV)),
+        "integer": eda.read_csv(io.StringIO(csv_data.INTEGER_TEST_CSV)),
+    }
+    loader = eda.DfDictLoader(df_dict)
+    loaded = loader.load({
+        "all_type": io.StringIO(csv_data.ALL_TYPE_TEST_CSV),
+        "integer": io.StringIO(csv_data.INTEGER_TEST_CSV),
+    })
+    for name, df in df_dict.items():
+        testing.assert_frame_equal(loaded[name], df)
+
+
+def _write_csv(tmp_path, name, content):
+    filepath = os.path.join(str(tmp_path), name)
+    with open(filepath, "w") as f:
+        f.write(content)
+    return filepath
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_load_concurrently(tmp_path, executor):
+    contents = {
+        "all_type": csv_data.ALL_TYPE_TEST_CSV,
+        "integer": csv_data.INTEGER_TEST_CSV,
+        "chunk": csv_data.CHUNK_TEST_CSV,
+    }
+    filepath_dict = {name: _write_csv(tmp_path, name + ".csv", content) for name, content in contents.items()}
+    df_dict = {name: eda.read_csv(filepath) for name, filepath in filepath_dict.items()}
+    loader = eda.DfDictLoader(df_dict)
+    loaded = loader.load(filepath_dict, max_workers=2, executor=executor, memory_budget_bytes=1)
+    assert list(loaded.keys()) == list(filepath_dict.keys())
+    for name, df in df_dict.items():
+        testing.assert_frame_equal(loaded[name], df)
+    report = loader.load_report.set_index("table_name")
+    assert report.loc["chunk", "num_rows"] == 100
+    assert report.loc["integer", "num_columns"] == 2
+
+
+def test_invalid_executor():
+    loader = eda.DfDictLoader({"integer": eda.read_csv(io.StringIO(csv_data.INTEGER_TEST_CSV))})
+    with pytest.raises(ValueError, match="executor"):
+        loader.load({"integer": io.StringIO(csv_data.INTEGER_TEST_CSV)}, max_workers=2, executor="cluster")
+
+
+def test_save_and_load_schema(tmp_path):
+    df = eda.read_csv(io.StringIO(csv_data.ALL_TYPE_TEST_CSV))
+    schema_path = os.path.join(str(tmp_path), "schema.json")
+    eda.DfDictLoader({"all_type": df}).save_schema(schema_path)
+    loader = eda.DfDictLoader.from_schema(schema_path)
+    loaded = loader.load({"all_type": io.StringIO(csv_data.ALL_TYPE_TEST_CSV)})
+    testing.assert_frame_equal(loaded["all_type"], df)
+
+
+def test_mismatch_reported_per_column():
+    loader = eda.DfDictLoader({"integer": eda.read_csv(io.StringIO(csv_data.INTEGER_TEST_CSV))})
+    with pytest.raises(eda.SchemaMismatchError) as e:
+        loader.load({"integer": io.StringIO("int1,int3\n1.5,1\n")})
+    assert set(e.value.mismatches.keys()) == {"integer.int1", "integer.int2", "integer.int3"}
+
+
+def test_mismatch_reported_per_table():
+    loader = eda.DfDictLoader({"integer": eda.read_csv(io.StringIO(csv_data.INTEGER_TEST_CSV))})
+    with pytest.raises(eda.SchemaMismatchError) as e:
+        loader.load({"other": io.StringIO(csv_data.INTEGER_TEST_CSV)})
+    assert e.value.mismatches == {"integer": "missing table", "other": "unexpected table"}
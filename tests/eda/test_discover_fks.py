@@ -0,0 +1,50 @@
+import numpy
+import pandas
+
+from conjurer import eda
+
+
+def _df_dict():
+    rng = numpy.random.default_rng(0)
+    stores = pandas.DataFrame({
+        "store_id": numpy.arange(1, 101),
+        "store_name": ["store{}".format(i) for i in range(1, 101)],
+        "region_id": rng.integers(1, 6, 100),
+    })
+    regions = pandas.DataFrame({"region_id": pandas.Series(numpy.arange(1, 6), dtype="Int64")})
+    sales = pandas.DataFrame({
+        "sale_id": numpy.arange(100000, 105000),
+        "store_id": rng.integers(1, 101, 5000),
+        "amount": rng.random(5000),
+        # 5 of 1000 items are missing in items table
+        "item_code": ["item{}".format(i) for i in rng.integers(0, 1000, 5000)],
+    })
+    items = pandas.DataFrame({"item_code": ["item{}".format(i) for i in range(995)]})
+    return {"stores": stores, "regions": regions, "sales": sales, "items": items}
+
+
+def test_discover_fks():
+    fk_df = eda.discover_fks(_df_dict(), min_coverage=0.9)
+    pairs = list(zip(fk_df["fk_table"], fk_df["fk_column"], fk_df["k_table"], fk_df["k_column"]))
+    assert ("sales", "store_id", "stores", "store_id") in pairs
+    assert ("stores", "region_id", "regions", "region_id") in pairs
+    assert ("sales", "item_code", "items", "item_code") in pairs
+    assert not any(fk_column in {"amount", "sale_id"} for fk_column in fk_df["fk_column"])
+    item_row = fk_df[fk_df["fk_column"] == "item_code"].iloc[0]
+    assert 0.99 < item_row["key_coverage"] < 1
+    assert list(fk_df["key_coverage"]) == sorted(fk_df["key_coverage"], reverse=True)
+
+
+def test_discover_fks_with_list():
+    df_dict = _df_dict()
+    fk_df = eda.discover_fks(list(df_dict.values()), list(df_dict.keys()), min_coverage=1.0)
+    assert ("sales", "item_code") not in set(zip(fk_df["fk_table"], fk_df["fk_column"]))
+    assert (fk_df["key_coverage"] == 1.0).all()
+
+
+def test_discover_fks_with_downcast_negative_keys():
+    accounts = pandas.DataFrame({"account_id": numpy.arange(-50, 50, dtype=numpy.int64)})
+    entries = pandas.DataFrame({"account_id": numpy.tile(numpy.arange(-50, 50), 3).astype(numpy.int32)})
+    fk_df = eda.discover_fks({"accounts": accounts, "entries": entries}, min_coverage=1.0)
+    row = fk_df[(fk_df["fk_table"] == "entries") & (fk_df["k_table"] == "accounts")].iloc[0]
+    assert row["key_coverage"] == 1.0
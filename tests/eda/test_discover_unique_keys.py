@@ -0,0 +1,65 @@
+import numpy
+import pandas
+
+from conjurer import eda
+from conjurer.logic.eda.check import key_discovery
+
+
+def _input_df():
+    return pandas.DataFrame({
+        "id": range(12),
+        "store": [i // 4 for i in range(12)],
+        "day": [i % 4 for i in range(12)],
+        "constant": ["x"] * 12,
+        "item": [{"sku": i % 6} for i in range(12)],
+        "flag": [i % 2 == 0 for i in range(12)],
+    })
+
+
+def _to_sets(key_df):
+    return {frozenset(names) for names in key_df["column_names"]}
+
+
+def test_minimal_combinations():
+    key_df = eda.discover_unique_keys(_input_df())
+    assert _to_sets(key_df) == {
+        frozenset(["id"]), frozenset(["store", "day"]), frozenset(["store", "item"]),
+        frozenset(["day", "item"]),
+    }
+    assert list(key_df["num_columns"]) == [1, 2, 2, 2]
+
+
+def test_supersets_are_not_tested(monkeypatch):
+    tested = []
+    original = key_discovery._is_unique
+
+    def _is_unique(candidate, *args):
+        tested.append(candidate)
+        return original(candidate, *args)
+    monkeypatch.setattr(key_discovery, "_is_unique", _is_unique)
+    key_df = eda.discover_unique_keys(_input_df(), max_columns=3)
+    for candidate in tested:
+        assert not any(set(k) < set(candidate) for k in key_df["column_names"])
+        assert "constant" not in candidate
+
+
+def test_null_is_treated_as_value():
+    df = pandas.DataFrame({
+        "a": pandas.Series([1, None, None, 2], dtype="Int64"),
+        "b": [1, 1, 2, 2],
+    })
+    assert _to_sets(eda.discover_unique_keys(df)) == {frozenset(["a", "b"])}
+
+
+def test_sampling_does_not_change_result():
+    rng = numpy.random.default_rng(1)
+    num_rows = 20000
+    df = pandas.DataFrame({
+        "a": rng.integers(0, 200, num_rows),
+        "b": rng.integers(0, 200, num_rows),
+        "c": numpy.arange(num_rows) % 1000,
+        "d": numpy.arange(num_rows) // 1000,
+    })
+    expected = _to_sets(eda.discover_unique_keys(df, sample_rows=num_rows))
+    assert _to_sets(eda.discover_unique_keys(df, sample_rows=100)) == expected
+    assert frozenset(["c", "d"]) in expected
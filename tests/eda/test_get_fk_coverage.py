@@ -0,0 +1,58 @@
+import numpy
+import pandas
+import pytest
+
+from conjurer import eda
+
+
+@pytest.fixture
+def fk_df():
+    return pandas.DataFrame({
+        "store_id": pandas.Series([1, 1, 1, 2, 3, 3, None, 4], dtype="Int64"),
+        "item": ["a", "a", "b", "a", "c", "c", "a", "d"],
+    })
+
+
+@pytest.fixture
+def k_df():
+    return pandas.DataFrame({
+        "id": [1, 1, 2, 5],
+        "item_name": ["a", "b", "a", "a"],
+    })
+
+
+def test_single_column(fk_df, k_df):
+    # keys in fk_df: 1, 2, 3, 4 / k_df int64 vs Int64 in fk_df
+    assert eda.get_fk_coverage(fk_df, k_df, "store_id", "id") == 0.5
+
+
+@pytest.mark.parametrize("method", ["exact", "bloom"])
+def test_composite_report(fk_df, k_df, method):
+    report = eda.get_fk_coverage(
+        fk_df, k_df, ["store_id", "item"], ["id", "item_name"], method=method, return_report=True)
+    # keys: (1, a), (1, b), (2, a), (3, c), (4, d)
+    assert report["num_keys"] == 5
+    assert report["num_covered_keys"] == 3
+    assert report["key_coverage"] == 0.6
+    assert report["num_rows"] == 7
+    assert report["num_covered_rows"] == 4
+    assert report["num_null_rows"] == 1
+    assert list(report["fan_out"]["fan_out"]) == [1, 2]
+    assert list(report["fan_out"]["num_keys"]) == [3, 2]
+    orphan_df = report["orphan_samples"]
+    assert list(orphan_df["store_id"]) == [3, 4]
+    assert list(orphan_df["item"]) == ["c", "d"]
+    assert list(orphan_df["num_rows"]) == [2, 1]
+
+
+def test_bloom_large():
+    k_df = pandas.DataFrame({"id": numpy.arange(0, 200000, 2)})
+    fk_df = pandas.DataFrame({"id": numpy.arange(0, 20000)})
+    report = eda.get_fk_coverage(fk_df, k_df, "id", "id", method="bloom", false_positive_rate=0.01,
+                                 return_report=True, do_print=False)
+    assert 0.5 <= report["key_coverage"] < 0.52
+
+
+def test_invalid_columns(fk_df, k_df):
+    with pytest.raises(ValueError):
+        eda.get_fk_coverage(fk_df, k_df, ["store_id", "item"], "id")
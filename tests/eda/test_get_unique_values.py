@@ -1,5 +1,6 @@
 import pytest
 
+import numpy
 import pandas
 
 from conjurer import eda
@@ -101,3 +102,28 @@ def _test(input_df, columns, expected_values):
     unique_values = eda.get_unique_values(input_df, columns)
     assert unique_values == expected_values, \
         "Unique values of {} should be {} (returned {})".format(columns, expected_values, unique_values)
+
+
+@pytest.mark.parametrize("columns", [
+    "integer_1", "integer_2", "integer_with_null", "float_1", "float_with_null", "string_1", "string_2",
+    "all_null", ["integer_1", "float_1"], ["float_2", "string_with_null"], ["integer_2", "float_2", "string_2"],
+])
+def test_count_unique_values(input_df, columns):
+    assert eda.count_unique_values(input_df, columns) == len(eda.get_unique_values(input_df, columns))
+    assert eda.count_unique_values(input_df, columns, approx=True) == len(eda.get_unique_values(input_df, columns))
+
+
+def test_count_unique_values_nested():
+    df = pandas.DataFrame({
+        "payload": [{"x": 1}, {"x": 1}, {"x": 2}, None],
+        "tags": [["a", "b"], ["a", "b"], ["c"], ["c"]],
+    })
+    assert eda.count_unique_values(df, "payload") == 2
+    assert eda.count_unique_values(df, ["payload", "tags"]) == 2
+    assert eda.count_unique_values(df, "tags", approx=True) == 2
+
+
+def test_count_unique_values_approx():
+    df = pandas.DataFrame({"id": numpy.arange(200000) % 50000})
+    estimate = eda.count_unique_values(df, "id", approx=True, error_rate=0.01)
+    assert abs(estimate - 50000) / 50000 < 0.05
@@ -0,0 +1,68 @@
+import numpy
+import pandas
+import pytest
+
+from conjurer import eda
+from conjurer.logic.eda.check import missing_pattern
+
+
+def _input_df():
+    rng = numpy.random.default_rng(0)
+    num_rows, num_columns = 5000, 130
+    values = rng.normal(size=(num_rows, num_columns))
+    values[rng.random((num_rows, num_columns)) < 0.002] = numpy.nan
+    # columns from a failed join go missing together, across the word boundary
+    values[rng.random(num_rows) < 0.2, 60:70] = numpy.nan
+    df = pandas.DataFrame(values, columns=["c{}".format(i) for i in range(num_columns)])
+    df["label"] = pandas.Series(rng.choice(["a", None], num_rows), dtype="str")
+    return df
+
+
+def _iter_chunks(df, chunksize):
+    for i in range(0, len(df), chunksize):
+        yield df.iloc[i:i + chunksize]
+
+
+def test_patterns_and_co_null():
+    df = _input_df()
+    pattern_df, co_null_df = eda.check_missing_patterns(df, top_n=5)
+    is_na = df.isna()
+    expected_counts = is_na.value_counts()
+    assert list(pattern_df.columns) == missing_pattern.PATTERN_COLUMN_NAMES
+    assert list(pattern_df["num_rows"]) == list(expected_counts.values[:5])
+    for missing_columns, pattern in zip(pattern_df["missing_columns"], expected_counts.index[:5]):
+        assert missing_columns == [c for c, v in zip(df.columns, pattern) if v]
+    assert pattern_df["ratio"].iloc[0] == expected_counts.iloc[0] / len(df)
+    flags = is_na.to_numpy().astype(int)
+    numpy.testing.assert_array_equal(co_null_df.to_numpy(), flags.T @ flags)
+    assert list(co_null_df.index) == list(df.columns)
+
+
+def test_blocks_and_chunks():
+    df = _input_df()
+    counter = missing_pattern.MissingPatternCounter(block_rows=333).update_all(_iter_chunks(df, 1000))
+    assert counter.num_rows == len(df)
+    assert counter.num_patterns == len(df.isna().value_counts())
+    pattern_df, co_null_df = eda.check_missing_patterns(df, top_n=5)
+    pandas.testing.assert_frame_equal(counter.get_patterns(5), pattern_df)
+    pandas.testing.assert_frame_equal(counter.get_co_null_df(), co_null_df)
+
+
+def test_different_columns_in_chunk():
+    counter = missing_pattern.MissingPatternCounter().update(pandas.DataFrame({"a": [1]}))
+    with pytest.raises(ValueError):
+        counter.update(pandas.DataFrame({"b": [1]}))
+
+
+def test_co_null_over_pattern_blocks(monkeypatch):
+    df = _input_df()
+    _, co_null_df = eda.check_missing_patterns(df)
+    monkeypatch.setattr(missing_pattern, "BLOCK_PATTERNS", 7)
+    counter = missing_pattern.MissingPatternCounter().update(df)
+    assert counter.num_patterns > 7
+    pandas.testing.assert_frame_equal(counter.get_co_null_df(), co_null_df)
+
+
+def test_no_chunks():
+    with pytest.raises(ValueError, match="no chunks"):
+        eda.check_missing_patterns(iter([]))
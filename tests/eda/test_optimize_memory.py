@@ -0,0 +1,45 @@
+import io
+
+import numpy
+import pandas
+
+from conjurer import eda
+from . import csv_data
+
+
+def test_optimize_memory():
+    df = pandas.DataFrame({
+        "small_int": pandas.Series([1, None, -3], dtype="Int64"),
+        "large_int": pandas.Series([1, None, 2 ** 40], dtype="Int64"),
+        "float32_ok": [0.5, numpy.nan, 2.25],
+        "float32_lossy": [0.1, 0.2, 0.3],
+        "low_cardinality": ["a", "b", "a"],
+        "high_cardinality": ["a", "b", "c"],
+        "payload": [{"x": 1}, {"x": 1}, {"x": 1}],
+    })
+    optimized_df, report_df = eda.optimize_memory(df.copy(), category_max_unique_ratio=0.7)
+    assert [str(d) for d in optimized_df.dtypes] == [
+        "Int8", "Int64", "float32", "float64", "category", str(df.dtypes["high_cardinality"]), "object"]
+    report_df = report_df.set_index("column_name")
+    assert report_df.loc["small_int", "bytes_after"] < report_df.loc["small_int", "bytes_before"]
+    assert report_df.loc["small_int", "dtype_before"] == "Int64"
+    for c in df.columns:
+        assert list(optimized_df[c].astype(object).fillna(-1)) == list(df[c].astype(object).fillna(-1))
+
+
+def test_read_csv_optimize_memory():
+    df = eda.read_csv(io.StringIO(csv_data.CHUNK_TEST_CSV), optimize_memory=True)
+    assert str(df.dtypes["id"]) == "Int8"
+    assert str(df.dtypes["score"]) == "float32"
+    assert str(df.dtypes["timestamp"]) == "datetime64[ns]"
+
+
+def test_df_dict_loader_keeps_optimized_dtypes():
+    df = eda.read_csv(io.StringIO(csv_data.ALL_TYPE_TEST_CSV + "2000/3/1,,,,,A-1113,\n"))
+    df, _ = eda.optimize_memory(df, category_max_unique_ratio=0.8)
+    assert str(df.dtypes["str1"]) == "category"
+    loader = eda.DfDictLoader({"all_type": df})
+    # str1 has a value which is not in the categories of the reference
+    loaded = loader.load({"all_type": io.StringIO(csv_data.ALL_TYPE_TEST_CSV + "2000/3/1,,,,,Z-0000,\n")})
+    assert str(loaded["all_type"].dtypes["int1"]) == "Int8"
+    assert loaded["all_type"]["str1"].iloc[-1] == "Z-0000"
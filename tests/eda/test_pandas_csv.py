@@ -2,6 +2,7 @@ import io
 from datetime import datetime
 
 import pandas
+import pytest
 from pandas import testing
 
 from conjurer import eda
@@ -43,3 +44,95 @@ def test_all_type():
 def test_get_timestamp_columns():
     date_columns = pandas_csv.get_timestamp_columns(pandas.read_csv(io.StringIO(csv_data.ALL_TYPE_TEST_CSV)))
     assert date_columns == ["date1", "date2", "timestamp1"]
+
+
+def test_iter_csv_chunks_have_same_dtypes():
+    chunks = list(eda.iter_csv(io.StringIO(csv_data.CHUNK_TEST_CSV), chunksize=30, sample_rows=10))
+    assert [len(chunk) for chunk in chunks] == [30, 30, 30, 10]
+    for chunk in chunks:
+        testing.assert_series_equal(chunk.dtypes, chunks[0].dtypes)
+    assert str(chunks[0].dtypes["id"]) == "Int64"
+    assert str(chunks[0].dtypes["timestamp"]) == "datetime64[ns]"
+    # leading zeros must not be lost in chunks parsed after the sample
+    assert chunks[-1]["code"].iloc[-1] == "0099"
+
+
+def test_read_csv_chunksize_equals_full_read():
+    full_df = eda.read_csv(io.StringIO(csv_data.CHUNK_TEST_CSV))
+    chunked_df = pandas.concat(
+        eda.read_csv(io.StringIO(csv_data.CHUNK_TEST_CSV), chunksize=25),
+        ignore_index=True
+    )
+    testing.assert_frame_equal(chunked_df, full_df)
+
+
+def test_iter_csv_schema_mismatch():
+    csv = "value\n" + "1\n" * 10 + "1.5\n"
+    with pytest.raises(pandas_csv.SchemaMismatchError) as e:
+        list(eda.iter_csv(io.StringIO(csv), chunksize=5, sample_rows=10))
+    assert list(e.value.mismatches.keys()) == ["value"]
+
+
+def test_single_parse_equals_full_read():
+    for csv in [csv_data.ALL_TYPE_TEST_CSV, csv_data.INTEGER_TEST_CSV, csv_data.CHUNK_TEST_CSV]:
+        testing.assert_frame_equal(
+            eda.read_csv(io.StringIO(csv), single_parse=True, sample_rows=3),
+            eda.read_csv(io.StringIO(csv))
+        )
+
+
+def test_single_parse_falls_back_when_sample_is_wrong():
+    csv = "value,label\n" + "1,a\n" * 10 + "1.5,b\n"
+    df = eda.read_csv(io.StringIO(csv), single_parse=True, sample_rows=5)
+    assert str(df.dtypes["value"]) == "float64"
+    testing.assert_frame_equal(df, eda.read_csv(io.StringIO(csv)))
+
+
+def test_read_csv_with_dtypes_reports_mismatch():
+    dtypes = eda.read_csv(io.StringIO(csv_data.INTEGER_TEST_CSV)).dtypes
+    with pytest.raises(pandas_csv.SchemaMismatchError) as e:
+        pandas_csv.read_csv(io.StringIO("int1\n1.5\n"), dtypes=dtypes)
+    assert set(e.value.mismatches.keys()) == {"int1", "int2"}
+
+
+def test_get_timestamp_formats():
+    timestamp_formats = pandas_csv.get_timestamp_formats(pandas.read_csv(io.StringIO(csv_data.ALL_TYPE_TEST_CSV)))
+    assert timestamp_formats == {"date1": "%Y/%m/%d", "date2": "%Y-%m-%d", "timestamp1": "%Y-%m-%dT%H:%M:%S"}
+
+
+def test_timestamp_format_fallback_for_other_formats():
+    df = pandas.DataFrame({"ts": ["2020-01-02"] * 3 + ["2020/01/03 10:00"]})
+    df = pandas_csv.convert_timestamp_columns(df, {"ts": "%Y-%m-%d"})
+    assert str(df.dtypes["ts"]) == "datetime64[ns]"
+    assert df["ts"].iloc[-1] == datetime(2020, 1, 3, 10)
+
+
+def test_iter_csv_uses_format_detected_in_sample():
+    # "%d/%m/%Y" is ambiguous in the 2nd chunk alone, it must follow the format from the sample
+    csv = "ts\n13/01/2020\n14/01/2020\n01/02/2020\n"
+    chunks = list(eda.iter_csv(io.StringIO(csv), chunksize=2, sample_rows=2))
+    assert chunks[-1]["ts"].iloc[-1] == datetime(2020, 2, 1)
+
+
+def test_single_parse_nrows():
+    df = eda.read_csv(io.StringIO(csv_data.CHUNK_TEST_CSV), single_parse=True, sample_rows=20, nrows=8)
+    testing.assert_frame_equal(df, eda.read_csv(io.StringIO(csv_data.CHUNK_TEST_CSV), nrows=8))
+
+def test_bool_column_is_integer():
+    df = eda.read_csv(io.StringIO("flag\nTrue\nFalse\n"))
+    assert str(df.dtypes["flag"]) == "Int64"
+
+
+def test_iter_csv_nrows():
+    chunks = list(eda.iter_csv(io.StringIO(csv_data.CHUNK_TEST_CSV), chunksize=5, nrows=8))
+    assert [len(chunk) for chunk in chunks] == [5, 3]
+
+
+@pytest.mark.parametrize("dtype_backend", ["numpy_nullable", "pyarrow"])
+def test_iter_csv_column_without_values_in_sample(dtype_backend):
+    csv = "a,b\n" + "1,\n" * 10 + "2,x\n"
+    kwargs = {} if dtype_backend == "numpy_nullable" else {"dtype_backend": dtype_backend}
+    chunks = list(eda.iter_csv(io.StringIO(csv), chunksize=5, sample_rows=5, **kwargs))
+    assert chunks[-1]["b"].iloc[-1] == "x"
+    for chunk in chunks:
+        testing.assert_series_equal(chunk.dtypes, chunks[0].dtypes)
@@ -0,0 +1,66 @@
+import io
+import json
+
+import pandas
+import pytest
+from pandas import testing
+
+from conjurer import eda
+
+
+RECORDS = [
+    {"id": i, "user": {"name": "u{}".format(i % 3), "age": 20 + i}, "tags": ["a", "b"] if i % 2 == 0 else [],
+     "active": i % 2 == 0, "created_at": "2021-01-{:02d} 10:00:00".format(i + 1)}
+    for i in range(10)
+]
+
+
+def _to_jsonl(records):
+    return "\n".join(json.dumps(r) for r in records) + "\n"
+
+
+def test_read_jsonl_flatten():
+    df = eda.read_jsonl(io.StringIO(_to_jsonl(RECORDS)))
+    assert list(df.columns) == ["id", "tags", "active", "created_at", "user.name", "user.age"]
+    assert df.dtypes["id"] == "Int64"
+    assert df.dtypes["user.age"] == "Int64"
+    assert df.dtypes["active"] == "boolean"
+    assert pandas.api.types.is_datetime64_any_dtype(df.dtypes["created_at"])
+    assert df["tags"].tolist()[:2] == ['["a", "b"]', "[]"]
+    assert df["user.name"].tolist()[:3] == ["u0", "u1", "u2"]
+
+
+def test_read_jsonl_file(tmp_path):
+    filepath = str(tmp_path / "data.jsonl")
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write(_to_jsonl(RECORDS) + "\n")
+    df = eda.read_jsonl(filepath, sep="_")
+    assert len(df) == 10
+    assert "user_name" in df.columns
+
+
+def test_read_jsonl_nested_cells_are_hashable():
+    records = [{"x": {"a": 1, "b": [1, 2]}, "y": [{"k": 1}]}, {"x": {"b": [1, 2], "a": 1}, "y": [{"k": 1}]}]
+    df = eda.read_jsonl(io.StringIO(_to_jsonl(records)), sep="/")
+    assert df["y"].nunique() == 1
+    assert df["x/b"].nunique() == 1
+
+
+def test_read_jsonl_chunks():
+    records = RECORDS + [{"id": 10}]
+    expected_df = eda.read_jsonl(io.StringIO(_to_jsonl(records)))
+    chunks = list(eda.read_jsonl(io.StringIO(_to_jsonl(records)), chunksize=4, sample_rows=5))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 3]
+    for chunk in chunks:
+        testing.assert_series_equal(chunk.dtypes, chunks[0].dtypes)
+    df = pandas.concat(chunks)
+    assert df.index.tolist() == list(range(11))
+    assert pandas.isna(df.iloc[-1]["user.name"])
+    testing.assert_series_equal(df["id"], expected_df["id"])
+
+
+def test_read_jsonl_chunks_unexpected_key():
+    records = RECORDS + [{"id": 10, "extra": 1}]
+    with pytest.raises(eda.SchemaMismatchError) as e:
+        list(eda.read_jsonl(io.StringIO(_to_jsonl(records)), chunksize=4, sample_rows=5))
+    assert e.value.mismatches == {"extra": "unexpected column"}
@@ -0,0 +1,83 @@
+import math
+
+import numpy
+import pandas
+import pytest
+
+from conjurer.logic.eda.check import stat_calculator
+
+
+RATIO_LIST = [0.01, 0.25, 0.5, 0.75, 0.99]
+
+
+def _sorted_percentiles(values, ratio_list):
+    sorted_values = numpy.sort(values)
+    return [sorted_values[0 if r == 0 else int(math.ceil(len(values) * r)) - 1] for r in ratio_list]
+
+
+def _input_df(num_rows):
+    rng = numpy.random.default_rng(0)
+    df = pandas.DataFrame({
+        "float": rng.normal(size=num_rows),
+        "int": rng.integers(-1000, 1000, num_rows),
+        "nullable_int": pandas.Series(rng.integers(0, 100, num_rows), dtype="Int64"),
+        "timestamp": pandas.Series(
+            pandas.Timestamp("2020-01-01", tz="UTC") + pandas.to_timedelta(rng.integers(0, 10 ** 8, num_rows), "s")),
+    })
+    df.loc[::5, "float"] = numpy.nan
+    df.loc[1, "float"] = numpy.inf
+    df.loc[::3, "nullable_int"] = None
+    df.loc[::7, "timestamp"] = pandas.NaT
+    return df
+
+
+def test_exact_percentiles():
+    df = _input_df(10001)
+    percentile_df = stat_calculator.calculate_percentiles_for_df(df, list(df.columns), RATIO_LIST)
+    assert list(percentile_df.index) == ["min"] + ["{:.2%}-percentile".format(r) for r in RATIO_LIST] + ["max"]
+    ratio_list = [0] + RATIO_LIST + [1]
+    floats = df["float"].to_numpy()
+    assert list(percentile_df["float"]) == _sorted_percentiles(floats[numpy.isfinite(floats)], ratio_list)
+    assert list(percentile_df["int"]) == _sorted_percentiles(df["int"].to_numpy(), ratio_list)
+    assert list(percentile_df["nullable_int"]) == _sorted_percentiles(
+        df["nullable_int"].dropna().to_numpy(dtype=int), ratio_list)
+    assert list(percentile_df["timestamp"]) == _sorted_percentiles(df["timestamp"].dropna(), ratio_list)
+    assert percentile_df["timestamp"].dtype == df["timestamp"].dtype
+
+
+def test_percentiles_of_single_array():
+    array = numpy.array([5.0, numpy.nan, 1.0, 3.0, 2.0, 4.0])
+    numpy.testing.assert_array_equal(stat_calculator.calculate_percentiles(array, [0, 0.5, 1]), [1.0, 3.0, 5.0])
+
+
+def test_all_null_column():
+    df = pandas.DataFrame({"x": pandas.Series([None] * 3, dtype="Int64"), "y": [1, 2, 3]})
+    percentile_df = stat_calculator.calculate_percentiles_for_df(df, ["x", "y"], [0.5])
+    assert percentile_df["x"].isna().all()
+    assert list(percentile_df["y"]) == [1, 2, 3]
+
+
+def test_approx_percentiles():
+    df = _input_df(100000)
+    exact_df = stat_calculator.calculate_percentiles_for_df(df, list(df.columns), RATIO_LIST)
+    approx_df = stat_calculator.calculate_percentiles_for_df(df, list(df.columns), RATIO_LIST, approx=True)
+    numpy.testing.assert_allclose(approx_df["float"], exact_df["float"], atol=0.02)
+    assert approx_df["int"].iloc[0] == exact_df["int"].iloc[0]
+    assert approx_df["int"].iloc[-1] == exact_df["int"].iloc[-1]
+    assert (approx_df["timestamp"] - exact_df["timestamp"]).abs().max() < pandas.Timedelta(days=3)
+
+
+def test_pyarrow_timestamp_percentiles():
+    pytest.importorskip("pyarrow")
+    # astype to arrow may overwrite NaT of the source array, so each column is converted from a fresh frame
+    df = pandas.DataFrame({
+        "timestamp": _input_df(1001)["timestamp"].astype("timestamp[us, tz=UTC][pyarrow]"),
+        "naive": _input_df(1001)["timestamp"].dt.tz_convert(None).astype("timestamp[ms][pyarrow]"),
+    })
+    exact_df = stat_calculator.calculate_percentiles_for_df(_input_df(1001), ["timestamp"], RATIO_LIST)
+    for approx in [False, True]:
+        percentile_df = stat_calculator.calculate_percentiles_for_df(df, ["timestamp", "naive"], RATIO_LIST,
+                                                                     approx=approx)
+        tolerance = pandas.Timedelta(days=3 if approx else 0)
+        assert (percentile_df["timestamp"] - exact_df["timestamp"]).abs().max() <= tolerance
+        assert (percentile_df["naive"] - exact_df["timestamp"].dt.tz_convert(None)).abs().max() <= tolerance
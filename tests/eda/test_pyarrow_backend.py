@@ -0,0 +1,99 @@
+import io
+
+import pandas
+import pytest
+from pandas import testing
+
+from conjurer import eda
+from conjurer.logic.eda.check import stat_calculator
+from conjurer.logic.eda.vis import binning
+from . import csv_data
+
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def arrow_df():
+    return eda.read_csv(io.StringIO(csv_data.ALL_TYPE_TEST_CSV), dtype_backend="pyarrow")
+
+
+def test_read_csv_pyarrow(arrow_df):
+    assert [str(d) for d in arrow_df.dtypes] == [
+        "timestamp[ns][pyarrow]", "timestamp[ns][pyarrow]", "timestamp[ns][pyarrow]",
+        "int64[pyarrow]", "double[pyarrow]", "string[pyarrow]", "null[pyarrow]"
+    ]
+    numpy_df = eda.read_csv(io.StringIO(csv_data.ALL_TYPE_TEST_CSV))
+    for c in ["date2", "int1", "str1"]:
+        assert list(arrow_df[c].astype(object).fillna(-1)) == list(numpy_df[c].astype(object).fillna(-1))
+
+
+def test_pyarrow_single_parse_and_chunks(arrow_df):
+    single_parse_df = eda.read_csv(
+        io.StringIO(csv_data.ALL_TYPE_TEST_CSV), dtype_backend="pyarrow", single_parse=True, sample_rows=3)
+    testing.assert_frame_equal(single_parse_df, arrow_df)
+    chunked_df = pandas.concat(
+        eda.read_csv(io.StringIO(csv_data.ALL_TYPE_TEST_CSV), dtype_backend="pyarrow", chunksize=2),
+        ignore_index=True
+    )
+    # column without values in the sample is read as text, since later chunks may have any values
+    assert str(chunked_df.dtypes["null"]) == "string[pyarrow]"
+    assert chunked_df["null"].isna().all()
+    testing.assert_frame_equal(chunked_df.drop(columns=["null"]), arrow_df.drop(columns=["null"]))
+
+
+def test_df_dict_loader_pyarrow(arrow_df):
+    numpy_df = eda.read_csv(io.StringIO(csv_data.ALL_TYPE_TEST_CSV))
+    loader = eda.DfDictLoader({"all_type": numpy_df})
+    loaded = loader.load({"all_type": io.StringIO(csv_data.ALL_TYPE_TEST_CSV)}, dtype_backend="pyarrow")
+    # all-null column keeps stored float64 as double instead of null type
+    assert str(loaded["all_type"].dtypes["null"]) == "double[pyarrow]"
+    testing.assert_frame_equal(loaded["all_type"].drop(columns=["null"]), arrow_df.drop(columns=["null"]))
+
+
+def test_check_stats_pyarrow(arrow_df):
+    stat_df = eda.check_stats(arrow_df).set_index("column_name")
+    assert stat_df.loc["str1", "unique_count"] == 3
+    assert stat_df.loc["int1", "max"] == 3
+    assert stat_df.loc["date2", "ratio_na"] == 0.25
+    assert stat_df.loc["null", "unique_count"] == 0
+
+
+def test_get_unique_values_pyarrow(arrow_df):
+    assert eda.get_unique_values(arrow_df, "str1") == {"A-1113", "B-1515", "C-1335"}
+    assert eda.get_unique_values(arrow_df, ["str1", "int1"]) == {("B-1515", 1), ("C-1335", 3)}
+    assert stat_calculator.count_unique_values(arrow_df, "int1") == 3
+
+
+def test_histogram_pyarrow(arrow_df):
+    freq = binning.create_frequency_table(arrow_df["int1"], num_bins=10)
+    assert freq[binning.FREQUENCY_CNAME].sum() == 3
+    for c in ["date1", "float1", "str1"]:
+        eda.plot_histogram(arrow_df[c], num_bins=5).to_dict()
+    eda.plot_scatter(arrow_df, "date2", "float1").to_dict()
+
+
+def test_plot_aggy_pyarrow(arrow_df):
+    eda.plot_aggy(arrow_df, "date1", "float1", agg="sum", freq="MS").to_dict()
+    eda.plot_aggy(arrow_df, "float1", "int1", agg="mean", num_bins=3).to_dict()
+
+
+def test_optimize_memory_pyarrow(arrow_df):
+    df, _ = eda.optimize_memory(arrow_df)
+    assert str(df.dtypes["int1"]) == "int8[pyarrow]"
+
+
+def test_cache_round_trip_pyarrow(tmp_path, arrow_df):
+    filepath = str(tmp_path / "all_type.csv")
+    with open(filepath, "w") as f:
+        f.write(csv_data.ALL_TYPE_TEST_CSV)
+    cache = eda.CsvCache(str(tmp_path / "cache"))
+    eda.read_csv(filepath, dtype_backend="pyarrow", cache=cache)
+    testing.assert_frame_equal(eda.read_csv(filepath, dtype_backend="pyarrow", cache=cache), arrow_df)
+    df = pandas.DataFrame({
+        "string": pandas.Series(["a", None], dtype="string[pyarrow]"),
+        "python_string": pandas.Series(["a", None], dtype="string[python]"),
+        "str": pandas.Series(["a", None], dtype="str"),
+    })
+    cache.put(filepath, {}, df)
+    testing.assert_frame_equal(cache.get(filepath, {}), df)
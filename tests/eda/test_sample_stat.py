@@ -0,0 +1,88 @@
+import numpy
+import pandas
+import pytest
+
+from conjurer import eda
+from conjurer.logic.eda.check import sample_stat, stat_calculator
+
+
+def _input_df(num_rows):
+    rng = numpy.random.default_rng(0)
+    return pandas.DataFrame({
+        "group": numpy.where(rng.random(num_rows) < 0.05, "rare", "common"),
+        "value": rng.normal(10, 2, num_rows),
+        "count": pandas.Series(rng.integers(0, 4, num_rows), dtype="Int64").mask(rng.random(num_rows) < 0.2),
+        "id": numpy.arange(num_rows),
+        "timestamp": pandas.date_range("2020-01-01", periods=num_rows, freq="s"),
+    })
+
+
+def _iter_chunks(df, chunksize):
+    for i in range(0, len(df), chunksize):
+        yield df.iloc[i:i + chunksize]
+
+
+def _assert_in_interval(stat_df, expected_df, names):
+    for name in names:
+        lower = pandas.to_numeric(stat_df["{}_lower".format(name)])
+        upper = pandas.to_numeric(stat_df["{}_upper".format(name)])
+        expected = pandas.to_numeric(expected_df[name])
+        is_numeric = expected.notna()
+        assert ((lower[is_numeric] <= expected[is_numeric]) & (expected[is_numeric] <= upper[is_numeric])).all(), name
+
+
+def test_uniform_sample_intervals():
+    df = _input_df(200000)
+    stat_df = eda.check_stats(df, skip_histogram=True, sample=5000, confidence=0.999).set_index("column_name")
+    expected_df = stat_calculator.calc_column_stat(df).set_index("column_name")
+    assert list(stat_df.columns) == stat_calculator.STAT_COLUMN_NAMES[1:] + sample_stat.INTERVAL_COLUMN_NAMES
+    _assert_in_interval(stat_df, expected_df, ["mean", "std", "ratio_na", "ratio_zero", "unique_count"])
+    # min / max are exact
+    for name in ["min", "max"]:
+        assert list(stat_df.loc[["value", "id", "timestamp"], name]) == \
+            list(expected_df.loc[["value", "id", "timestamp"], name])
+    assert stat_df.loc["count", "unique_count"] == 4
+    assert stat_df.loc["id", "is_unique"]
+    assert not stat_df.loc["group", "is_unique"]
+
+
+def test_chunks_and_strata():
+    df = _input_df(100000)
+    sampler = eda.ReservoirSampler(1000, strata="group").update_all(_iter_chunks(df, 7000))
+    assert sampler.num_rows == len(df)
+    assert (sampler.sample["group"].value_counts() == 1000).all()
+    stat_df = sampler.get_stat_df(confidence=0.999).set_index("column_name")
+    expected_df = stat_calculator.calc_column_stat(df).set_index("column_name")
+    _assert_in_interval(stat_df, expected_df, ["mean", "std", "ratio_na"])
+    assert stat_df.loc["id", "min"] == 0 and stat_df.loc["id", "max"] == len(df) - 1
+
+
+def test_whole_population_is_exact():
+    df = _input_df(500)
+    stat_df = sample_stat.ReservoirSampler(1000).update(df).get_stat_df().set_index("column_name")
+    expected_df = stat_calculator.calc_column_stat(df).set_index("column_name")
+    for name in ["ratio_na", "unique_count"]:
+        assert list(stat_df[name]) == list(expected_df[name])
+        assert list(stat_df["{}_lower".format(name)]) == list(expected_df[name])
+    numpy.testing.assert_allclose(stat_df.loc["value", ["mean", "std"]].astype(float),
+                                  expected_df.loc["value", ["mean", "std"]].astype(float))
+
+
+def test_unique_count_is_weighted_by_stratum():
+    # 10 values repeated in a large stratum, unique values in a small oversampled stratum
+    df = pandas.DataFrame({
+        "stratum": ["large"] * 99000 + ["small"] * 1000,
+        "value": [i % 10 for i in range(99000)] + list(range(100, 1100)),
+    })
+    stat_df = sample_stat.ReservoirSampler(500, strata="stratum").update(df).get_stat_df()
+    row = stat_df.set_index("column_name").loc["value"]
+    assert row["unique_count_lower"] <= 1010 <= row["unique_count_upper"]
+    # unweighted GEE would be sqrt(100000 / 1000) * 500 + 10 = 5010
+    assert abs(row["unique_count"] - 1010) < 300
+
+
+def test_invalid_sample_arguments():
+    with pytest.raises(ValueError):
+        eda.check_stats(pandas.DataFrame({"x": [1, 2]}), skip_histogram=True, sample=1, robust=True)
+    with pytest.raises(ValueError):
+        eda.check_stats(iter([]), skip_histogram=True, sample=1)
@@ -0,0 +1,105 @@
+import numpy
+import pandas
+from pandas import testing
+
+from conjurer import eda
+from conjurer.logic.eda.check import stat_cache, stat_calculator, column_state
+
+
+def _input_df(num_rows):
+    return pandas.DataFrame({
+        "int": pandas.Series([i if i % 5 else None for i in range(num_rows)], dtype="Int64"),
+        "float": numpy.arange(num_rows) / 4,
+        "label": ["c{}".format(i % 7) for i in range(num_rows)],
+        "payload": [{"x": i % 3} for i in range(num_rows)],
+        "timestamp": pandas.date_range("2020-01-01", periods=num_rows, freq="h"),
+    })
+
+
+def _assert_same_stats(stat_df, expected_df):
+    testing.assert_frame_equal(
+        stat_df.drop(columns=["mean", "std"]), expected_df.drop(columns=["mean", "std"]), check_dtype=False)
+    for c in ["mean", "std"]:
+        numpy.testing.assert_allclose(
+            pandas.to_numeric(stat_df[c], errors="coerce"), pandas.to_numeric(expected_df[c], errors="coerce"))
+
+
+def test_cache_hit_and_new_column():
+    cache = eda.StatCache()
+    df = _input_df(100)
+    first_df = eda.check_stats(df, skip_histogram=True, cache=cache)
+    _assert_same_stats(first_df, stat_calculator.calc_column_stat(df))
+    assert len(cache) == 5
+    df["derived"] = df["float"] * 2
+    second_df = eda.check_stats(df, skip_histogram=True, cache=cache)
+    assert len(cache) == 6
+    _assert_same_stats(second_df, stat_calculator.calc_column_stat(df))
+
+
+def test_appended_rows_are_merged(monkeypatch):
+    cache = eda.StatCache()
+    stat_calculator.calc_column_stat(_input_df(100), cache=cache)
+    scanned_lengths = []
+    original = column_state.ColumnState.from_series.__func__
+
+    def _from_series(cls, series, *args):
+        scanned_lengths.append(len(series))
+        return original(cls, series, *args)
+    monkeypatch.setattr(column_state.ColumnState, "from_series", classmethod(_from_series))
+    df = _input_df(130)
+    stat_df = stat_calculator.calc_column_stat(df, cache=cache)
+    assert scanned_lengths == [30] * 5
+    _assert_same_stats(stat_df, stat_calculator.calc_column_stat(df))
+
+
+def test_changed_column_is_recalculated():
+    cache = eda.StatCache()
+    df = _input_df(50)
+    stat_calculator.calc_column_stat(df, cache=cache)
+    df.loc[0, "float"] = -1.0
+    stat_df = stat_calculator.calc_column_stat(df, cache=cache)
+    assert stat_df.set_index("column_name").loc["float", "min"] == -1.0
+
+
+def test_lru_eviction():
+    cache = eda.StatCache(max_bytes=1)
+    stat_calculator.calc_column_stat(_input_df(50), cache=cache)
+    assert len(cache) == 1
+
+
+def test_lookup_by_sampled_rows(monkeypatch):
+    df = pandas.DataFrame({"float": numpy.arange(10000) / 4})
+    changed_df = df.copy()
+    # row which is not in sampled blocks
+    changed_df.loc[5000, "float"] = -1.0
+    assert stat_cache.get_sample_fingerprint(df["float"]) == stat_cache.get_sample_fingerprint(changed_df["float"])
+
+    cache = eda.StatCache()
+    stat_calculator.calc_column_stat(df, cache=cache)
+    assert stat_calculator.calc_column_stat(changed_df, cache=cache)["min"].iloc[0] == -1.0
+
+    cache = eda.StatCache(verify=False)
+    stat_calculator.calc_column_stat(df, cache=cache)
+
+    def _fail(series):
+        raise AssertionError("whole column must not be hashed without verify")
+    monkeypatch.setattr(stat_cache, "get_fingerprint", _fail)
+    assert stat_calculator.calc_column_stat(changed_df, cache=cache)["min"].iloc[0] == 0.0
+
+
+def test_unique_count_of_equal_numbers_of_different_types():
+    cache = eda.StatCache()
+    df = pandas.DataFrame({"x": pandas.Series([1, 1.0, True, 2, {"a": 1}, {"a": 1}], dtype=object)})
+    stat_df = stat_calculator.calc_column_stat(df, cache=cache)
+    assert stat_df["unique_count"].iloc[0] == stat_calculator.calc_column_stat(df)["unique_count"].iloc[0] == 3
+
+
+def test_column_state_update_and_merge():
+    df = _input_df(100)
+    for c in df.columns:
+        expected = column_state.ColumnState.from_series(df[c]).get_stat()
+        updated = column_state.ColumnState(df.dtypes[c]).update(df[c].iloc[:40]).update(df[c].iloc[40:])
+        merged = column_state.ColumnState.from_series(df[c].iloc[:70]).merge(
+            column_state.ColumnState.from_series(df[c].iloc[70:]))
+        for state in [updated, merged]:
+            _assert_same_stats(pandas.DataFrame([state.get_stat()]), pandas.DataFrame([expected]))
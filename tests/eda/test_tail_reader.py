@@ -0,0 +1,109 @@
+import os
+
+import pytest
+from pandas import testing
+
+from conjurer import eda
+from . import csv_data
+
+
+def _write(filepath, content, mode="w"):
+    with open(filepath, mode) as f:
+        f.write(content)
+
+
+@pytest.fixture
+def filepath(tmp_path):
+    return os.path.join(str(tmp_path), "log.csv")
+
+
+def test_read_appended_rows(filepath):
+    lines = csv_data.ALL_TYPE_TEST_CSV.splitlines(keepends=True)
+    _write(filepath, "".join(lines[:3]))
+    reader = eda.CsvTailReader(filepath)
+    first_df = reader.read()
+    assert len(first_df) == 2
+    _write(filepath, "".join(lines[3:]), mode="a")
+    new_df = reader.read()
+    assert len(new_df) == 2
+    testing.assert_series_equal(new_df.dtypes, first_df.dtypes)
+    assert list(new_df.index) == [2, 3]
+    assert len(reader.read()) == 0
+
+
+def test_concat_equals_full_read(filepath):
+    lines = csv_data.CHUNK_TEST_CSV.splitlines(keepends=True)
+    _write(filepath, "".join(lines[:20]))
+    reader = eda.CsvTailReader(filepath)
+    reader.read(concat=True)
+    _write(filepath, "".join(lines[20:]), mode="a")
+    testing.assert_frame_equal(reader.read(concat=True), eda.read_csv(filepath))
+
+
+def test_partial_trailing_line(filepath):
+    _write(filepath, "id,value\n1,10\n2,2")
+    reader = eda.CsvTailReader(filepath)
+    assert reader.read()["id"].tolist() == [1]
+    _write(filepath, "0\n3,30\n", mode="a")
+    df = reader.read()
+    assert df["value"].tolist() == [20, 30]
+    assert str(df.dtypes["value"]) == "Int64"
+
+
+def test_wait_for_first_row(filepath):
+    _write(filepath, "id,val")
+    reader = eda.CsvTailReader(filepath)
+    assert len(reader.read()) == 0
+    _write(filepath, "ue\n1,10\n", mode="a")
+    assert reader.read()["value"].tolist() == [10]
+
+
+def test_rotation(filepath):
+    _write(filepath, "id,value\n1,10\n2,20\n")
+    reader = eda.CsvTailReader(filepath)
+    reader.read()
+    os.remove(filepath)
+    _write(filepath, "id,value\n3,30\n")
+    df = reader.read()
+    assert df["id"].tolist() == [3]
+    assert str(df.dtypes["id"]) == "Int64"
+
+
+def test_schema_mismatch_in_appended_rows(filepath):
+    _write(filepath, "id,value\n1,10\n")
+    reader = eda.CsvTailReader(filepath)
+    reader.read()
+    _write(filepath, "2,1.5\n", mode="a")
+    with pytest.raises(eda.SchemaMismatchError):
+        reader.read()
+    # rows are kept for the next read
+    assert reader.offset == len("id,value\n1,10\n")
+
+
+def test_concat_after_reads_without_concat(filepath):
+    lines = csv_data.CHUNK_TEST_CSV.splitlines(keepends=True)
+    _write(filepath, "".join(lines[:20]))
+    reader = eda.CsvTailReader(filepath)
+    reader.read()
+    _write(filepath, "".join(lines[20:50]), mode="a")
+    reader.read()
+    _write(filepath, "".join(lines[50:]), mode="a")
+    testing.assert_frame_equal(reader.read(concat=True), eda.read_csv(filepath))
+
+
+def test_newline_in_quoted_field(filepath):
+    _write(filepath, 'id,text\n1,"a\nb"\n2,"c\n')
+    reader = eda.CsvTailReader(filepath)
+    assert reader.read()["text"].tolist() == ["a\nb"]
+    _write(filepath, 'd"\n', mode="a")
+    assert reader.read()["text"].tolist() == ["c\nd"]
+
+
+def test_stray_quote_in_unquoted_field(filepath):
+    _write(filepath, 'id,text\n1,5" screen\n2,"a\nb"\n')
+    reader = eda.CsvTailReader(filepath)
+    assert reader.read()["text"].tolist() == ['5" screen', "a\nb"]
+    _write(filepath, '3,"c""\n', mode="a")
+    assert len(reader.read()) == 0
+    _write(filepath, 'd"\n4,e\n', mode="a")
+    assert reader.read()["text"].tolist() == ['c"\nd', "e"]